@@ -0,0 +1,102 @@
+"""
+Copyright 2020 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+from datetime import timezone, datetime, timedelta
+from typing import Callable, Dict
+
+import dateutil.parser
+import pytest
+from marshmallow.fields import AwareDateTime
+
+from geofencing_service.endpoints.reply import UASZoneFilterReply
+from geofencing_service.endpoints.schemas.db_schemas import UTCAwareDateTime, AwareTime, \
+    TimePeriodSchema
+from geofencing_service.endpoints.schemas.registry import get_schema
+from geofencing_service.endpoints.schemas.reply_schemas import UASZonesFilterReplySchema
+from geofencing_service.endpoints.utils import datetime_str_from_time_str
+from tests.geofencing_service.utils import make_uas_zone, BASILIQUE_POLYGON
+
+__author__ = "EUROCONTROL (SWIM)"
+
+N_UAS_ZONES = 10000
+
+# the lenient parsers used so far vs the strict ISO 8601 fast path
+DATETIME_PARSERS: Dict[str, Callable[[str], datetime]] = {
+    'marshmallow': AwareDateTime(default_timezone=timezone.utc).deserialize,
+    'strict_iso': UTCAwareDateTime().deserialize,
+}
+
+TIME_PARSERS: Dict[str, Callable] = {
+    'dateutil': lambda value: dateutil.parser.isoparse(datetime_str_from_time_str(value)).timetz(),
+    'strict_iso': AwareTime().deserialize,
+}
+
+
+@pytest.fixture(scope='module')
+def uas_zones():
+    start = datetime(2020, 1, 1, tzinfo=timezone.utc)
+
+    uas_zones = []
+    for i in range(N_UAS_ZONES):
+        uas_zone = make_uas_zone(BASILIQUE_POLYGON)
+        uas_zone.applicability.start_date_time = start + timedelta(minutes=i)
+        uas_zones.append(uas_zone)
+
+    return uas_zones
+
+
+@pytest.fixture(scope='module')
+def applicabilities_data(uas_zones):
+    return get_schema(TimePeriodSchema, many=True).dump(
+        [uas_zone.applicability for uas_zone in uas_zones]
+    )
+
+
+@pytest.mark.parametrize('parse', DATETIME_PARSERS.values(), ids=DATETIME_PARSERS.keys())
+def test_datetimes_load(benchmark, parse, applicabilities_data):
+    values = [data['startDateTime'] for data in applicabilities_data]
+
+    benchmark(lambda: [parse(value) for value in values])
+
+
+@pytest.mark.parametrize('parse', TIME_PARSERS.values(), ids=TIME_PARSERS.keys())
+def test_times_load(benchmark, parse, applicabilities_data):
+    values = [period['startTime'] for data in applicabilities_data for period in data['schedule']]
+
+    benchmark(lambda: [parse(value) for value in values])
+
+
+def test_time_periods_load(benchmark, applicabilities_data):
+    benchmark(get_schema(TimePeriodSchema, many=True).load, applicabilities_data)
+
+
+def test_uas_zones_filter_reply_dump(benchmark, uas_zones):
+    reply = UASZoneFilterReply(uas_zones=uas_zones)
+
+    benchmark.pedantic(get_schema(UASZonesFilterReplySchema).dump, args=(reply,), rounds=5)
@@ -0,0 +1,88 @@
+"""
+Copyright 2020 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+import time
+from typing import Callable, Dict
+
+import pytest
+
+from geofencing_service.events.events import Event, create_uas_zones_subscription_event, \
+    update_uas_zones_subscription_event, delete_uas_zones_subscription_event
+
+__author__ = "EUROCONTROL (SWIM)"
+
+# the latencies (in ms) of the remote calls of the handlers, which are replaced by sleeps
+HANDLER_LATENCIES_MS = {
+    'get_topic_name': 0,
+    'add_broker_topic': 5,
+    'get_or_create_sm_topic': 20,
+    'create_sm_subscription': 20,
+    'uas_zones_subscription_db_save': 2,
+    # no DB call without an idempotency key
+    'idempotency_record_db_save': 0,
+    'update_sm_subscription': 20,
+    'uas_zones_subscription_db_update': 2,
+    'delete_sm_subscription': 20,
+    'uas_zones_subscription_db_delete': 2,
+}
+
+
+def _make_stub_handler(name: str) -> Callable:
+    def handler(context):
+        time.sleep(HANDLER_LATENCIES_MS[name] / 1000)
+
+    handler.__name__ = name
+
+    return handler
+
+
+def _make_stub_event(event: Event, concurrent: bool) -> Event:
+    """
+    Copies the event with its handlers replaced by stubs and with (or without) its dependencies
+    """
+    stubs: Dict[Callable, Callable] = {handler: _make_stub_handler(handler.__name__)
+                                       for handler in event}
+    dependencies = None
+    if concurrent and event.dependencies is not None:
+        dependencies = {stubs[handler]: [stubs[dependency] for dependency in handler_dependencies]
+                        for handler, handler_dependencies in event.dependencies.items()}
+
+    return Event(stubs.values(), name=f'{event.name}_stub', dependencies=dependencies)
+
+
+@pytest.mark.parametrize('concurrent', [False, True], ids=['sequential', 'concurrent'])
+@pytest.mark.parametrize('event', [
+    create_uas_zones_subscription_event,
+    update_uas_zones_subscription_event,
+    delete_uas_zones_subscription_event,
+], ids=lambda event: event.name)
+def test_event_handle(benchmark, event, concurrent):
+    stub_event = _make_stub_event(event, concurrent)
+
+    benchmark(stub_event.handle, object())
@@ -0,0 +1,119 @@
+"""
+Copyright 2020 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+import multiprocessing
+import time
+
+import pytest
+from mongoengine import connect, disconnect
+
+from geofencing_service.db.models import UASZonesSubscription, GeofencingSMSubscription
+from geofencing_service.events.broker_message_producers import publish_uas_zone_creation, \
+    uas_zones_updates_message_producer
+from geofencing_service.events.uas_zone_handlers import UASZoneContext
+from geofencing_service.publisher import get_swim_publisher
+from benchmarks.loadtest.stubs import StubSWIMPublisher
+from benchmarks.utils import SEED
+from provision.generate_dataset import DatasetGenerator, load_uas_zones
+
+__author__ = "EUROCONTROL (SWIM)"
+
+N_WORKERS = [1, 2, 4, 8]
+
+MESSAGES_PER_WORKER = 1000
+
+TOPIC_NAME = 'bench_publisher'
+
+
+@pytest.fixture(scope='module')
+def stub_swim_publisher_factory(app):
+    """
+    The workers start their own publisher like the ones of a preloaded gunicorn app do. There is
+    no broker here so the messages are produced and discarded by the StubSWIMPublisher.
+    """
+    app.swim_publisher_factory = StubSWIMPublisher
+
+    yield
+
+    del app.swim_publisher_factory
+
+
+@pytest.fixture(scope='module')
+def uas_zone_context(benchmark_user):
+    uas_zones_data = DatasetGenerator(seed=SEED).uas_zones(1, first_index=9999998)
+    uas_zone = next(load_uas_zones(uas_zones_data, benchmark_user))
+
+    context = UASZoneContext(uas_zone=uas_zone, user=benchmark_user)
+    context.uas_zones_subscriptions = [
+        UASZonesSubscription(sm_subscription=GeofencingSMSubscription(topic_name=TOPIC_NAME))
+    ]
+
+    return context
+
+
+def _publish_in_worker(app, uas_zone_context: UASZoneContext, n_messages: int) -> None:
+    # the MongoDB connection of the parent process is not fork safe
+    disconnect()
+    connect(**app.config['MONGO'])
+
+    with app.app_context():
+        swim_publisher = get_swim_publisher()
+        swim_publisher.add_topic(topic_name=TOPIC_NAME,
+                                 message_producer=uas_zones_updates_message_producer)
+
+        for _ in range(n_messages):
+            publish_uas_zone_creation(uas_zone_context)
+
+        while swim_publisher.published < n_messages:
+            time.sleep(0.001)
+
+
+def _publish_in_workers(app, uas_zone_context: UASZoneContext, n_workers: int) -> None:
+    mp_context = multiprocessing.get_context('fork')
+    workers = [
+        mp_context.Process(target=_publish_in_worker,
+                           args=(app, uas_zone_context, MESSAGES_PER_WORKER))
+        for _ in range(n_workers)
+    ]
+
+    for worker in workers:
+        worker.start()
+
+    for worker in workers:
+        worker.join()
+        assert worker.exitcode == 0
+
+
+@pytest.mark.parametrize('n_workers', N_WORKERS)
+def test_publish_uas_zone_creation__throughput(benchmark, app, stub_swim_publisher_factory,
+                                               uas_zone_context, n_workers):
+    benchmark.pedantic(_publish_in_workers, args=(app, uas_zone_context, n_workers), rounds=3)
+
+    benchmark.extra_info['messages_per_second'] = \
+        n_workers * MESSAGES_PER_WORKER / benchmark.stats.stats.mean
@@ -0,0 +1,74 @@
+"""
+Copyright 2020 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+from typing import Callable, Dict, Type
+
+import pytest
+from marshmallow import Schema
+
+from geofencing_service.endpoints.reply import UASZoneFilterReply
+from geofencing_service.endpoints.schemas.db_schemas import UASZoneSchema, UASZonesFilterSchema
+from geofencing_service.endpoints.schemas.registry import get_schema
+from geofencing_service.endpoints.schemas.reply_schemas import UASZonesFilterReplySchema
+from benchmarks.utils import make_uas_zones_filter
+from tests.geofencing_service.utils import make_uas_zone, BASILIQUE_POLYGON
+
+__author__ = "EUROCONTROL (SWIM)"
+
+# how the endpoints used to get their schemas vs the shared instances of the registry
+SCHEMA_GETTERS: Dict[str, Callable[[Type[Schema]], Schema]] = {
+    'instance_per_request': lambda schema_class: schema_class(),
+    'registry': get_schema,
+}
+
+
+@pytest.fixture(params=SCHEMA_GETTERS.values(), ids=SCHEMA_GETTERS.keys())
+def get_schema_instance(request):
+    return request.param
+
+
+@pytest.fixture(scope='module')
+def uas_zone_data():
+    return UASZoneSchema().dump(make_uas_zone(BASILIQUE_POLYGON))
+
+
+def test_uas_zone_schema_load(benchmark, get_schema_instance, uas_zone_data):
+    benchmark(lambda: get_schema_instance(UASZoneSchema).load(uas_zone_data))
+
+
+def test_uas_zones_filter_schema_load(benchmark, get_schema_instance):
+    uas_zones_filter_data = UASZonesFilterSchema().dump(make_uas_zones_filter(BASILIQUE_POLYGON))
+
+    benchmark(lambda: get_schema_instance(UASZonesFilterSchema).load(uas_zones_filter_data))
+
+
+def test_uas_zones_filter_reply_schema_dump(benchmark, get_schema_instance):
+    reply = UASZoneFilterReply(uas_zones=[make_uas_zone(BASILIQUE_POLYGON)])
+
+    benchmark(lambda: get_schema_instance(UASZonesFilterReplySchema).dump(reply))
@@ -0,0 +1,59 @@
+"""
+Copyright 2020 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+import pytest
+
+from geofencing_service.db.uas_zones import create_uas_zone
+from geofencing_service.events.uas_zone_handlers import get_relevant_uas_zones_subscriptions, \
+    UASZoneContext
+from benchmarks.utils import SEED
+from provision.generate_dataset import DatasetGenerator, load_uas_zones
+
+__author__ = "EUROCONTROL (SWIM)"
+
+UAS_ZONES_SUBSCRIPTIONS_SIZES = [100, 1000, 10000]
+
+
+@pytest.fixture(scope='module')
+def uas_zone_context(benchmark_user):
+    # the index is far from the ones of the UASZones dataset in order to avoid collisions
+    uas_zones_data = DatasetGenerator(seed=SEED).uas_zones(1, first_index=9999999)
+    uas_zone = next(load_uas_zones(uas_zones_data, benchmark_user))
+    create_uas_zone(uas_zone)
+
+    return UASZoneContext(uas_zone=uas_zone, user=benchmark_user)
+
+
+@pytest.mark.parametrize('n_subscriptions', UAS_ZONES_SUBSCRIPTIONS_SIZES)
+def test_get_relevant_uas_zones_subscriptions(benchmark, requires_mongod,
+                                              uas_zones_subscriptions_dataset, uas_zone_context,
+                                              n_subscriptions):
+    uas_zones_subscriptions_dataset(n_subscriptions)
+
+    benchmark(get_relevant_uas_zones_subscriptions, uas_zone_context)
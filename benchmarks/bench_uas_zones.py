@@ -0,0 +1,76 @@
+"""
+Copyright 2020 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+import pytest
+
+from geofencing_service.db.uas_zones import get_uas_zones
+from geofencing_service.endpoints.schemas.db_schemas import UASZoneSchema
+from geofencing_service.endpoints.utils import circumscribed_polygon_from_circle
+from benchmarks.utils import make_uas_zones_filter
+from tests.geofencing_service.utils import make_uas_zone, BASILIQUE_POLYGON
+
+__author__ = "EUROCONTROL (SWIM)"
+
+UAS_ZONES_SIZES = [1000, 10000, 100000]
+
+# 1x1 degrees around Brussels
+FILTER_POLYGON = {
+    'type': 'Polygon',
+    'coordinates': [[
+        [3.85, 50.35],
+        [4.85, 50.35],
+        [4.85, 51.35],
+        [3.85, 51.35],
+        [3.85, 50.35]
+    ]]
+}
+
+
+@pytest.mark.parametrize('n_uas_zones', UAS_ZONES_SIZES)
+def test_get_uas_zones(benchmark, requires_mongod, uas_zones_dataset, n_uas_zones):
+    uas_zones_dataset(n_uas_zones)
+    uas_zones_filter = make_uas_zones_filter(FILTER_POLYGON)
+
+    benchmark(lambda: list(get_uas_zones(uas_zones_filter)))
+
+
+def test_uas_zone_schema__dump(benchmark):
+    uas_zone = make_uas_zone(BASILIQUE_POLYGON)
+
+    benchmark(lambda: UASZoneSchema().dump(uas_zone))
+
+
+def test_uas_zone_schema__load(benchmark):
+    data = UASZoneSchema().dump(make_uas_zone(BASILIQUE_POLYGON))
+
+    benchmark(lambda: UASZoneSchema().load(data))
+
+
+def test_circumscribed_polygon_from_circle(benchmark):
+    benchmark(circumscribed_polygon_from_circle, lon=4.329385, lat=50.863648, radius_in_m=1000)
@@ -0,0 +1,113 @@
+"""
+Copyright 2020 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+import math
+from typing import Any, Callable, Dict, Type
+
+import pytest
+from connexion.decorators.validation import Draft4RequestValidator
+from connexion.json_schema import resolve_refs
+from jsonschema import draft4_format_checker
+from marshmallow import Schema
+
+from geofencing_service.endpoints.schemas.db_schemas import UASZoneSchema, UASZonesFilterSchema
+from geofencing_service.endpoints.schemas.registry import get_schema
+from geofencing_service.endpoints.schemas.validation import request_body_validated
+from geofencing_service.openapi import load_openapi_spec
+from geofencing_service.request_validation import compile_request_body_validator
+from benchmarks.utils import make_uas_zones_filter
+from tests.geofencing_service.utils import make_uas_zone
+
+__author__ = "EUROCONTROL (SWIM)"
+
+POLYGON_SIZES = [100, 1000, 10000]
+
+
+def _make_polygon(vertices: int) -> Dict[str, Any]:
+    ring = [[4.3 + 0.01 * math.cos(2 * math.pi * i / vertices),
+             50.8 + 0.01 * math.sin(2 * math.pi * i / vertices)]
+            for i in range(vertices)]
+
+    return {'type': 'Polygon', 'coordinates': [ring + [ring[0]]]}
+
+
+def _validate_with_connexion(openapi_schema: Dict[str, Any],
+                             schema_class: Type[Schema]) -> Callable[[Dict[str, Any]], Any]:
+    validator = Draft4RequestValidator(openapi_schema, format_checker=draft4_format_checker)
+
+    def validate(data):
+        validator.validate(data)
+        return get_schema(schema_class).load(data)
+
+    return validate
+
+
+def _validate_in_single_pass(openapi_schema: Dict[str, Any],
+                             schema_class: Type[Schema]) -> Callable[[Dict[str, Any]], Any]:
+    validator = compile_request_body_validator(openapi_schema)
+
+    def validate(data):
+        validator(data)
+        with request_body_validated():
+            return get_schema(schema_class).load(data)
+
+    return validate
+
+
+VALIDATION_MODES = {
+    'connexion': _validate_with_connexion,
+    'single_pass': _validate_in_single_pass,
+}
+
+
+@pytest.fixture(scope='module')
+def openapi_schemas():
+    return resolve_refs(load_openapi_spec())['components']['schemas']
+
+
+@pytest.fixture(params=VALIDATION_MODES.values(), ids=VALIDATION_MODES.keys())
+def make_validate(request):
+    return request.param
+
+
+@pytest.mark.parametrize('polygon_size', POLYGON_SIZES)
+def test_uas_zones_filter_request_validation(benchmark, make_validate, openapi_schemas,
+                                             polygon_size):
+    data = UASZonesFilterSchema().dump(make_uas_zones_filter(_make_polygon(polygon_size)))
+    validate = make_validate(openapi_schemas['UASZonesFilterRequest'], UASZonesFilterSchema)
+
+    benchmark(validate, data)
+
+
+@pytest.mark.parametrize('polygon_size', POLYGON_SIZES)
+def test_uas_zone_request_validation(benchmark, make_validate, openapi_schemas, polygon_size):
+    data = UASZoneSchema().dump(make_uas_zone(_make_polygon(polygon_size)))
+    validate = make_validate(openapi_schemas['UASZone'], UASZoneSchema)
+
+    benchmark(validate, data)
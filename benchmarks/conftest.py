@@ -0,0 +1,120 @@
+"""
+Copyright 2020 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+from typing import Callable, Iterator
+
+import pytest
+from mongoengine import connection, Document
+from pkg_resources import resource_filename
+
+from geofencing_service.app import create_flask_app
+from geofencing_service.db.models import User
+from geofencing_service.db.users import create_user
+from benchmarks.utils import SEED, BENCHMARK_USER_PASS
+from provision.generate_dataset import DatasetGenerator, bulk_insert, load_uas_zones, \
+    load_uas_zones_subscriptions
+from tests.geofencing_service.utils import make_user
+
+__author__ = "EUROCONTROL (SWIM)"
+
+
+def pytest_addoption(parser):
+    parser.addoption('--max-dataset-size', type=int, default=100000,
+                     help='skip the benchmarks that require larger datasets')
+
+
+@pytest.fixture(scope='session')
+def app():
+    _app = create_flask_app(resource_filename(__name__, 'benchmark_config.yml'))
+
+    db = connection.get_db()
+    db.client.drop_database(db.name)
+
+    ctx = _app.app_context()
+    ctx.push()
+
+    yield _app
+
+    ctx.pop()
+
+
+@pytest.fixture(scope='session')
+def requires_mongod(app):
+    if app.config['MONGO']['host'].startswith('mongomock://'):
+        pytest.skip('geo queries are not supported by mongomock')
+
+
+@pytest.fixture(scope='session')
+def benchmark_user(app) -> User:
+    return create_user(make_user(password=BENCHMARK_USER_PASS))
+
+
+def _make_dataset_fixture(
+        generate_documents: Callable[[DatasetGenerator, int, int, User], Iterator[Document]]
+) -> Callable:
+    """
+    Creates a session fixture that tops up the generated documents in DB up to a requested size,
+    so that benchmarks parametrized with increasing sizes reuse the already inserted documents.
+
+    :param generate_documents: callable accepting the generator, the number of the already
+                               generated documents, the number of documents to generate and the
+                               user that owns them
+    :return:
+    """
+    @pytest.fixture(scope='session')
+    def fixture(request, app, benchmark_user):
+        generator = DatasetGenerator(seed=SEED)
+        max_size = request.config.getoption('--max-dataset-size')
+        inserted = 0
+
+        def top_up(size: int) -> None:
+            nonlocal inserted
+
+            if size > max_size:
+                pytest.skip(f'dataset size {size} exceeds --max-dataset-size')
+
+            if size > inserted:
+                bulk_insert(generate_documents(generator, inserted, size - inserted,
+                                               benchmark_user))
+                inserted = size
+
+        return top_up
+
+    return fixture
+
+
+uas_zones_dataset = _make_dataset_fixture(
+    lambda generator, first_index, n, user: load_uas_zones(
+        generator.uas_zones(n, first_index=first_index), user)
+)
+
+uas_zones_subscriptions_dataset = _make_dataset_fixture(
+    lambda generator, first_index, n, user: load_uas_zones_subscriptions(
+        generator.uas_zones_filters(n), user, generator.subscription_ids())
+)
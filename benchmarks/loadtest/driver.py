@@ -0,0 +1,337 @@
+"""
+Copyright 2020 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+import math
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, List, Optional, Iterator, Tuple, Callable, Any
+
+import requests
+import yaml
+from pkg_resources import resource_filename
+
+from geofencing_service import BASE_PATH
+
+__author__ = "EUROCONTROL (SWIM)"
+
+OPENAPI_FILE = resource_filename('geofencing_service', 'openapi.yml')
+
+# the share of each operation in the generated traffic. Deletions are not more frequent than
+# creations so that the pool of deletable resources does not run dry.
+DEFAULT_TRAFFIC_MIX = {
+    'filter_uas_zones': 0.55,
+    'get_uas_zones_vector_tile': 0.15,
+    'create_uas_zone': 0.05,
+    'delete_uas_zone': 0.04,
+    'get_subscriptions_to_uas_zones_updates': 0.05,
+    'get_subscription_to_uas_zones_updates': 0.06,
+    'create_subscription_to_uas_zones_updates': 0.04,
+    'update_subscription_to_uas_zones_updates': 0.03,
+    'delete_subscription_to_uas_zones_updates': 0.03,
+}
+
+VECTOR_TILES_ZOOM = 12
+
+PERCENTILES = (50, 95, 99)
+
+
+def get_operations(openapi_file: str = OPENAPI_FILE) -> Dict[str, Tuple[str, str, str]]:
+    """
+    Maps the endpoint function names to their (operationId, method, path) as defined in the
+    OpenAPI specification.
+
+    :param openapi_file:
+    :return:
+    """
+    with open(openapi_file) as f:
+        spec = yaml.safe_load(f)
+
+    return {
+        operation['operationId'].rsplit('.', 1)[-1]:
+            (operation['operationId'], method.upper(), path)
+        for path, path_item in spec['paths'].items()
+        for method, operation in path_item.items()
+    }
+
+
+def percentile(sorted_values: List[float], p: float) -> Optional[float]:
+    """
+    Nearest-rank percentile
+
+    :param sorted_values:
+    :param p: in [0, 100]
+    :return:
+    """
+    if not sorted_values:
+        return None
+
+    rank = max(math.ceil(p / 100 * len(sorted_values)), 1)
+
+    return sorted_values[rank - 1]
+
+
+class OperationStats:
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.errors = 0
+        self.statuses: Dict[int, int] = {}
+
+    def add(self, latency: float, status: Optional[int], ok: bool):
+        self.latencies.append(latency)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        if not ok:
+            self.errors += 1
+
+    def summary(self, duration: float) -> Dict[str, Any]:
+        """
+        :param duration: the duration of the run in seconds
+        :return: the latencies in ms and the throughput in requests per second
+        """
+        latencies = sorted(self.latencies)
+
+        result = {
+            'count': len(latencies),
+            'errors': self.errors,
+            'throughput': len(latencies) / duration if duration else 0,
+            'statuses': {str(status): count for status, count in self.statuses.items()},
+        }
+        for p in PERCENTILES:
+            value = percentile(latencies, p)
+            result[f'p{p}'] = value * 1000 if value is not None else None
+
+        return result
+
+
+def _lon_lat_to_tile(lon: float, lat: float, z: int) -> Tuple[int, int]:
+    n_tiles = 2 ** z
+    x = int((lon + 180) / 360 * n_tiles)
+    y = int((1 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2 * n_tiles)
+
+    return x, y
+
+
+class LoadDriver:
+
+    def __init__(self,
+                 base_url: str,
+                 auth: Tuple[str, str],
+                 uas_zones_filters: List[dict],
+                 new_uas_zones: Iterator[dict],
+                 traffic_mix: Optional[Dict[str, float]] = None,
+                 seed: int = 0,
+                 timeout: float = 30):
+        """
+        Generates a mixed traffic against a running geofencing service.
+
+        The UASZones and the subscriptions created during the run are kept aside so that the
+        follow-up get/update/delete requests target existing resources. When none is available
+        the corresponding creation is performed instead.
+
+        :param base_url: e.g. http://localhost:8000
+        :param auth: (username, password) used for basic authentication
+        :param uas_zones_filters: request bodies of the filter and subscription requests
+        :param new_uas_zones: request bodies of the creation requests
+        :param traffic_mix: weights of the endpoint functions to call
+        :param seed:
+        :param timeout: of each request in seconds
+        """
+        self._url = base_url.rstrip('/') + BASE_PATH
+        self._auth = auth
+        self._uas_zones_filters = uas_zones_filters
+        self._new_uas_zones = new_uas_zones
+        self._new_uas_zones_lock = threading.Lock()
+        self._timeout = timeout
+        self._rnd = random.Random(seed)
+        self._local = threading.local()
+
+        self._operations = get_operations()
+        traffic_mix = traffic_mix or DEFAULT_TRAFFIC_MIX
+        self._operation_names = list(traffic_mix)
+        self._operation_weights = list(traffic_mix.values())
+
+        self._uas_zones_identifiers = deque()
+        self._subscriptions_ids = deque()
+
+        self._requests_builders: Dict[str, Callable[[], Optional[Tuple[str, dict, Any]]]] = {
+            'filter_uas_zones': self._filter_uas_zones,
+            'get_uas_zones_vector_tile': self._get_uas_zones_vector_tile,
+            'create_uas_zone': self._create_uas_zone,
+            'delete_uas_zone': self._delete_uas_zone,
+            'get_subscriptions_to_uas_zones_updates': self._get_subscriptions,
+            'get_subscription_to_uas_zones_updates': self._get_subscription,
+            'create_subscription_to_uas_zones_updates': self._create_subscription,
+            'update_subscription_to_uas_zones_updates': self._update_subscription,
+            'delete_subscription_to_uas_zones_updates': self._delete_subscription,
+        }
+        self._fallbacks = {
+            'delete_uas_zone': 'create_uas_zone',
+            'get_subscription_to_uas_zones_updates': 'create_subscription_to_uas_zones_updates',
+            'update_subscription_to_uas_zones_updates': 'create_subscription_to_uas_zones_updates',
+            'delete_subscription_to_uas_zones_updates': 'create_subscription_to_uas_zones_updates',
+        }
+
+        self.stats: Dict[str, OperationStats] = {}
+        self._stats_lock = threading.Lock()
+
+    @property
+    def _session(self) -> requests.Session:
+        if not hasattr(self._local, 'session'):
+            self._local.session = requests.Session()
+            self._local.session.auth = self._auth
+
+        return self._local.session
+
+    def _random_filter(self) -> dict:
+        return self._uas_zones_filters[self._rnd.randrange(len(self._uas_zones_filters))]
+
+    def _pop(self, ids: deque) -> Optional[str]:
+        try:
+            return ids.popleft()
+        except IndexError:
+            return None
+
+    def _filter_uas_zones(self):
+        return {}, self._random_filter(), None
+
+    def _get_uas_zones_vector_tile(self):
+        horizontal_projection = self._random_filter()['airspaceVolume']['horizontalProjection']
+        lon, lat = horizontal_projection['coordinates'][0][0]
+        x, y = _lon_lat_to_tile(lon, lat, VECTOR_TILES_ZOOM)
+
+        return {'z': VECTOR_TILES_ZOOM, 'x': x, 'y': y}, None, None
+
+    def _create_uas_zone(self):
+        with self._new_uas_zones_lock:
+            uas_zone = next(self._new_uas_zones)
+
+        return {}, uas_zone, lambda _: self._uas_zones_identifiers.append(uas_zone['identifier'])
+
+    def _delete_uas_zone(self):
+        identifier = self._pop(self._uas_zones_identifiers)
+        if identifier is None:
+            return None
+
+        return {'uas_zone_identifier': identifier}, None, None
+
+    def _get_subscriptions(self):
+        return {}, None, None
+
+    def _get_subscription(self):
+        subscription_id = self._pop(self._subscriptions_ids)
+        if subscription_id is None:
+            return None
+
+        return ({'subscription_id': subscription_id}, None,
+                lambda _: self._subscriptions_ids.append(subscription_id))
+
+    def _create_subscription(self):
+        return ({}, self._random_filter(),
+                lambda response: self._subscriptions_ids.append(response.json()['subscriptionID']))
+
+    def _update_subscription(self):
+        subscription_id = self._pop(self._subscriptions_ids)
+        if subscription_id is None:
+            return None
+
+        return ({'subscription_id': subscription_id}, {'active': self._rnd.random() < 0.5},
+                lambda _: self._subscriptions_ids.append(subscription_id))
+
+    def _delete_subscription(self):
+        subscription_id = self._pop(self._subscriptions_ids)
+        if subscription_id is None:
+            return None
+
+        return {'subscription_id': subscription_id}, None, None
+
+    def _record(self, operation_id: str, latency: float, status: Optional[int], ok: bool):
+        with self._stats_lock:
+            self.stats.setdefault(operation_id, OperationStats()).add(latency, status, ok)
+
+    def _send(self, name: str, scheduled_at: float):
+        built = self._requests_builders[name]()
+        if built is None:
+            name = self._fallbacks[name]
+            built = self._requests_builders[name]()
+
+        path_params, body, on_success = built
+        operation_id, method, path = self._operations[name]
+
+        status = None
+        try:
+            response = self._session.request(method,
+                                             self._url + path.format(**path_params),
+                                             json=body,
+                                             timeout=self._timeout)
+            status = response.status_code
+            ok = response.ok
+            if ok and on_success is not None:
+                on_success(response)
+        except Exception:
+            ok = False
+
+        self._record(operation_id, time.perf_counter() - scheduled_at, status, ok)
+
+    def run(self, rate: float, duration: float, concurrency: int) -> float:
+        """
+        Sends requests at a constant `rate` for `duration` seconds. The arrival of the requests
+        does not depend on the responses (open loop) and latencies are measured from the time each
+        request was scheduled to be sent, so that the time spent waiting for a free connection
+        when the service cannot keep up is accounted for instead of silently lowering the rate.
+
+        :param rate: requests per second
+        :param duration: in seconds
+        :param concurrency: the maximum number of in-flight requests
+        :return: the actual duration of the run in seconds
+        """
+        n_requests = int(rate * duration)
+        names = self._rnd.choices(self._operation_names, self._operation_weights, k=n_requests)
+        futures = []
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            start = time.perf_counter()
+
+            for i, name in enumerate(names):
+                scheduled_at = start + i / rate
+                delay = scheduled_at - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+
+                futures.append(executor.submit(self._send, name, scheduled_at))
+
+            wait(futures)
+
+        return time.perf_counter() - start
+
+    def summary(self, duration: float) -> Dict[str, Dict[str, Any]]:
+        return {operation_id: stats.summary(duration)
+                for operation_id, stats in sorted(self.stats.items())}
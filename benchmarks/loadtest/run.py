@@ -0,0 +1,222 @@
+"""
+Copyright 2020 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, Any, NamedTuple
+
+import requests
+from mongoengine import connect, connection, disconnect
+from swim_backend.config import load_app_config
+
+from geofencing_service import BASE_PATH
+from geofencing_service.db.models import User
+from geofencing_service.db.users import create_user
+from benchmarks.loadtest.driver import LoadDriver, PERCENTILES
+from benchmarks.loadtest.stub_app import LOADTEST_CONFIG_FILE
+from provision.generate_dataset import DatasetGenerator, bulk_insert, load_uas_zones, \
+    load_uas_zones_subscriptions
+
+__author__ = "EUROCONTROL (SWIM)"
+
+_logger = logging.getLogger(__name__)
+
+STUB_APP = 'benchmarks.loadtest.stub_app:create_app()'
+
+# the identifiers of the UASZones created during the run start after the ones of the dataset
+NEW_UAS_ZONES_FIRST_INDEX = 5000000
+
+SERVER_STARTUP_TIMEOUT = 60
+
+
+class ServerConfig(NamedTuple):
+    worker_class: str
+    workers: int
+    threads: int
+
+    @classmethod
+    def parse(cls, value: str) -> 'ServerConfig':
+        """
+        :param value: <worker_class>:<workers>:<threads>, i.e. sync:4:1, gthread:4:8, gevent:4:1
+        :return:
+        """
+        worker_class, workers, threads = value.split(':')
+
+        return cls(worker_class, int(workers), int(threads))
+
+    def __str__(self):
+        return f'{self.worker_class}:{self.workers}:{self.threads}'
+
+
+def populate_db(config: Dict[str, Any], n_uas_zones: int, n_subscriptions: int, seed: int) \
+        -> DatasetGenerator:
+    """
+    Resets the DB of the stubbed app and inserts a synthetic dataset owned by the load test user.
+
+    :return: the generator of the dataset to be used for generating the traffic
+    """
+    connect(**config['MONGO'])
+    db = connection.get_db()
+    db.client.drop_database(db.name)
+
+    user = create_user(User(username=config['LOADTEST_USER']['username'],
+                            password=config['LOADTEST_USER']['password']))
+
+    generator = DatasetGenerator(seed=seed)
+    bulk_insert(load_uas_zones(generator.uas_zones(n_uas_zones), user))
+    bulk_insert(load_uas_zones_subscriptions(generator.uas_zones_filters(n_subscriptions), user,
+                                             generator.subscription_ids()))
+
+    disconnect()
+
+    return generator
+
+
+def start_server(server_config: ServerConfig, bind: str) -> subprocess.Popen:
+    return subprocess.Popen([
+        sys.executable, '-m', 'gunicorn',
+        '--worker-class', server_config.worker_class,
+        '--workers', str(server_config.workers),
+        '--threads', str(server_config.threads),
+        '--bind', bind,
+        STUB_APP
+    ])
+
+
+def wait_for_server(base_url: str, auth, timeout: float = SERVER_STARTUP_TIMEOUT):
+    deadline = time.monotonic() + timeout
+
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(f'{base_url}{BASE_PATH}/ping-credentials', auth=auth).ok:
+                return
+        except requests.ConnectionError:
+            pass
+
+        time.sleep(0.5)
+
+    raise TimeoutError(f'server did not start within {timeout} seconds')
+
+
+def stop_server(server: subprocess.Popen):
+    server.terminate()
+    server.wait()
+
+
+def run_config(server_config: ServerConfig, args: argparse.Namespace, config: Dict[str, Any]) \
+        -> Dict[str, Dict[str, Any]]:
+    generator = populate_db(config, args.uas_zones, args.subscriptions, args.seed)
+
+    base_url = f'http://{args.bind}'
+    auth = (config['LOADTEST_USER']['username'], config['LOADTEST_USER']['password'])
+
+    driver = LoadDriver(
+        base_url=base_url,
+        auth=auth,
+        uas_zones_filters=list(generator.uas_zones_filters(args.filters)),
+        new_uas_zones=generator.uas_zones(sys.maxsize, first_index=NEW_UAS_ZONES_FIRST_INDEX),
+        seed=args.seed
+    )
+
+    server = start_server(server_config, args.bind)
+    try:
+        wait_for_server(base_url, auth)
+        duration = driver.run(rate=args.rate, duration=args.duration,
+                              concurrency=args.concurrency)
+    finally:
+        stop_server(server)
+
+    return driver.summary(duration)
+
+
+def print_results(results: Dict[str, Dict[str, Dict[str, Any]]]):
+    columns = ['count', 'errors', 'throughput'] + [f'p{p}' for p in PERCENTILES]
+    header = f'{"config":<16}{"operation":<48}' + ''.join(f'{column:>12}' for column in columns)
+
+    print(header)
+    print('-' * len(header))
+
+    for server_config, summary in results.items():
+        for operation_id, stats in summary.items():
+            values = ''.join(
+                f'{"-":>12}' if stats[column] is None else
+                f'{stats[column]:>12.1f}' if isinstance(stats[column], float) else
+                f'{stats[column]:>12}'
+                for column in columns
+            )
+            print(f'{server_config:<16}{operation_id.rsplit(".", 1)[-1]:<48}{values}')
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(
+        description='Load tests the geofencing service under gunicorn with a stubbed broker and '
+                    'Subscription Manager. The latencies are reported in ms and the throughput '
+                    'in requests per second.')
+    parser.add_argument('--configs', nargs='+', type=ServerConfig.parse,
+                        default=[ServerConfig.parse('sync:4:1'), ServerConfig.parse('gthread:4:8')],
+                        help='gunicorn configurations to compare as <worker_class>:<workers>:'
+                             '<threads>, i.e. sync:4:1 gthread:4:8 gevent:4:1')
+    parser.add_argument('--rate', type=float, default=50, help='requests per second')
+    parser.add_argument('--duration', type=float, default=60, help='in seconds')
+    parser.add_argument('--concurrency', type=int, default=64,
+                        help='maximum number of in-flight requests')
+    parser.add_argument('--uas-zones', type=int, default=10000,
+                        help='number of UASZones in DB')
+    parser.add_argument('--subscriptions', type=int, default=1000,
+                        help='number of UASZonesFilter subscriptions in DB')
+    parser.add_argument('--filters', type=int, default=1000,
+                        help='number of distinct UASZonesFilters used in the requests')
+    parser.add_argument('--seed', type=int, default=2020)
+    parser.add_argument('--bind', default='127.0.0.1:8000')
+    parser.add_argument('--output', help='writes the results in this JSON file')
+
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    args = _parse_args()
+    config = load_app_config(LOADTEST_CONFIG_FILE)
+
+    results = {}
+    for server_config in args.configs:
+        _logger.info(f'Running {server_config}')
+        results[str(server_config)] = run_config(server_config, args, config)
+
+    print_results(results)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
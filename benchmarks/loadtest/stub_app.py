@@ -0,0 +1,67 @@
+"""
+Copyright 2020 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+from flask import Flask
+from pkg_resources import resource_filename
+
+from geofencing_service.app import create_flask_app
+from geofencing_service.db.models import User
+from geofencing_service.db.users import get_user_by_username, create_user
+from geofencing_service.events import uas_zones_subscription_handlers
+from geofencing_service.publisher import start_swim_publisher
+from benchmarks.loadtest.stubs import StubSWIMPublisher, StubSubscriptionManagerClient
+
+__author__ = "EUROCONTROL (SWIM)"
+
+LOADTEST_CONFIG_FILE = resource_filename(__name__, 'loadtest_config.yml')
+
+
+def create_app() -> Flask:
+    """
+    Creates the app with a stubbed SWIMPublisher and Subscription Manager. It is meant to be run
+    by gunicorn:
+
+        gunicorn 'benchmarks.loadtest.stub_app:create_app()'
+
+    :return:
+    """
+    app = create_flask_app(LOADTEST_CONFIG_FILE)
+
+    app.swim_publisher_factory = StubSWIMPublisher
+    start_swim_publisher(app)
+
+    uas_zones_subscription_handlers.sm_client = StubSubscriptionManagerClient(
+        latency_in_ms=app.config['SUBSCRIPTION-MANAGER-STUB']['LATENCY_MS']
+    )
+
+    user_config = app.config['LOADTEST_USER']
+    if get_user_by_username(user_config['username']) is None:
+        create_user(User(username=user_config['username'], password=user_config['password']))
+
+    return app
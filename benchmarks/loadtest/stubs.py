@@ -0,0 +1,143 @@
+"""
+Copyright 2020 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+import itertools
+import logging
+import queue
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, Any
+
+from subscription_manager_client.models import Subscription as SMSubscription, Topic as SMTopic
+
+__author__ = "EUROCONTROL (SWIM)"
+
+_logger = logging.getLogger(__name__)
+
+
+class StubSWIMPublisher:
+
+    def __init__(self):
+        """
+        Stands in for the SWIMPublisher without a broker. The messages of the published topics are
+        still produced (and discarded) in a background thread like the real publisher does, so that
+        their cost is taken into account.
+        """
+        self._message_producers: Dict[str, Callable] = {}
+        self._queue: queue.Queue = queue.Queue()
+        self.published = 0
+
+    def run(self, threaded: bool = True):
+        threading.Thread(target=self._produce_messages, daemon=True).start()
+
+    def _produce_messages(self):
+        while True:
+            message_producer, context = self._queue.get()
+            try:
+                message_producer(context)
+                self.published += 1
+            except Exception as e:
+                _logger.error(f'Error while producing message: {str(e)}')
+
+    def add_topic(self, topic_name: str, message_producer: Callable):
+        self._message_producers[topic_name] = message_producer
+
+    def preload_topic_message_producer(self, topic_name: str, message_producer: Callable):
+        self._message_producers[topic_name] = message_producer
+
+    def publish_topic(self, topic_name: str, context: Any):
+        message_producer = self._message_producers.get(topic_name)
+
+        if message_producer is not None:
+            self._queue.put((message_producer, context))
+
+
+class StubSubscriptionManagerClient:
+
+    def __init__(self, latency_in_ms: float = 0):
+        """
+        Stands in for the SubscriptionManagerClient. Topics and subscriptions are kept in memory and
+        every call sleeps for `latency_in_ms` in order to emulate the round trip to the actual
+        Subscription Manager. The memory is not shared by the gunicorn workers, so the calls on
+        subscriptions created by another worker (or before a restart) are accepted as no-ops.
+
+        :param latency_in_ms:
+        """
+        self._latency = latency_in_ms / 1000
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._topics: List[SMTopic] = []
+        self._subscriptions: Dict[int, SMSubscription] = {}
+
+    def _wait(self):
+        if self._latency:
+            time.sleep(self._latency)
+
+    def get_topics(self) -> List[SMTopic]:
+        self._wait()
+
+        with self._lock:
+            return list(self._topics)
+
+    def post_topic(self, topic: SMTopic) -> SMTopic:
+        self._wait()
+
+        with self._lock:
+            topic.id = next(self._ids)
+            self._topics.append(topic)
+
+        return topic
+
+    def post_subscription(self, subscription: SMSubscription) -> SMSubscription:
+        self._wait()
+
+        with self._lock:
+            subscription.id = next(self._ids)
+            subscription.queue = uuid.uuid4().hex
+            self._subscriptions[subscription.id] = subscription
+
+        return subscription
+
+    def put_subscription(self, subscription_id: int, subscription_data: Dict[str, Any]):
+        self._wait()
+
+        with self._lock:
+            subscription = self._subscriptions.get(subscription_id)
+            if subscription is None:
+                return
+
+            for key, value in subscription_data.items():
+                setattr(subscription, key, value)
+
+    def delete_subscription_by_id(self, subscription_id: int):
+        self._wait()
+
+        with self._lock:
+            self._subscriptions.pop(subscription_id, None)
@@ -0,0 +1,62 @@
+"""
+Copyright 2020 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+from geofencing_service.db import AIRSPACE_VOLUME_UPPER_LIMIT, AIRSPACE_VOLUME_LOWER_LIMIT
+from geofencing_service.db.models import UASZonesFilter, AirspaceVolume, UomDistance, \
+    CodeVerticalReferenceType
+from provision.generate_dataset import N_REGIONS, APPLICABILITY_START, APPLICABILITY_END
+
+__author__ = "EUROCONTROL (SWIM)"
+
+# the datasets are generated with a fixed seed so that results are comparable between runs
+SEED = 2020
+
+BENCHMARK_USER_PASS = 'password'
+
+
+def make_uas_zones_filter(polygon: dict) -> UASZonesFilter:
+    """
+    Creates a filter that matches all the generated UASZones intersecting the given polygon.
+
+    :param polygon:
+    :return:
+    """
+    return UASZonesFilter(
+        airspace_volume=AirspaceVolume(
+            horizontal_projection=polygon,
+            uom_dimensions=UomDistance.METERS.value,
+            upper_limit=AIRSPACE_VOLUME_UPPER_LIMIT,
+            lower_limit=AIRSPACE_VOLUME_LOWER_LIMIT,
+            upper_vertical_reference=CodeVerticalReferenceType.AMSL.value,
+            lower_vertical_reference=CodeVerticalReferenceType.AMSL.value
+        ),
+        regions=list(range(N_REGIONS)),
+        start_date_time=APPLICABILITY_START,
+        end_date_time=APPLICABILITY_END
+    )
@@ -0,0 +1,220 @@
+"""
+Copyright 2020 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial, wraps
+from typing import List, Dict, Any, Callable, Optional
+from urllib.parse import urlparse
+
+import fastjsonschema
+from connexion.json_schema import resolve_refs
+from flask import Flask
+from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Route
+
+from geofencing_service.aio import endpoints
+from geofencing_service.aio.auth import basic_auth
+from geofencing_service.aio.db import create_motor_db
+from geofencing_service.aio.reply import make_nok_response, get_json
+from geofencing_service.app import create_flask_app
+from geofencing_service.encoding import JSON_MIMETYPE
+from geofencing_service.endpoints.schemas.validation import request_body_validated
+from geofencing_service.metrics import get_registry
+from geofencing_service.openapi import load_openapi_spec, OPENAPI_CACHE_DIR
+from geofencing_service.request_validation import compile_request_body_validator
+
+__author__ = "EUROCONTROL (SWIM)"
+
+_logger = logging.getLogger(__name__)
+
+# the size of the thread pool running the blocking parts of the requests (event handlers, tile
+# rendering, password hashing)
+EXECUTOR_MAX_WORKERS = 32
+
+HTTP_METHODS = ('get', 'put', 'post', 'delete', 'patch')
+
+# the convertors of the path parameters per OpenAPI type
+_PATH_PARAM_CONVERTORS = {
+    'integer': 'int',
+    'number': 'float',
+}
+
+
+def _get_route_path(base_path: str, path: str, parameters: List[Dict[str, Any]]) -> str:
+    for parameter in parameters:
+        convertor = _PATH_PARAM_CONVERTORS.get(parameter.get('schema', {}).get('type'))
+
+        if parameter['in'] == 'path' and convertor is not None:
+            path = path.replace(f"{{{parameter['name']}}}", f"{{{parameter['name']}:{convertor}}}")
+
+    return base_path + path
+
+
+def _authenticated(handler: Callable) -> Callable:
+    @wraps(handler)
+    async def wrapper(request: Request) -> Response:
+        request.state.user = await basic_auth(request)
+
+        if request.state.user is None:
+            response = make_nok_response(request, 'Invalid credentials', 401)
+            response.headers['WWW-Authenticate'] = 'Basic realm="Geofencing"'
+            return response
+
+        return await handler(request)
+
+    return wrapper
+
+
+def _validated_body(handler: Callable, validator: Callable[[Any], Any]) -> Callable:
+    @wraps(handler)
+    async def wrapper(request: Request) -> Response:
+        try:
+            validator(await get_json(request))
+        except fastjsonschema.JsonSchemaException as e:
+            _logger.error(f"{request.url.path} validation error: {e.message}",
+                          extra={'validator': 'body'})
+            return make_nok_response(request, e.message, 400)
+
+        with request_body_validated():
+            return await handler(request)
+
+    return wrapper
+
+
+def _get_request_body_schema(operation: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    return operation.get('requestBody', {}).get('content', {}).get(JSON_MIMETYPE, {}).get('schema')
+
+
+def get_routes(spec: Dict[str, Any]) -> List[Route]:
+    """
+    Creates a route per operation of the OpenAPI spec, served by the homonymous handler of
+    geofencing_service.aio.endpoints. The JSON request bodies are validated against their schemas
+    in the spec before reaching the handlers, in the same way as in the `single_pass` request
+    validation mode of the Flask app, so that both apps accept the same requests.
+
+    :param spec:
+    :return:
+    """
+    spec = resolve_refs(spec)
+    base_path = urlparse(spec['servers'][0]['url']).path.rstrip('/')
+    default_security = spec.get('security', [])
+    routes = []
+
+    for path, path_item in spec['paths'].items():
+        for method, operation in path_item.items():
+            if method not in HTTP_METHODS:
+                continue
+
+            handler = getattr(endpoints, operation['operationId'].rsplit('.', 1)[-1])
+
+            request_body_schema = _get_request_body_schema(operation)
+            if request_body_schema is not None:
+                handler = _validated_body(handler,
+                                          compile_request_body_validator(request_body_schema))
+
+            if operation.get('security', default_security):
+                handler = _authenticated(handler)
+
+            parameters = path_item.get('parameters', []) + operation.get('parameters', [])
+
+            routes.append(Route(_get_route_path(base_path, path, parameters),
+                                handler,
+                                methods=[method.upper()]))
+
+    return routes
+
+
+async def metrics(request: Request) -> Response:
+    """
+    GET /metrics
+
+    :param request:
+    :return:
+    """
+    return Response(generate_latest(get_registry()), headers={'Content-Type': CONTENT_TYPE_LATEST})
+
+
+def _call_in_app_context(flask_app: Flask, func: Callable, *args, **kwargs) -> Any:
+    with flask_app.app_context():
+        return func(*args, **kwargs)
+
+
+def create_asgi_app(config_file: str, flask_app: Flask = None) -> Starlette:
+    """
+    Creates the ASGI app serving the operations of openapi.yml with async handlers. The Flask app
+    is still created as it provides the configuration, the mongoengine connection and the
+    SWIMPublisher to the event handlers that run in the executor.
+
+    :param config_file:
+    :param flask_app: created from config_file if not provided
+    :return:
+    """
+    flask_app = flask_app or create_flask_app(config_file)
+    config = flask_app.config.get('ASGI', {})
+
+    openapi_config = flask_app.config.get('OPENAPI', {})
+    routes = get_routes(load_openapi_spec(cache_dir=openapi_config.get('CACHE_DIR',
+                                                                       OPENAPI_CACHE_DIR)))
+    if flask_app.config.get('METRICS', {}).get('ENABLED', False):
+        routes.append(Route('/metrics', metrics, methods=['GET']))
+
+    executor = ThreadPoolExecutor(
+        max_workers=config.get('EXECUTOR_MAX_WORKERS', EXECUTOR_MAX_WORKERS),
+        thread_name_prefix='geofencing-executor'
+    )
+
+    async def run_in_executor(func: Callable, *args, **kwargs) -> Any:
+        return await asyncio.get_event_loop().run_in_executor(executor,
+                                                              partial(func, *args, **kwargs))
+
+    async def run_in_app_context(func: Callable, *args, **kwargs) -> Any:
+        return await run_in_executor(_call_in_app_context, flask_app, func, *args, **kwargs)
+
+    @asynccontextmanager
+    async def lifespan(_app: Starlette):
+        yield
+
+        executor.shutdown(wait=True)
+        _app.state.db.client.close()
+
+    app = Starlette(routes=routes, debug=flask_app.config.get('DEBUG', False), lifespan=lifespan)
+
+    app.state.config = flask_app.config
+    app.state.flask_app = flask_app
+    app.state.db = create_motor_db(flask_app.config['MONGO'])
+    app.state.run_in_executor = run_in_executor
+    app.state.run_in_app_context = run_in_app_context
+
+    return app
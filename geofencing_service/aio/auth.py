@@ -0,0 +1,86 @@
+"""
+Copyright 2020 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+import base64
+import binascii
+from typing import Optional, Tuple
+
+from starlette.requests import Request
+from werkzeug.security import check_password_hash
+
+from geofencing_service.aio.db import get_user_by_username
+from geofencing_service.db.models import User
+from geofencing_service.metrics import timer, AUTH_LATENCY
+
+__author__ = "EUROCONTROL (SWIM)"
+
+
+def get_basic_auth_credentials(authorization: Optional[str]) -> Optional[Tuple[str, str]]:
+    """
+    :param authorization: the value of the Authorization header
+    :return: (username, password) or None if the header does not carry basic credentials
+    """
+    if not authorization:
+        return None
+
+    scheme, _, credentials = authorization.partition(' ')
+    if scheme.lower() != 'basic':
+        return None
+
+    try:
+        username, separator, password = base64.b64decode(credentials).decode().partition(':')
+    except (binascii.Error, UnicodeDecodeError):
+        return None
+
+    return (username, password) if separator else None
+
+
+async def basic_auth(request: Request) -> Optional[User]:
+    """
+    The async counterpart of geofencing_service.auth.basic_auth. The password hash is checked in
+    the executor since it is CPU bound.
+
+    :param request:
+    :return: the authenticated user or None if the credentials are invalid
+    """
+    credentials = get_basic_auth_credentials(request.headers.get('Authorization'))
+    if credentials is None:
+        return None
+
+    username, password = credentials
+
+    with timer(AUTH_LATENCY):
+        user = await get_user_by_username(request.app.state.db, username)
+
+        if user is None or not await request.app.state.run_in_executor(check_password_hash,
+                                                                        user.password,
+                                                                        password):
+            return None
+
+    return user
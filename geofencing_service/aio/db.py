@@ -0,0 +1,186 @@
+"""
+Copyright 2020 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+from typing import Optional, List, Dict, Any, Type
+
+from mongoengine import Document, Q
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+
+from geofencing_service.db.models import UASZone, User, UASZonesFilter, UASZonesVersion, \
+    UASZonesSubscription, AirspaceVolume
+from geofencing_service.db.uas_zones import get_uas_zones_query, UAS_ZONES_VERSION_ID
+from geofencing_service.metrics import timer, DB_LATENCY
+
+__author__ = "EUROCONTROL (SWIM)"
+
+# the connection settings of mongoengine.connect and their pymongo counterparts
+_MONGO_CLIENT_OPTIONS = {
+    'host': 'host',
+    'port': 'port',
+    'username': 'username',
+    'password': 'password',
+    'authentication_source': 'authSource',
+}
+
+# the raw queries address the fields by their name in DB
+SIMPLIFIED_PROJECTIONS_DB_FIELD = \
+    f'{UASZone.geometry.db_field}.{AirspaceVolume.simplified_projections.db_field}'
+
+
+def create_motor_db(mongo_config: Dict[str, Any]) -> AsyncIOMotorDatabase:
+    """
+    Creates a motor database from the same MONGO configuration that is passed to
+    mongoengine.connect
+
+    :param mongo_config:
+    :return:
+    """
+    client = AsyncIOMotorClient(**{
+        option: mongo_config[key]
+        for key, option in _MONGO_CLIENT_OPTIONS.items() if key in mongo_config
+    })
+
+    return client[mongo_config['db']]
+
+
+def _get_collection(db: AsyncIOMotorDatabase, document_class: Type[Document]):
+    return db[document_class._get_collection_name()]
+
+
+async def _find(db: AsyncIOMotorDatabase,
+                document_class: Type[Document],
+                query: Q,
+                projection: Optional[Dict[str, Any]] = None) -> List[Document]:
+    cursor = _get_collection(db, document_class).find(query.to_query(document_class),
+                                                        projection=projection)
+
+    return [document_class._from_son(son) for son in await cursor.to_list(length=None)]
+
+
+async def _find_one(db: AsyncIOMotorDatabase,
+                    document_class: Type[Document],
+                    query: Q) -> Optional[Document]:
+    son = await _get_collection(db, document_class).find_one(query.to_query(document_class))
+
+    return document_class._from_son(son) if son is not None else None
+
+
+async def get_user_by_username(db: AsyncIOMotorDatabase, username: str) -> Optional[User]:
+    """
+    :param db:
+    :param username:
+    :return:
+    """
+    with timer(DB_LATENCY, 'get_user_by_username'):
+        users = await _find(db, User, Q(username=username))
+
+    return users[0] if len(users) == 1 else None
+
+
+async def get_uas_zones(db: AsyncIOMotorDatabase,
+                        uas_zones_filter: UASZonesFilter,
+                        user: Optional[User] = None,
+                        with_simplified_projections: bool = False) -> List[UASZone]:
+    """
+    The async counterpart of geofencing_service.db.uas_zones.get_uas_zones
+
+    :param db:
+    :param uas_zones_filter:
+    :param user:
+    :param with_simplified_projections:
+    :return:
+    """
+    projection = None if with_simplified_projections \
+        else {SIMPLIFIED_PROJECTIONS_DB_FIELD: False}
+
+    with timer(DB_LATENCY, 'get_uas_zones'):
+        return await _find(db, UASZone, get_uas_zones_query(uas_zones_filter, user=user),
+                           projection=projection)
+
+
+async def get_uas_zones_by_identifier(db: AsyncIOMotorDatabase,
+                                      uas_zone_identifier: str,
+                                      user: Optional[User] = None) -> Optional[UASZone]:
+    """
+    :param db:
+    :param uas_zone_identifier:
+    :param user:
+    :return:
+    """
+    query = Q(identifier=uas_zone_identifier)
+
+    if user is not None:
+        query &= Q(user=user)
+
+    with timer(DB_LATENCY, 'get_uas_zones_by_identifier'):
+        return await _find_one(db, UASZone, query)
+
+
+async def get_uas_zones_version(db: AsyncIOMotorDatabase) -> int:
+    """
+    :param db:
+    :return:
+    """
+    with timer(DB_LATENCY, 'get_uas_zones_version'):
+        uas_zones_version = await _find_one(db, UASZonesVersion, Q(id=UAS_ZONES_VERSION_ID))
+
+    return uas_zones_version.version if uas_zones_version is not None else 0
+
+
+async def get_uas_zones_subscriptions(db: AsyncIOMotorDatabase,
+                                      user: Optional[User] = None) \
+        -> List[UASZonesSubscription]:
+    """
+    :param db:
+    :param user:
+    :return:
+    """
+    query = Q(user=user) if user is not None else Q()
+
+    with timer(DB_LATENCY, 'get_uas_zones_subscriptions'):
+        return await _find(db, UASZonesSubscription, query)
+
+
+async def get_uas_zones_subscription_by_id(db: AsyncIOMotorDatabase,
+                                           subscription_id: str,
+                                           user: Optional[User] = None) \
+        -> Optional[UASZonesSubscription]:
+    """
+    :param db:
+    :param subscription_id:
+    :param user:
+    :return:
+    """
+    query = Q(id=subscription_id)
+
+    if user is not None:
+        query &= Q(user=user)
+
+    with timer(DB_LATENCY, 'get_uas_zones_subscription_by_id'):
+        return await _find_one(db, UASZonesSubscription, query)
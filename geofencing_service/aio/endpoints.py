@@ -0,0 +1,285 @@
+"""
+Copyright 2020 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+from typing import Tuple
+
+from marshmallow import ValidationError
+from starlette.requests import Request
+from starlette.responses import Response, JSONResponse
+from swim_backend.errors import BadRequestError, NotFoundError
+
+from geofencing_service.aio import db
+from geofencing_service.aio.reply import handle_response, get_json, make_nok_response
+from geofencing_service.endpoints.helpers import reduce_uas_zones_geometry, \
+    create_uas_zones_subscription, get_uas_zones_subscription_reply_object
+from geofencing_service.endpoints.reply import UASZoneFilterReply, UASZoneCreateReply, Reply, \
+    GenericReply, RequestStatus, SubscribeToUASZonesUpdatesReply, UASZoneSubscriptionReply, \
+    UASZoneSubscriptionsReply
+from geofencing_service.endpoints.schemas.db_schemas import UASZoneSchema, UASZonesFilterSchema, \
+    UASZonesFilterOptionsSchema, SubscriptionSchema
+from geofencing_service.endpoints.schemas.registry import get_schema
+from geofencing_service.endpoints.schemas.reply_schemas import UASZonesFilterReplySchema, \
+    UASZoneCreateReplySchema, ReplySchema, SubscribeToUASZonesUpdatesReplySchema, \
+    UASZoneSubscriptionReplySchema, UASZoneSubscriptionsReplySchema
+from geofencing_service.endpoints.subscriptions import IDEMPOTENCY_KEY_HEADER
+from geofencing_service.endpoints.uas_zones import MVT_MIMETYPE
+from geofencing_service.endpoints.vector_tiles import is_valid_tile, get_vector_tile
+from geofencing_service.events import events
+from geofencing_service.events.uas_zone_handlers import UASZoneContext
+from geofencing_service.events.uas_zones_subscription_handlers import \
+    UASZonesSubscriptionCreateContext, UASZonesSubscriptionUpdateContext
+from geofencing_service.metrics import UAS_ZONES_RETURNED
+
+__author__ = "EUROCONTROL (SWIM)"
+
+# The async counterparts of the operations of openapi.yml. The DB reads are done with motor. The
+# events, whose handlers use mongoengine, the Subscription Manager client and the broker publisher,
+# are handled in the executor within the Flask app context.
+
+
+async def _load(schema, request: Request):
+    try:
+        return get_schema(schema).load(await get_json(request))
+    except ValidationError as e:
+        raise BadRequestError(str(e))
+
+
+async def ping_credentials(request: Request) -> Response:
+    return JSONResponse({}, status_code=200)
+
+
+@handle_response(UASZonesFilterReplySchema)
+async def filter_uas_zones(request: Request) -> Tuple[UASZoneFilterReply, int]:
+    """
+    POST /uas_zones/filter
+
+    :param request:
+    :return:
+    """
+    uas_zones_filter = await _load(UASZonesFilterSchema, request)
+    filter_options = await _load(UASZonesFilterOptionsSchema, request)
+
+    simplify_tolerance_meters = filter_options.get('simplify_tolerance_meters')
+    coordinate_precision = filter_options.get('coordinate_precision')
+
+    uas_zones = await db.get_uas_zones(
+        request.app.state.db,
+        uas_zones_filter,
+        user=request.state.user,
+        with_simplified_projections=simplify_tolerance_meters is not None
+    )
+
+    UAS_ZONES_RETURNED.observe(len(uas_zones))
+
+    if simplify_tolerance_meters is not None or coordinate_precision is not None:
+        uas_zones = reduce_uas_zones_geometry(uas_zones,
+                                              simplify_tolerance_meters=simplify_tolerance_meters,
+                                              coordinate_precision=coordinate_precision)
+
+    return UASZoneFilterReply(uas_zones=uas_zones), 200
+
+
+@handle_response(UASZoneCreateReplySchema)
+async def create_uas_zone(request: Request) -> Tuple[UASZoneCreateReply, int]:
+    """
+    POST /uas_zones/
+
+    :param request:
+    :return:
+    """
+    uas_zone = await _load(UASZoneSchema, request)
+
+    context = await request.app.state.run_in_app_context(
+        events.create_uas_zone_event.handle,
+        context=UASZoneContext(uas_zone=uas_zone, user=request.state.user)
+    )
+
+    return UASZoneCreateReply(uas_zone=context.uas_zone), 201
+
+
+@handle_response(ReplySchema)
+async def delete_uas_zone(request: Request) -> Tuple[Reply, int]:
+    """
+    DELETE /uas_zones/{uas_zone_identifier}
+
+    :param request:
+    :return:
+    """
+    uas_zone_identifier = request.path_params['uas_zone_identifier']
+
+    uas_zone = await db.get_uas_zones_by_identifier(request.app.state.db,
+                                                    uas_zone_identifier,
+                                                    user=request.state.user)
+
+    if uas_zone is None:
+        raise NotFoundError(f"UASZone with identifier '{uas_zone_identifier}' does not exist")
+
+    await request.app.state.run_in_app_context(
+        events.delete_uas_zone_event.handle,
+        context=UASZoneContext(uas_zone=uas_zone, user=request.state.user)
+    )
+
+    return Reply(generic_reply=GenericReply(request_status=RequestStatus.OK.value)), 204
+
+
+async def get_uas_zones_vector_tile(request: Request) -> Response:
+    """
+    GET /uas_zones/tiles/{z}/{x}/{y}
+
+    :param request:
+    :return:
+    """
+    z, x, y = (request.path_params[param] for param in ('z', 'x', 'y'))
+
+    if not is_valid_tile(z, x, y):
+        return make_nok_response(request, f"Invalid tile {z}/{x}/{y}", 400)
+
+    uas_zones_version = await db.get_uas_zones_version(request.app.state.db)
+
+    # the rendering is CPU bound and cached per version
+    tile = await request.app.state.run_in_app_context(get_vector_tile, request.state.user.id,
+                                                      uas_zones_version, z, x, y)
+
+    return Response(tile, status_code=200, media_type=MVT_MIMETYPE)
+
+
+@handle_response(SubscribeToUASZonesUpdatesReplySchema)
+async def create_subscription_to_uas_zones_updates(request: Request) \
+        -> Tuple[SubscribeToUASZonesUpdatesReply, int]:
+    """
+    POST /subscriptions/
+
+    :param request:
+    :return:
+    """
+    uas_zones_filter = await _load(UASZonesFilterSchema, request)
+
+    context = await request.app.state.run_in_app_context(
+        create_uas_zones_subscription,
+        context=UASZonesSubscriptionCreateContext(
+            uas_zones_filter=uas_zones_filter,
+            user=request.state.user,
+            idempotency_key=request.headers.get(IDEMPOTENCY_KEY_HEADER)
+        )
+    )
+
+    reply = SubscribeToUASZonesUpdatesReply(
+        subscription_id=context.uas_zones_subscription.id,
+        publication_location=context.uas_zones_subscription.sm_subscription.queue
+    )
+
+    return reply, 201
+
+
+@handle_response(UASZoneSubscriptionsReplySchema)
+async def get_subscriptions_to_uas_zones_updates(request: Request) -> Tuple[Reply, int]:
+    """
+    GET /subscriptions/
+
+    :param request:
+    :return:
+    """
+    uas_zones_subscriptions = await db.get_uas_zones_subscriptions(request.app.state.db,
+                                                                   user=request.state.user)
+
+    reply = UASZoneSubscriptionsReply(
+        uas_zone_subscriptions=[get_uas_zones_subscription_reply_object(subscription)
+                                for subscription in uas_zones_subscriptions]
+    )
+
+    return reply, 200
+
+
+async def _get_uas_zones_subscription(request: Request):
+    subscription_id = request.path_params['subscription_id']
+
+    uas_zones_subscription = await db.get_uas_zones_subscription_by_id(request.app.state.db,
+                                                                       subscription_id,
+                                                                       user=request.state.user)
+
+    if uas_zones_subscription is None:
+        raise NotFoundError(f"Subscription with id {subscription_id} does not exist")
+
+    return uas_zones_subscription
+
+
+@handle_response(UASZoneSubscriptionReplySchema)
+async def get_subscription_to_uas_zones_updates(request: Request) -> Tuple[Reply, int]:
+    """
+    GET /subscriptions/{subscription_id}
+
+    :param request:
+    :return:
+    """
+    uas_zones_subscription = await _get_uas_zones_subscription(request)
+
+    return UASZoneSubscriptionReply(
+        uas_zone_subscription=get_uas_zones_subscription_reply_object(uas_zones_subscription)), 200
+
+
+@handle_response(ReplySchema)
+async def update_subscription_to_uas_zones_updates(request: Request) -> Tuple[Reply, int]:
+    """
+    PUT /subscriptions/{subscription_id}
+
+    :param request:
+    :return:
+    """
+    uas_zones_subscription = await _get_uas_zones_subscription(request)
+
+    updated_subscription_dict = await _load(SubscriptionSchema, request)
+
+    uas_zones_subscription.sm_subscription.active = updated_subscription_dict['active']
+
+    await request.app.state.run_in_app_context(
+        events.update_uas_zones_subscription_event.handle,
+        context=UASZonesSubscriptionUpdateContext(uas_zones_subscription=uas_zones_subscription,
+                                                  user=request.state.user)
+    )
+
+    return Reply(generic_reply=GenericReply(request_status=RequestStatus.OK.value)), 200
+
+
+@handle_response(ReplySchema)
+async def delete_subscription_to_uas_zones_updates(request: Request) -> Tuple[Reply, int]:
+    """
+    DELETE /subscriptions/{subscription_id}
+
+    :param request:
+    :return:
+    """
+    uas_zones_subscription = await _get_uas_zones_subscription(request)
+
+    await request.app.state.run_in_app_context(
+        events.delete_uas_zones_subscription_event.handle,
+        context=UASZonesSubscriptionUpdateContext(uas_zones_subscription=uas_zones_subscription,
+                                                  user=request.state.user)
+    )
+
+    return Reply(generic_reply=GenericReply(request_status=RequestStatus.OK.value)), 204
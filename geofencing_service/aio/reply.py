@@ -0,0 +1,157 @@
+"""
+Copyright 2020 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+import logging
+from functools import wraps
+from typing import Type, Optional
+
+from marshmallow import Schema
+from starlette.requests import Request
+from starlette.responses import Response
+from swim_backend.errors import APIError
+from werkzeug.datastructures import MIMEAccept
+from werkzeug.http import parse_accept_header
+
+from geofencing_service.encoding import JSON_MIMETYPE, MIMETYPES, ENCODINGS, serialize, compress, \
+    deserialize
+from geofencing_service.endpoints.reply import Reply, GenericReply, RequestStatus, \
+    RESPONSE_COMPRESSION_MIN_SIZE
+from geofencing_service.endpoints.schemas.registry import get_schema
+from geofencing_service.endpoints.schemas.reply_schemas import ReplySchema
+from geofencing_service.metrics import REQUESTS, REQUEST_LATENCY, SERIALIZATION_LATENCY, timer
+
+__author__ = "EUROCONTROL (SWIM)"
+
+_logger = logging.getLogger(__name__)
+
+
+def get_accepted_mimetype(request: Request) -> str:
+    """
+    Negotiates the mimetype of the reply based on the Accept header of the request. JSON is used by
+    default.
+    :param request:
+    :return:
+    """
+    accept = parse_accept_header(request.headers.get('Accept'), MIMEAccept)
+
+    return accept.best_match(MIMETYPES, default=JSON_MIMETYPE)
+
+
+def make_response(request: Request, body: bytes, status_code: int, mimetype: str) -> Response:
+    """
+    Creates the response and compresses its body with the best encoding that is accepted by the
+    client (brotli or gzip) in case it exceeds the configured size threshold.
+
+    :param request:
+    :param body:
+    :param status_code:
+    :param mimetype:
+    :return:
+    """
+    config = request.app.state.config.get('RESPONSE_COMPRESSION', {})
+    headers = {}
+
+    if status_code not in (204, 304) \
+            and len(body) >= config.get('MIN_SIZE', RESPONSE_COMPRESSION_MIN_SIZE):
+        encoding = parse_accept_header(request.headers.get('Accept-Encoding')) \
+            .best_match(config.get('ENCODINGS', ENCODINGS))
+
+        if encoding is not None:
+            body = compress(body, encoding)
+            headers = {'Content-Encoding': encoding, 'Vary': 'Accept-Encoding'}
+
+    return Response(body, status_code=status_code, media_type=mimetype, headers=headers)
+
+
+def make_nok_response(request: Request,
+                      request_exception_description: str,
+                      status_code: int,
+                      schema: Type[Schema] = ReplySchema) -> Response:
+    """
+    :param request:
+    :param request_exception_description:
+    :param status_code:
+    :param schema:
+    :return:
+    """
+    reply = Reply(generic_reply=GenericReply(
+        request_status=RequestStatus.NOK.value,
+        request_exception_description=request_exception_description))
+
+    return make_response(request,
+                         serialize(get_schema(schema).dump(reply), JSON_MIMETYPE),
+                         status_code,
+                         JSON_MIMETYPE)
+
+
+def handle_response(schema: Type[Schema]):
+    """
+    The async counterpart of geofencing_service.endpoints.reply.handle_response
+
+    :param schema: the schema class
+    :return:
+    """
+    def decorator(func):
+        operation = func.__name__
+
+        @wraps(func)
+        async def wrapper(request: Request) -> Response:
+            try:
+                with timer(REQUEST_LATENCY, operation):
+                    result, status_code = await func(request)
+            except Exception as e:
+                _logger.exception(f'Error while handling {operation}')
+                result = Reply(
+                    generic_reply=GenericReply(
+                        request_status=RequestStatus.NOK.value,
+                        request_exception_description=str(e)
+                    )
+                )
+                status_code = e.status if isinstance(e, APIError) else 500
+
+            REQUESTS.labels(operation, status_code).inc()
+
+            with timer(SERIALIZATION_LATENCY, operation):
+                mimetype = get_accepted_mimetype(request)
+                body = serialize(get_schema(schema).dump(result), mimetype)
+
+            return make_response(request, body, status_code, mimetype)
+        return wrapper
+    return decorator
+
+
+async def get_json(request: Request) -> Optional[dict]:
+    """
+    :param request:
+    :return: the decoded JSON body of the request or None if it is not valid JSON
+    """
+    try:
+        return deserialize(await request.body(), JSON_MIMETYPE)
+    except ValueError:
+        return None
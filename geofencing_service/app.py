@@ -27,29 +27,71 @@ http://opensource.org/licenses/BSD-3-Clause
 
 Details on EUROCONTROL: http://www.eurocontrol.int
 """
+import gc
+import importlib
 import logging
-from pathlib import Path
-from typing import List
+from functools import partial
+from typing import List, Callable, Dict, Any, Optional
 
 import connexion
 from flask import Flask
-from mongoengine import connect
+from mongoengine import connect, disconnect
 from pkg_resources import resource_filename
-from pubsub_facades.swim_pubsub import SWIMPublisher
 from swagger_ui_bundle import swagger_ui_3_path
 from swim_backend.config import load_app_config, configure_logging
 from swim_backend.flask import configure_flask
 
-from geofencing_service.events.broker_message_producers import uas_zones_updates_message_producer
-from geofencing_service.db.models import UASZonesSubscription
-from geofencing_service.db.subscriptions import get_uas_zones_subscriptions
-from geofencing_service.endpoints.reply import handle_flask_request_error
+from geofencing_service.db.models import UASZonesSubscription, UASZone, User, UASZonesVersion
+from geofencing_service.endpoints.reply import handle_flask_request_error, compress_response
+from geofencing_service.health import health
+from geofencing_service.ipc_publisher import IPCPublisherClient
+from geofencing_service.metrics import metrics
+from geofencing_service.openapi import load_openapi_spec, OPENAPI_CACHE_DIR
+from geofencing_service.publisher import start_swim_publisher
+from geofencing_service.profiling import ProfilerMiddleware, PROFILE_HEADER, \
+    SAMPLING_INTERVAL_MS, MAX_OUTPUT_DIR_SIZE_MB, SAMPLE_RATE
 
 __author__ = "EUROCONTROL (SWIM)"
 
 _logger = logging.getLogger(__name__)
 
 
+def _get_swim_publisher_factory(app: Flask, config_file: str) -> Callable:
+    """
+    In `ipc` mode the workers send their messages to the dedicated publisher process
+    (geofencing_service.ipc_publisher) instead of connecting to the broker themselves.
+
+    :param app:
+    :param config_file:
+    :return:
+    """
+    if app.config.get('BROKER_PUBLISHER', {}).get('MODE', 'in_process') == 'ipc':
+        return partial(IPCPublisherClient.create_from_config, config_file)
+
+    # the broker libraries are imported only by the processes that connect to the broker
+    from pubsub_facades.swim_pubsub import SWIMPublisher
+
+    return partial(SWIMPublisher.create_from_config, config_file)
+
+
+def _get_validator_map(app_config: Dict[str, Any]) -> Optional[Dict[str, type]]:
+    """
+    In `single_pass` mode the request bodies are validated by code compiled from openapi.yml
+    instead of jsonschema, and the marshmallow schemas don't validate their geometries again.
+
+    :param app_config:
+    :return:
+    """
+    mode = app_config.get('REQUEST_VALIDATION', {}).get('MODE', 'connexion')
+    if mode == 'connexion':
+        return None
+
+    # fastjsonschema is imported only when used
+    from geofencing_service.request_validation import get_validator_map
+
+    return get_validator_map(mode)
+
+
 def create_flask_app(config_file: str) -> Flask:
     """
     Creates and configures the Flask app.
@@ -57,17 +99,25 @@ def create_flask_app(config_file: str) -> Flask:
     :param config_file:
     :return:
     """
+    app_config = load_app_config(filename=config_file)
+
     options = {'swagger_path': swagger_ui_3_path}
     connexion_app = connexion.App(__name__, options=options)
 
-    connexion_app.add_api(Path('openapi.yml'), strict_validation=True)
+    # the spec is passed parsed so that connexion doesn't parse the YAML file on every start
+    openapi_config = app_config.get('OPENAPI', {})
+    openapi_spec = load_openapi_spec(cache_dir=openapi_config.get('CACHE_DIR', OPENAPI_CACHE_DIR))
+    connexion_app.add_api(openapi_spec,
+                          strict_validation=True,
+                          validator_map=_get_validator_map(app_config))
 
     app = connexion_app.app
 
+    # after_request functions are called in reverse order of registration so the compression
+    # should be registered first in order to be applied on the final response
+    app.after_request(compress_response)
     app.after_request(handle_flask_request_error)
 
-    app_config = load_app_config(filename=config_file)
-
     app.config.update(app_config)
 
     configure_flask(app)
@@ -76,45 +126,108 @@ def create_flask_app(config_file: str) -> Flask:
 
     connect(**app.config['MONGO'])
 
-    # the swim_publisher will be added as flask app properties for easier usage across the project
+    if app.config.get('METRICS', {}).get('ENABLED', False):
+        app.add_url_rule('/metrics', 'metrics', metrics)
+
+    if app.config.get('HEALTH', {}).get('ENABLED', True):
+        app.add_url_rule('/health', 'health', health)
+
+    profiling_config = app.config.get('PROFILING', {})
+    if profiling_config.get('ENABLED', False):
+        app.wsgi_app = ProfilerMiddleware(
+            app,
+            output_dir=profiling_config['OUTPUT_DIR'],
+            sample_rate=profiling_config.get('SAMPLE_RATE', SAMPLE_RATE),
+            header=profiling_config.get('HEADER', PROFILE_HEADER),
+            token=profiling_config.get('TOKEN'),
+            interval_ms=profiling_config.get('INTERVAL_MS', SAMPLING_INTERVAL_MS),
+            max_output_dir_size_mb=profiling_config.get('MAX_OUTPUT_DIR_SIZE_MB',
+                                                        MAX_OUTPUT_DIR_SIZE_MB)
+        )
+
+    # the swim_publisher will be added as flask app properties for easier usage across the project.
+    # It is started per process by start_swim_publisher
     with app.app_context():
         if not app.testing:
-            app.swim_publisher = SWIMPublisher.create_from_config(config_file)
+            app.swim_publisher_factory = _get_swim_publisher_factory(app, config_file)
+            app.swim_publisher = app.swim_publisher_factory()
         else:
             app.swim_publisher = None
 
     return app
 
 
-def _preload_swim_publisher(swim_publisher: SWIMPublisher,
-                            subscriptions: List[UASZonesSubscription]
-):
+def prepare_appication():
+    app = create_flask_app(config_file=resource_filename(__name__, 'config.yml'))
+
+    start_swim_publisher(app)
+
+    return app
+
+
+# the modules that the service imports on their first use in order to start faster. They are
+# imported in advance by create_preloaded_app so that they are shared by the workers.
+LAZY_MODULES = (
+    'geog',
+    'numpy',
+    'shapely.geometry',
+    'shapely.ops',
+    'shapely.prepared',
+    'mapbox_vector_tile',
+    'proton',
+    'subscription_manager_client.subscription_manager',
+)
+
+# the apps created by create_preloaded_app in this process, started by init_worker after fork
+_preloaded_apps: List[Flask] = []
+
+
+def create_preloaded_app(config_file: str) -> Flask:
     """
-    Initializes the publisher with the existing subscriptions if any
-    :param swim_publisher:
-    :param subscriptions:
+    Creates the app in the gunicorn master (preload_app) so that its heavy state (the loaded
+    OpenAPI spec, the imported modules and the DB indexes) is built once and shared copy-on-write
+    by the workers. Neither the MongoDB connection nor the threads of the SWIMPublisher survive a
+    fork, so the connection is closed here and both are (re)opened in each worker by init_worker.
+
+    :param config_file:
+    :return:
     """
-    for subscription in subscriptions:
-        swim_publisher.preload_topic_message_producer(
-            topic_name=subscription.sm_subscription.topic_name,
-            message_producer=uas_zones_updates_message_producer
-        )
-        _logger.info(f'Added message_producer for topic: {subscription.sm_subscription.topic_name}')
+    app = create_flask_app(config_file)
 
+    for document_class in (User, UASZone, UASZonesSubscription, UASZonesVersion):
+        document_class.ensure_indexes()
 
-def prepare_appication():
-    app = create_flask_app(config_file=resource_filename(__name__, 'config.yml'))
+    disconnect()
+
+    for module in LAZY_MODULES:
+        importlib.import_module(module)
+
+    # each worker creates its own publisher
+    if getattr(app, 'swim_publisher_factory', None) is not None:
+        app.swim_publisher = None
 
-    # the SWIMPublisher is started in threaded mode in order to be able to use add the message_
-    # producers on demand
-    app.swim_publisher.run(threaded=True)
+    # the objects created so far are moved to a permanent generation so that the garbage
+    # collections of the workers do not touch (and copy) their memory pages
+    gc.freeze()
 
-    _preload_swim_publisher(swim_publisher=app.swim_publisher,
-                            subscriptions=get_uas_zones_subscriptions())
+    _preloaded_apps.append(app)
 
     return app
 
 
+def init_worker() -> None:
+    """
+    Reconnects to MongoDB and starts the SWIMPublisher of the preloaded apps. It is meant to be
+    called in each worker after fork, i.e. from the `post_worker_init` hook of gunicorn. The topics
+    are preloaded from DB by every worker since the subscriptions may have changed since the
+    master started (workers are recycled).
+    """
+    for app in _preloaded_apps:
+        connect(**app.config['MONGO'])
+
+        start_swim_publisher(app)
+
+
 if __name__ == '__main__':
     application = prepare_appication()
     application.run(host="0.0.0.0", port=8000, debug=True)
@@ -35,10 +35,12 @@ from werkzeug.security import check_password_hash
 from swim_backend.errors import UnauthorizedError
 from geofencing_service.db.models import User
 from geofencing_service.db.users import get_user_by_username
+from geofencing_service.metrics import timed, AUTH_LATENCY
 
 __author__ = "EUROCONTROL (SWIM)"
 
 
+@timed(AUTH_LATENCY)
 def basic_auth(username: str, password: str, required_scopes: t.Optional[t.List[str]] = None) \
         -> t.Dict[str, t.Any]:
     """
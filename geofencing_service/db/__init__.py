@@ -34,3 +34,18 @@ AIRSPACE_VOLUME_UPPER_LIMIT = 100000
 AIRSPACE_VOLUME_LOWER_LIMIT = 0
 METERS_TO_FEET_RATIO = 3.28084
 FEET_TO_METERS_RATIO = 0.3048
+
+# precision (number of geohash characters) of the tiles covering an airspace volume
+UAS_ZONE_TILES_PRECISION = 6
+# maximum number of tiles covering an airspace volume. Larger volumes are covered by coarser tiles
+UAS_ZONE_TILES_MAX = 256
+# maximum number of tiles covering the airspace volume of a filter. Larger volumes are not
+# pre-filtered by tiles
+UAS_ZONES_FILTER_TILES_MAX = 1024
+# tolerances (in meters) of the precomputed simplified versions of the horizontal projections
+SIMPLIFIED_PROJECTION_TOLERANCES_IN_M = (10, 100, 1000)
+# lifetime of the records of the idempotency keys of the subscription creations
+IDEMPOTENCY_RECORD_TTL_IN_SECONDS = 24 * 60 * 60
+# an idempotency record in progress can be claimed by a retry once it has been held for that long,
+# as the worker handling the request has been killed by then (twice the gunicorn worker timeout)
+IDEMPOTENCY_RECORD_LEASE_IN_SECONDS = 2 * 60
@@ -0,0 +1,200 @@
+"""
+Copyright 2020 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Dict, List, Set
+
+from flask import current_app, has_app_context
+from mongoengine.queryset import QuerySet
+
+from geofencing_service.metrics import DB_QUERY_LATENCY, DB_SLOW_QUERIES, \
+    DB_SLOW_QUERIES_DOCS_EXAMINED, DB_SLOW_QUERIES_DOCS_RETURNED
+
+__author__ = "EUROCONTROL (SWIM)"
+
+_logger = logging.getLogger(__name__)
+
+# queries taking longer than this are explained and logged when the diagnostics are enabled
+SLOW_QUERY_THRESHOLD_MS = 100
+
+# the explain command runs the query again, so each query shape is explained at most once per
+# interval
+SLOW_QUERY_EXPLAIN_INTERVAL_MS = 60 * 1000
+
+QUERY_VALUE_PLACEHOLDER = '?'
+
+# the query shapes that have been logged by this process
+_logged_query_shapes: Set[str] = set()
+
+# the time (time.monotonic) at which each query shape was last explained by this process
+_explained_query_shapes: Dict[str, float] = {}
+
+
+def get_query_shape(query: Any) -> Any:
+    """
+    Replaces the values of a Mongo query with placeholders while keeping its fields and operators,
+    so that all the queries built by the same code path share the same shape regardless of the
+    filter values. The conditions of $and/$or/$nor are sorted since their order does not matter.
+
+    :param query:
+    :return:
+    """
+    if isinstance(query, dict):
+        return {key: get_query_shape(value) for key, value in query.items()}
+
+    if isinstance(query, (list, tuple)) and query and all(isinstance(item, dict) for item in query):
+        return sorted((get_query_shape(item) for item in query),
+                      key=lambda shape: json.dumps(shape, sort_keys=True))
+
+    return QUERY_VALUE_PLACEHOLDER
+
+
+def get_query_shape_id(query_shape: Any) -> str:
+    """
+    A short and stable identifier of a query shape to be used as a metrics label
+
+    :param query_shape:
+    :return:
+    """
+    return hashlib.md5(json.dumps(query_shape, sort_keys=True).encode()).hexdigest()[:8]
+
+
+def summarize_plan(plan: Dict[str, Any]) -> str:
+    """
+    Flattens a query plan into a compact string, i.e. FETCH(IXSCAN[geometry.tiles_1])
+
+    :param plan: the winningPlan of an explain output
+    :return:
+    """
+    stage = plan.get('stage', '?')
+
+    if 'indexName' in plan:
+        stage += f"[{plan['indexName']}]"
+
+    input_stages: List[Dict[str, Any]] = plan.get('inputStages', [])
+    if 'inputStage' in plan:
+        input_stages = [plan['inputStage']]
+
+    if input_stages:
+        stage += f"({', '.join(summarize_plan(input_stage) for input_stage in input_stages)})"
+
+    return stage
+
+
+def explain(queryset: QuerySet) -> Dict[str, Any]:
+    """
+    Explains the cursor of the queryset, with its filter, projection, sort and limit. The explain
+    command runs in its default `allPlansExecution` verbosity which includes the execution
+    statistics.
+
+    :param queryset:
+    :return:
+    """
+    return queryset.explain()
+
+
+def _get_config() -> Dict[str, Any]:
+    return current_app.config.get('DB_DIAGNOSTICS', {}) if has_app_context() else {}
+
+
+def evaluate_queryset(queryset: QuerySet) -> list:
+    """
+    Evaluates the queryset. When the DB diagnostics are enabled the duration of the query is
+    recorded per query shape, and the queries slower than the configured threshold are explained
+    (at most once per query shape and explain interval) in order to log their winning plan along
+    with the documents examined versus returned.
+
+    :param queryset:
+    :return:
+    """
+    config = _get_config()
+
+    if not config.get('ENABLED', False):
+        return list(queryset)
+
+    start = time.perf_counter()
+    result = list(queryset)
+    duration_ms = (time.perf_counter() - start) * 1000
+
+    collection_name = queryset._collection.name
+    query_shape = get_query_shape(queryset._query)
+    query_shape_id = get_query_shape_id(query_shape)
+
+    if query_shape_id not in _logged_query_shapes:
+        _logged_query_shapes.add(query_shape_id)
+        _logger.info(f'Query shape {query_shape_id} on {collection_name}: '
+                     f'{json.dumps(query_shape, sort_keys=True)}')
+
+    DB_QUERY_LATENCY.labels(collection_name, query_shape_id).observe(duration_ms / 1000)
+
+    if duration_ms > config.get('SLOW_QUERY_THRESHOLD_MS', SLOW_QUERY_THRESHOLD_MS):
+        _diagnose_slow_query(queryset, collection_name, query_shape, query_shape_id, duration_ms,
+                             explain_interval_ms=config.get('SLOW_QUERY_EXPLAIN_INTERVAL_MS',
+                                                            SLOW_QUERY_EXPLAIN_INTERVAL_MS))
+
+    return result
+
+
+def _diagnose_slow_query(queryset: QuerySet,
+                         collection_name: str,
+                         query_shape: Any,
+                         query_shape_id: str,
+                         duration_ms: float,
+                         explain_interval_ms: float) -> None:
+    now = time.monotonic()
+    last_explained = _explained_query_shapes.get(query_shape_id)
+    if last_explained is not None and (now - last_explained) * 1000 < explain_interval_ms:
+        return
+
+    _explained_query_shapes[query_shape_id] = now
+
+    try:
+        explain_output = explain(queryset)
+    except Exception as e:
+        _logger.error(f'Error while explaining query: {str(e)}')
+        return
+
+    plan = summarize_plan(explain_output.get('queryPlanner', {}).get('winningPlan', {}))
+    execution_stats = explain_output.get('executionStats', {})
+    docs_examined = execution_stats.get('totalDocsExamined', 0)
+    keys_examined = execution_stats.get('totalKeysExamined', 0)
+    docs_returned = execution_stats.get('nReturned', 0)
+
+    DB_SLOW_QUERIES.labels(collection_name, query_shape_id, plan).inc()
+    DB_SLOW_QUERIES_DOCS_EXAMINED.labels(collection_name, query_shape_id).inc(docs_examined)
+    DB_SLOW_QUERIES_DOCS_RETURNED.labels(collection_name, query_shape_id).inc(docs_returned)
+
+    _logger.warning(f'Slow query ({duration_ms:.1f} ms) with shape {query_shape_id} on '
+                    f'{collection_name}: {json.dumps(query_shape, sort_keys=True)}, '
+                    f'winning plan: {plan}, keys examined: {keys_examined}, '
+                    f'docs examined: {docs_examined}, '
+                    f'docs returned: {docs_returned}')
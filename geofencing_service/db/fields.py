@@ -0,0 +1,175 @@
+"""
+Copyright 2020 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+from datetime import datetime, time, timezone, date
+from typing import Any, Optional, Union, Tuple
+
+from mongoengine import DateTimeField, IntField
+
+__author__ = "EUROCONTROL (SWIM)"
+
+# the format in which the ComplexDateTimeField used to store datetimes
+LEGACY_DATETIME_SEPARATOR = ','
+
+MINUTES_PER_DAY = 24 * 60
+
+# the end of the day (24:00), at which the daily periods running until midnight end. It is stored
+# as MINUTES_PER_DAY and loaded back as the last time of the day
+END_OF_DAY = time.max.replace(tzinfo=timezone.utc)
+
+
+def parse_legacy_datetime(value: str) -> datetime:
+    """
+    Parses a datetime stored by mongoengine's ComplexDateTimeField, i.e. 2020,01,01,12,00,00,000000
+    Their timezone was not stored and they have always been treated as UTC.
+
+    :param value:
+    :return:
+    """
+    return datetime(*map(int, value.split(LEGACY_DATETIME_SEPARATOR)), tzinfo=timezone.utc)
+
+
+def to_utc_datetime(value: datetime) -> datetime:
+    """
+    Converts a datetime to UTC (naive ones are considered UTC) with the millisecond precision of
+    the BSON datetimes, so that in memory values compare equally with the stored ones.
+
+    :param value:
+    :return:
+    """
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    else:
+        value = value.astimezone(timezone.utc)
+
+    return value.replace(microsecond=value.microsecond // 1000 * 1000)
+
+
+def to_utc_time_of_day(value: Union[datetime, time]) -> Tuple[time, int]:
+    """
+    Converts a time of the day (naive ones are considered UTC) to a UTC time with minute precision.
+
+    :param value: a time or the datetime of which the time is converted
+    :return: the UTC time and the number of days (-1, 0 or 1) by which the conversion moved it,
+             i.e. (23:00, -1) for 01:00+02:00
+    """
+    if isinstance(value, time):
+        value = datetime.combine(date(2000, 1, 1), value)
+
+    utc_value = to_utc_datetime(value)
+
+    return (time(utc_value.hour, utc_value.minute, tzinfo=timezone.utc),
+            (utc_value.date() - value.date()).days)
+
+
+class UTCDateTimeField(DateTimeField):
+    """
+    Stores timezone aware datetimes as native BSON datetimes in UTC and loads them back as UTC aware
+    datetimes. Values stored as strings by the formerly used ComplexDateTimeField are still read.
+    """
+
+    def __set__(self, instance, value):
+        super().__set__(instance, self.to_python(value))
+
+    def to_python(self, value: Any) -> Any:
+        if isinstance(value, str):
+            if LEGACY_DATETIME_SEPARATOR in value:
+                return parse_legacy_datetime(value)
+
+            # parsed by DateTimeField
+            value = super().to_mongo(value)
+
+        if isinstance(value, datetime):
+            return to_utc_datetime(value)
+
+        return value
+
+    def to_mongo(self, value: Any) -> Optional[datetime]:
+        value = self.to_python(value)
+
+        if isinstance(value, datetime):
+            return value.replace(tzinfo=None)
+
+        return value
+
+    def prepare_query_value(self, op, value):
+        return self.to_mongo(value)
+
+
+class MinuteOfDayField(IntField):
+    """
+    Stores the time of the day (in UTC) as the number of minutes since midnight and loads it back as
+    a UTC aware time. Only the minute precision is kept: the seconds and fractions of a second
+    that the API accepts are dropped. The day of a time is not known by the field, so times that
+    the conversion to UTC moves to another day (i.e. 01:00+02:00) have to be converted along with
+    their day beforehand (see to_utc_time_of_day). The end of the day is stored as MINUTES_PER_DAY
+    (see END_OF_DAY). Values stored as strings by the formerly used ComplexDateTimeField are still
+    read.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(min_value=0, max_value=MINUTES_PER_DAY, **kwargs)
+
+    def __set__(self, instance, value):
+        super().__set__(instance, self.to_python(value))
+
+    def to_python(self, value: Any) -> Any:
+        if isinstance(value, str) and LEGACY_DATETIME_SEPARATOR in value:
+            value = parse_legacy_datetime(value)
+
+        if value == END_OF_DAY or value == MINUTES_PER_DAY:
+            return END_OF_DAY
+
+        if isinstance(value, (datetime, time)):
+            return to_utc_time_of_day(value)[0]
+
+        if isinstance(value, int):
+            return time(*divmod(value, 60), tzinfo=timezone.utc)
+
+        return value
+
+    def to_mongo(self, value: Any) -> Optional[int]:
+        value = self.to_python(value)
+
+        if value == END_OF_DAY:
+            return MINUTES_PER_DAY
+
+        if isinstance(value, time):
+            return value.hour * 60 + value.minute
+
+        return value
+
+    def validate(self, value):
+        if not isinstance(value, time):
+            self.error('Time expected')
+
+        super().validate(self.to_mongo(value))
+
+    def prepare_query_value(self, op, value):
+        return self.to_mongo(value)
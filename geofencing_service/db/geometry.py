@@ -0,0 +1,142 @@
+"""
+Copyright 2020 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+from typing import Union, Dict, Tuple
+
+__author__ = "EUROCONTROL (SWIM)"
+
+# rough length of a degree of latitude
+METERS_PER_DEGREE = 111320
+
+
+def get_polygon_geojson(polygon: Union[dict, list]) -> dict:
+    """
+    A PolygonField value can be either a GeoJSON dict or a list of linestrings.
+    :param polygon:
+    :return:
+    """
+    if isinstance(polygon, dict):
+        return polygon
+
+    return {'type': 'Polygon', 'coordinates': polygon}
+
+
+def _n_vertices(polygon: dict) -> int:
+    return sum(len(linestring) for linestring in polygon['coordinates'])
+
+
+def simplify_polygon(polygon: dict, tolerance_in_m: float) -> dict:
+    """
+    Simplifies a GeoJSON polygon while preserving its topology, i.e. the result is still a valid
+    polygon with the same number of interior rings.
+
+    :param polygon:
+    :param tolerance_in_m:
+    :return:
+    """
+    # shapely (and numpy) take a significant part of the start up time and are only needed upon
+    # the creation of UASZones
+    import shapely.geometry
+
+    simplified = shapely.geometry.shape(polygon).simplify(tolerance_in_m / METERS_PER_DEGREE,
+                                                          preserve_topology=True)
+
+    return {
+        'type': 'Polygon',
+        'coordinates': [
+            [list(point) for point in linestring.coords]
+            for linestring in [simplified.exterior, *simplified.interiors]
+        ]
+    }
+
+
+def get_simplified_polygons(polygon: dict, tolerances_in_m: Tuple[int, ...]) -> Dict[str, dict]:
+    """
+    Simplifies the polygon for each one of the provided tolerances. Simplifications that do not
+    reduce the number of vertices are omitted.
+
+    :param polygon:
+    :param tolerances_in_m:
+    :return: the simplified polygons keyed by the respective tolerance
+    """
+    result = {}
+    n_vertices = _n_vertices(polygon)
+
+    for tolerance in tolerances_in_m:
+        simplified = simplify_polygon(polygon, tolerance)
+
+        if _n_vertices(simplified) < n_vertices:
+            result[str(tolerance)] = simplified
+
+    return result
+
+
+def quantize_polygon(polygon: dict, precision: int) -> dict:
+    """
+    Rounds the coordinates of a GeoJSON polygon to the given number of decimals and drops the
+    vertices that coincide with their previous one after rounding. Rings that would degenerate
+    by dropping them keep all their (rounded) vertices.
+
+    :param polygon:
+    :param precision: number of decimals
+    :return:
+    """
+    coordinates = []
+    for linestring in polygon['coordinates']:
+        rounded_linestring = [[round(lon, precision), round(lat, precision)]
+                              for lon, lat in linestring]
+
+        quantized_linestring = [point for i, point in enumerate(rounded_linestring)
+                                if i == 0 or point != rounded_linestring[i - 1]]
+
+        coordinates.append(quantized_linestring if len(quantized_linestring) >= 4
+                           else rounded_linestring)
+
+    return {'type': 'Polygon', 'coordinates': coordinates}
+
+
+def select_simplified_polygon(polygon: dict,
+                              simplified_polygons: Dict[str, dict],
+                              tolerance_in_m: float) -> dict:
+    """
+    Selects the precomputed simplified polygon of the highest tolerance that does not exceed the
+    requested one. The original polygon is returned if there is no such simplified polygon.
+
+    :param polygon: the original polygon
+    :param simplified_polygons: the simplified polygons keyed by the respective tolerance
+    :param tolerance_in_m:
+    :return:
+    """
+    candidates = [tolerance for tolerance in simplified_polygons
+                  if float(tolerance) <= tolerance_in_m]
+
+    if not candidates:
+        return polygon
+
+    return simplified_polygons[max(candidates, key=float)]
@@ -28,14 +28,20 @@ http://opensource.org/licenses/BSD-3-Clause
 Details on EUROCONTROL: http://www.eurocontrol.int
 """
 import enum
+from datetime import datetime, timezone
 from typing import Tuple, Any
 
 from mongoengine import EmbeddedDocument, StringField, IntField, PolygonField, \
-    ComplexDateTimeField, EmbeddedDocumentField, Document, ListField, EmbeddedDocumentListField, \
+    EmbeddedDocumentField, Document, ListField, EmbeddedDocumentListField, \
     DictField, ValidationError, ReferenceField, EmailField, URLField, BooleanField, DoesNotExist, \
     FloatField
 
-from geofencing_service.db import AIRSPACE_VOLUME_UPPER_LIMIT, AIRSPACE_VOLUME_LOWER_LIMIT
+from geofencing_service.db import AIRSPACE_VOLUME_UPPER_LIMIT, AIRSPACE_VOLUME_LOWER_LIMIT, \
+    UAS_ZONE_TILES_PRECISION, UAS_ZONE_TILES_MAX, SIMPLIFIED_PROJECTION_TOLERANCES_IN_M, \
+    FEET_TO_METERS_RATIO, IDEMPOTENCY_RECORD_TTL_IN_SECONDS
+from geofencing_service.db.fields import UTCDateTimeField, MinuteOfDayField
+from geofencing_service.db.geometry import get_polygon_geojson, get_simplified_polygons
+from geofencing_service.db.tiles import covering_tiles
 
 __author__ = "EUROCONTROL (SWIM)"
 
@@ -101,6 +107,18 @@ class UomDistance(ChoiceType):
     FEET = 'FT'
 
 
+def distance_to_meters(distance: float, uom: str) -> float:
+    """
+    :param distance:
+    :param uom: one of UomDistance values
+    :return:
+    """
+    if uom == UomDistance.FEET.value:
+        return distance * FEET_TO_METERS_RATIO
+
+    return float(distance)
+
+
 class CodeAuthorityRole(ChoiceType):
     AUTHORIZATION = "AUTHORIZATION"
     NOTIFICATION = "NOTIFICATION"
@@ -128,17 +146,43 @@ class AirspaceVolume(EmbeddedDocument):
     # helper field that holds geometry data in case the horizontal projection is of circle type
     circle = EmbeddedDocumentField(CircleField)
 
+    # helper field that holds the geohash tiles covering the horizontal projection
+    tiles = ListField(StringField())
+
+    # helper field that holds simplified versions of the horizontal projection keyed by the
+    # respective simplification tolerance in meters
+    simplified_projections = DictField(db_field='simplifiedProjections')
+
+    # helper fields that hold the limits converted in meters so that they can be queried
+    # regardless of the uom_dimensions
+    lower_limit_in_m = FloatField(db_field='lowerLimitInM')
+    upper_limit_in_m = FloatField(db_field='upperLimitInM')
+
+    def clean(self):
+        if self.uom_dimensions:
+            self.lower_limit_in_m = distance_to_meters(self.lower_limit, self.uom_dimensions)
+            self.upper_limit_in_m = distance_to_meters(self.upper_limit, self.uom_dimensions)
+
+        if self.horizontal_projection:
+            self.tiles = covering_tiles(polygon=get_polygon_geojson(self.horizontal_projection),
+                                        precision=UAS_ZONE_TILES_PRECISION,
+                                        max_tiles=UAS_ZONE_TILES_MAX)
+            self.simplified_projections = get_simplified_polygons(
+                polygon=get_polygon_geojson(self.horizontal_projection),
+                tolerances_in_m=SIMPLIFIED_PROJECTION_TOLERANCES_IN_M
+            )
+
 
 class DailyPeriod(EmbeddedDocument):
     day = StringField(choices=CodeWeekDay.choices())
-    start_time = ComplexDateTimeField(db_field='startTime', required=True)
-    end_time = ComplexDateTimeField(db_field='endTime', required=True)
+    start_time = MinuteOfDayField(db_field='startTime', required=True)
+    end_time = MinuteOfDayField(db_field='endTime', required=True)
 
 
 class TimePeriod(EmbeddedDocument):
     permanent = StringField(choices=CodeYesNoType.choices(), required=True)
-    start_date_time = ComplexDateTimeField(db_field='startDateTime', required=True)
-    end_date_time = ComplexDateTimeField(db_field='endDateTime', required=True)
+    start_date_time = UTCDateTimeField(db_field='startDateTime', required=True)
+    end_date_time = UTCDateTimeField(db_field='endDateTime', required=True)
     schedule = EmbeddedDocumentListField(DailyPeriod)
 
 
@@ -199,16 +243,33 @@ class UASZone(Document):
 
     user = ReferenceField(User, required=True)
 
+    meta = {
+        'indexes': [
+            'geometry.tiles',
+            ('geometry.lower_limit_in_m', 'geometry.upper_limit_in_m'),
+            ('applicability.start_date_time', 'applicability.end_date_time')
+        ]
+    }
+
     def clean(self):
         if self.user is not None:
             self.user = _get_or_create_user(self.user)
 
 
+class UASZonesVersion(Document):
+    """
+    Holds a counter that is increased every time a UASZone is created or deleted. It can be used as
+    the version of the whole set of UASZones, i.e. for cache invalidation.
+    """
+    id = StringField(primary_key=True)
+    version = IntField(default=0)
+
+
 class UASZonesFilter(EmbeddedDocument):
     airspace_volume = EmbeddedDocumentField(AirspaceVolume, db_field='airspaceVolume')
     regions = ListField()
-    start_date_time = ComplexDateTimeField(db_field='startDateTime')
-    end_date_time = ComplexDateTimeField(db_field='endDateTime')
+    start_date_time = UTCDateTimeField(db_field='startDateTime')
+    end_date_time = UTCDateTimeField(db_field='endDateTime')
 
 
 class GeofencingSMSubscription(EmbeddedDocument):
@@ -227,3 +288,32 @@ class UASZonesSubscription(Document):
     def clean(self):
         if self.user is not None:
             self.user = _get_or_create_user(self.user)
+
+
+class IdempotencyRecord(Document):
+    """
+    Holds the outcome of a subscription creation that was requested with an idempotency key, so
+    that its retries do not create the subscription again: either the id of the created
+    subscription or the Subscription Manager subscription that a failed attempt could not remove,
+    along with its topic, to be reused. Its id is made of the id of the user and the key. It is inserted (in progress)
+    before the creation so that concurrent requests with the same key can not both create the
+    subscription, and it expires IDEMPOTENCY_RECORD_TTL_IN_SECONDS after that. A record in progress
+    is held by the request that claimed it for IDEMPOTENCY_RECORD_LEASE_IN_SECONDS, so that the
+    retries can take over a request whose worker was killed.
+    """
+    id = StringField(required=True, primary_key=True)
+    user = ReferenceField(User, required=True)
+    topic_name = StringField(required=True)
+    in_progress = BooleanField(default=False)
+    claimed_at = UTCDateTimeField(db_field='claimedAt')
+    uas_zones_subscription_id = StringField()
+    sm_topic_id = IntField()
+    sm_subscription = EmbeddedDocumentField(GeofencingSMSubscription)
+    created_at = UTCDateTimeField(db_field='createdAt', required=True,
+                                  default=lambda: datetime.now(timezone.utc))
+
+    meta = {
+        'indexes': [
+            {'fields': ('created_at',), 'expireAfterSeconds': IDEMPOTENCY_RECORD_TTL_IN_SECONDS}
+        ]
+    }
@@ -27,15 +27,19 @@ http://opensource.org/licenses/BSD-3-Clause
 
 Details on EUROCONTROL: http://www.eurocontrol.int
 """
+from datetime import datetime, timezone, timedelta
 from typing import Optional, List
 
-from mongoengine import DoesNotExist, Q
+from mongoengine import DoesNotExist, Q, NotUniqueError
 
-from geofencing_service.db.models import UASZonesSubscription, User
+from geofencing_service.db import IDEMPOTENCY_RECORD_LEASE_IN_SECONDS
+from geofencing_service.db.models import UASZonesSubscription, User, IdempotencyRecord
+from geofencing_service.metrics import db_timed
 
 __author__ = "EUROCONTROL (SWIM)"
 
 
+@db_timed
 def get_uas_zones_subscriptions(user: Optional[User] = None) -> List[UASZonesSubscription]:
     """
     Retrieve all the subscriptions from DB
@@ -44,9 +48,10 @@ def get_uas_zones_subscriptions(user: Optional[User] = None) -> List[UASZonesSub
     """
     query = Q(user=user) if user is not None else Q()
 
-    return UASZonesSubscription.objects(query).all()
+    return list(UASZonesSubscription.objects(query).all())
 
 
+@db_timed
 def get_uas_zones_subscription_by_id(subscription_id: str,
                                      user: Optional[User] = None) \
         -> Optional[UASZonesSubscription]:
@@ -69,6 +74,7 @@ def get_uas_zones_subscription_by_id(subscription_id: str,
     return result
 
 
+@db_timed
 def create_uas_zones_subscription(subscription: UASZonesSubscription):
     """
     Saves a subscription in DB
@@ -77,6 +83,7 @@ def create_uas_zones_subscription(subscription: UASZonesSubscription):
     subscription.save()
 
 
+@db_timed
 def update_uas_zones_subscription(subscription: UASZonesSubscription):
     """
     Updates a subscription in DB
@@ -85,9 +92,82 @@ def update_uas_zones_subscription(subscription: UASZonesSubscription):
     subscription.save()
 
 
+@db_timed
 def delete_uas_zones_subscription(subscription: UASZonesSubscription):
     """
     Deletes a subscription in DB
     :param subscription:
     """
     subscription.delete()
+
+
+def get_idempotency_record_id(key: str, user: User) -> str:
+    """
+    :param key: the idempotency key of a request
+    :param user: the user of the request
+    :return: the id of the IdempotencyRecord of the key, unique per user
+    """
+    return f'{user.id}:{key}'
+
+
+@db_timed
+def get_idempotency_record(key: str, user: User) -> Optional[IdempotencyRecord]:
+    """
+    Retrieves the record of an idempotency key of a user
+    :param key:
+    :param user:
+    :return:
+    """
+    return IdempotencyRecord.objects(id=get_idempotency_record_id(key, user)).first()
+
+
+@db_timed
+def insert_idempotency_record(record: IdempotencyRecord) -> bool:
+    """
+    Inserts a record in DB unless its key has a record already
+    :param record:
+    :return: whether the record was inserted
+    """
+    try:
+        record.save(force_insert=True)
+    except NotUniqueError:
+        return False
+
+    return True
+
+
+@db_timed
+def claim_idempotency_record(key: str, user: User) -> Optional[IdempotencyRecord]:
+    """
+    Marks the record of an idempotency key of a user as in progress, unless it is already and its
+    lease (IDEMPOTENCY_RECORD_LEASE_IN_SECONDS) has not expired
+    :param key:
+    :param user:
+    :return: the claimed record, None if there is none or if it is held in progress
+    """
+    now = datetime.now(timezone.utc)
+    lease_expiry = now - timedelta(seconds=IDEMPOTENCY_RECORD_LEASE_IN_SECONDS)
+
+    claimable = Q(in_progress=False) | Q(claimed_at__lt=lease_expiry)
+
+    return IdempotencyRecord.objects(Q(id=get_idempotency_record_id(key, user)) & claimable)\
+        .modify(set__in_progress=True, set__claimed_at=now, new=True)
+
+
+@db_timed
+def save_idempotency_record(record: IdempotencyRecord):
+    """
+    Saves a record in DB, replacing the previous one of its key if any
+    :param record:
+    """
+    record.save()
+
+
+@db_timed
+def delete_idempotency_record(key: str, user: User):
+    """
+    Deletes the record of an idempotency key of a user, if any
+    :param key:
+    :param user:
+    """
+    IdempotencyRecord.objects(id=get_idempotency_record_id(key, user)).delete()
@@ -0,0 +1,237 @@
+"""
+Copyright 2020 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+import math
+from typing import List, Optional, Tuple, Iterable, Set
+
+__author__ = "EUROCONTROL (SWIM)"
+
+_GEOHASH_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+
+def _grid_dimensions(precision: int) -> Tuple[int, int]:
+    """
+    Returns the number of bits that are used for the longitude and the latitude of a geohash of the
+    given precision. Longitude takes the extra bit in case of an odd number of bits.
+
+    :param precision:
+    :return:
+    """
+    n_bits = 5 * precision
+
+    return (n_bits + 1) // 2, n_bits // 2
+
+
+def geohash_encode(lon: float, lat: float, precision: int) -> str:
+    """
+    Encodes the given point in a geohash of the given precision
+
+    :param lon:
+    :param lat:
+    :param precision: the number of characters of the geohash
+    :return:
+    """
+    lon_range, lat_range = [-180.0, 180.0], [-90.0, 90.0]
+    result, bits, n_bits, even = [], 0, 0, True
+
+    while len(result) < precision:
+        coord, coord_range = (lon, lon_range) if even else (lat, lat_range)
+        mid = (coord_range[0] + coord_range[1]) / 2
+
+        if coord >= mid:
+            bits = (bits << 1) | 1
+            coord_range[0] = mid
+        else:
+            bits = bits << 1
+            coord_range[1] = mid
+
+        even = not even
+        n_bits += 1
+
+        if n_bits == 5:
+            result.append(_GEOHASH_BASE32[bits])
+            bits, n_bits = 0, 0
+
+    return ''.join(result)
+
+
+def _tile_indices_range(min_coord: float,
+                        max_coord: float,
+                        origin: float,
+                        cell_size: float,
+                        n_cells: int) -> range:
+    first = max(0, int(math.floor((min_coord - origin) / cell_size)))
+    last = min(n_cells - 1, int(math.floor((max_coord - origin) / cell_size)))
+
+    return range(first, last + 1)
+
+
+def _to_vector(lon: float, lat: float) -> Tuple[float, float, float]:
+    lon, lat = math.radians(lon), math.radians(lat)
+
+    return math.cos(lat) * math.cos(lon), math.cos(lat) * math.sin(lon), math.sin(lat)
+
+
+def _great_circle_points(start: List[float], end: List[float], n: int) -> List[List[float]]:
+    """
+    Splits the great circle arc between two points in `n` segments of equal length
+
+    :param start: [lon, lat]
+    :param end: [lon, lat]
+    :param n:
+    :return: the start of each segment
+    """
+    a, b = _to_vector(*start[:2]), _to_vector(*end[:2])
+    angle = math.acos(max(-1.0, min(1.0, sum(x * y for x, y in zip(a, b)))))
+
+    if n == 1 or math.sin(angle) == 0:
+        return [start]
+
+    points = [start]
+    for i in range(1, n):
+        t = i / n
+        weight_a, weight_b = (math.sin((1 - t) * angle) / math.sin(angle),
+                              math.sin(t * angle) / math.sin(angle))
+        x, y, z = (weight_a * a_i + weight_b * b_i for a_i, b_i in zip(a, b))
+
+        points.append([math.degrees(math.atan2(y, x)),
+                       math.degrees(math.atan2(z, math.hypot(x, y)))])
+
+    return points
+
+
+def densify_geodesic(polygon: dict, max_segment_length: float) -> dict:
+    """
+    Adds points along the edges of a GeoJSON polygon so that no edge is longer than
+    `max_segment_length` degrees in longitude or latitude. The points are taken on the great
+    circles between the vertices, since MongoDB treats the edges of the polygons of 2dsphere
+    queries as geodesics which bow away from the planar edges over long distances (i.e. ~200m over
+    100km at 50°N). The densified polygon can then be handled as planar.
+
+    :param polygon: GeoJSON polygon
+    :param max_segment_length: in degrees
+    :return: GeoJSON polygon
+    """
+    rings = []
+    for ring in polygon['coordinates']:
+        densified_ring = []
+        for start, end in zip(ring, ring[1:]):
+            n = math.ceil(max(abs(end[0] - start[0]), abs(end[1] - start[1])) / max_segment_length)
+            densified_ring += _great_circle_points(start, end, max(n, 1))
+        rings.append(densified_ring + list(ring[-1:]))
+
+    return {'type': 'Polygon', 'coordinates': rings}
+
+
+def covering_tiles(polygon: dict,
+                   precision: int,
+                   max_tiles: int,
+                   min_precision: int = 1) -> Optional[List[str]]:
+    """
+    Calculates the geohash tiles that cover the provided GeoJSON polygon. The highest precision
+    between `min_precision` and `precision` is used for which the number of candidate tiles does not
+    exceed `max_tiles`. The edges of the polygon are densified along their geodesics at the size of
+    the tiles, so that the tiles cover the polygon as it is matched by MongoDB.
+
+    :param polygon: GeoJSON polygon
+    :param precision: the desired (highest) precision of the tiles
+    :param max_tiles: the maximum number of candidate tiles
+    :param min_precision: the lowest acceptable precision of the tiles
+    :return: the sorted geohashes of the tiles or None if the polygon cannot be covered with
+             up to `max_tiles` tiles of at least `min_precision` precision
+    """
+    # imported on first use in order to keep it out of the start up time
+    import shapely.geometry
+    import shapely.prepared
+
+    # the densified polygon contains the vertices of the polygon so its bounds are at least as large
+    planar_bounds = shapely.geometry.shape(polygon).bounds
+
+    for current_precision in range(precision, min_precision - 1, -1):
+        lon_bits, lat_bits = _grid_dimensions(current_precision)
+        cell_width, cell_height = 360.0 / 2 ** lon_bits, 180.0 / 2 ** lat_bits
+
+        def get_indices(bounds):
+            min_lon, min_lat, max_lon, max_lat = bounds
+            return (_tile_indices_range(min_lon, max_lon, -180.0, cell_width, 2 ** lon_bits),
+                    _tile_indices_range(min_lat, max_lat, -90.0, cell_height, 2 ** lat_bits))
+
+        lon_indices, lat_indices = get_indices(planar_bounds)
+        if len(lon_indices) * len(lat_indices) > max_tiles:
+            continue
+
+        geometry = shapely.geometry.shape(
+            densify_geodesic(polygon, max_segment_length=min(cell_width, cell_height)))
+        prepared_geometry = shapely.prepared.prep(geometry)
+
+        lon_indices, lat_indices = get_indices(geometry.bounds)
+        if len(lon_indices) * len(lat_indices) > max_tiles:
+            continue
+
+        tiles = []
+        for i in lon_indices:
+            for j in lat_indices:
+                tile_min_lon, tile_min_lat = -180.0 + i * cell_width, -90.0 + j * cell_height
+                tile = shapely.geometry.box(tile_min_lon,
+                                            tile_min_lat,
+                                            tile_min_lon + cell_width,
+                                            tile_min_lat + cell_height)
+
+                if prepared_geometry.intersects(tile):
+                    tiles.append(geohash_encode(lon=tile_min_lon + cell_width / 2,
+                                                lat=tile_min_lat + cell_height / 2,
+                                                precision=current_precision))
+        return sorted(tiles)
+
+    return None
+
+
+def tiles_with_ancestors(tiles: Iterable[str]) -> Set[str]:
+    """
+    Returns the provided tiles along with all their ancestors, i.e. the tiles of lower precision
+    that contain them.
+
+    :param tiles:
+    :return:
+    """
+    return {tile[:n] for tile in tiles for n in range(1, len(tile) + 1)}
+
+
+def tiles_overlap(tiles1: Iterable[str], tiles2: Iterable[str]) -> bool:
+    """
+    Two sets of tiles overlap if a tile of one of them contains (or is) a tile of the other one.
+
+    :param tiles1:
+    :param tiles2:
+    :return:
+    """
+    tiles1, tiles2 = set(tiles1), set(tiles2)
+
+    return not tiles_with_ancestors(tiles1).isdisjoint(tiles2) or \
+        not tiles_with_ancestors(tiles2).isdisjoint(tiles1)
@@ -33,12 +33,21 @@ from typing import List, Optional
 
 from mongoengine import Q, DoesNotExist
 
-from geofencing_service.db import METERS_TO_FEET_RATIO, FEET_TO_METERS_RATIO
-from geofencing_service.db.models import UASZone, User, UASZonesFilter, UomDistance
+from geofencing_service.db import UAS_ZONE_TILES_PRECISION, UAS_ZONES_FILTER_TILES_MAX, \
+    METERS_TO_FEET_RATIO
+from geofencing_service.db.diagnostics import evaluate_queryset
+from geofencing_service.db.geometry import get_polygon_geojson
+from geofencing_service.db.models import UASZone, User, UASZonesFilter, UASZonesVersion, \
+    AirspaceVolume, UomDistance, distance_to_meters
+from geofencing_service.db.tiles import covering_tiles, tiles_with_ancestors
+from geofencing_service.metrics import db_timed
 
 __author__ = "EUROCONTROL (SWIM)"
 
+UAS_ZONES_VERSION_ID = 'uas_zones'
 
+
+@db_timed
 def get_uas_zones_by_identifier(uas_zone_identifier: str, user: Optional[User] = None) \
         -> Optional[UASZone]:
     """
@@ -61,77 +70,187 @@ def get_uas_zones_by_identifier(uas_zone_identifier: str, user: Optional[User] =
     return result
 
 
-def get_uas_zones(uas_zones_filter: UASZonesFilter, user: Optional[User] = None) -> List[UASZone]:
+def _get_tiles_query(horizontal_projection: dict) -> Optional[Q]:
     """
-    Retrieves UASZones based on the provided filters criteria.
+    Builds a cheap first-stage query on the geohash tiles of the stored airspace volumes. The
+    filter projection is covered by tiles of the highest precision so that a stored tile overlaps
+    with it only if it is one of these tiles or one of their ancestors.
+    Projections that need too many tiles are not pre-filtered.
+
+    :param horizontal_projection:
+    :return:
+    """
+    filter_tiles = covering_tiles(polygon=get_polygon_geojson(horizontal_projection),
+                                  precision=UAS_ZONE_TILES_PRECISION,
+                                  max_tiles=UAS_ZONES_FILTER_TILES_MAX,
+                                  min_precision=UAS_ZONE_TILES_PRECISION)
+    if filter_tiles is None:
+        return None
+
+    # UASZones stored before the introduction of tiles are not pre-filtered
+    return Q(geometry__tiles__in=list(tiles_with_ancestors(filter_tiles))) \
+        | Q(geometry__tiles__exists=False)
+
+
+def _get_limits_query(airspace_volume: AirspaceVolume) -> Q:
+    """
+    The limits of the UASZones are stored in meters as well so that they can be compared with a
+    single range regardless of their UOM. UASZones stored before the normalized limits (see
+    provision/migrations/v0001_normalize_altitude_limits) are compared in their own UOM instead.
+
+    :param airspace_volume:
+    :return:
+    """
+    upper_limit_in_m = distance_to_meters(airspace_volume.upper_limit,
+                                          airspace_volume.uom_dimensions)
+    lower_limit_in_m = distance_to_meters(airspace_volume.lower_limit,
+                                          airspace_volume.uom_dimensions)
+
+    limits_in_m_query = Q(geometry__upper_limit_in_m__lte=upper_limit_in_m) \
+        & Q(geometry__lower_limit_in_m__gte=lower_limit_in_m)
+
+    legacy_limits_query = Q(geometry__upper_limit_in_m__exists=False) & (
+        (Q(geometry__uom_dimensions=UomDistance.METERS.value)
+         & Q(geometry__upper_limit__lte=upper_limit_in_m)
+         & Q(geometry__lower_limit__gte=lower_limit_in_m))
+        | (Q(geometry__uom_dimensions=UomDistance.FEET.value)
+           & Q(geometry__upper_limit__lte=upper_limit_in_m * METERS_TO_FEET_RATIO)
+           & Q(geometry__lower_limit__gte=lower_limit_in_m * METERS_TO_FEET_RATIO))
+    )
+
+    return limits_in_m_query | legacy_limits_query
+
+
+def get_uas_zones_query(uas_zones_filter: UASZonesFilter, user: Optional[User] = None) -> Q:
+    """
+    Builds the query of the UASZones matching the provided filters criteria.
 
-    :param user:
     :param uas_zones_filter:
+    :param user:
     :return:
     """
+    queries_list = []
 
-    queries_list = [
+    tiles_query = _get_tiles_query(uas_zones_filter.airspace_volume.horizontal_projection)
+    if tiles_query is not None:
+        queries_list.append(tiles_query)
+
+    queries_list += [
         Q(geometry__horizontal_projection__geo_intersects=uas_zones_filter.airspace_volume.horizontal_projection['coordinates']),
         Q(region__in=uas_zones_filter.regions),
         Q(applicability__start_date_time__gte=uas_zones_filter.start_date_time),
         Q(applicability__end_date_time__lte=uas_zones_filter.end_date_time),
+        _get_limits_query(uas_zones_filter.airspace_volume),
     ]
 
-    if uas_zones_filter.airspace_volume.uom_dimensions == UomDistance.METERS.value:
-        limits_query = \
-        (
-            (
-                Q(geometry__uom_dimensions=UomDistance.METERS.value)
-              & Q(geometry__upper_limit__lte=uas_zones_filter.airspace_volume.upper_limit)
-              & Q(geometry__lower_limit__gte=uas_zones_filter.airspace_volume.lower_limit)
-            )
-        |
-            (
-                Q(geometry__uom_dimensions=UomDistance.FEET.value)
-              & Q(geometry__upper_limit__lte=uas_zones_filter.airspace_volume.upper_limit * METERS_TO_FEET_RATIO)
-              & Q(geometry__lower_limit__gte=uas_zones_filter.airspace_volume.lower_limit * METERS_TO_FEET_RATIO)
-            )
-        )
-    else:
-        limits_query = \
-        (
-            (
-                Q(geometry__uom_dimensions=UomDistance.METERS.value)
-              & Q(geometry__upper_limit__lte=uas_zones_filter.airspace_volume.upper_limit * FEET_TO_METERS_RATIO)
-              & Q(geometry__lower_limit__gte=uas_zones_filter.airspace_volume.lower_limit * FEET_TO_METERS_RATIO)
-            )
-        |
-            (
-                Q(geometry__uom_dimensions=UomDistance.FEET.value)
-              & Q(geometry__upper_limit__lte=uas_zones_filter.airspace_volume.upper_limit)
-              & Q(geometry__lower_limit__gte=uas_zones_filter.airspace_volume.lower_limit)
-            )
-        )
-
-    queries_list.append(limits_query)
-
     if user is not None:
         queries_list.append(Q(user=user))
 
-    query: Q = reduce(lambda q1, q2: q1 & q2, queries_list, Q())
+    return reduce(lambda q1, q2: q1 & q2, queries_list, Q())
 
-    result = UASZone.objects(query).all()
 
-    return result
+@db_timed
+def get_uas_zones(uas_zones_filter: UASZonesFilter,
+                  user: Optional[User] = None,
+                  with_simplified_projections: bool = False) -> List[UASZone]:
+    """
+    Retrieves UASZones based on the provided filters criteria.
+
+    :param user:
+    :param uas_zones_filter:
+    :param with_simplified_projections: whether the precomputed simplified versions of the
+                                        horizontal projections should be retrieved as well
+    :return:
+    """
+    result = UASZone.objects(get_uas_zones_query(uas_zones_filter, user=user)).all()
+
+    if not with_simplified_projections:
+        result = result.exclude('geometry.simplified_projections')
+
+    # the query is evaluated here so that its duration is accounted for in the DB metrics
+    return evaluate_queryset(result)
 
 
-def create_uas_zone(uas_zone: UASZone):
+def get_uas_zones_by_horizontal_projection_query(horizontal_projection: Optional[dict],
+                                                 user: Optional[User] = None) -> Q:
+    """
+    Builds the query of the UASZones whose geometry intersects the provided horizontal projection.
+
+    :param horizontal_projection: all the UASZones are matched if None
+    :param user:
+    :return:
+    """
+    query = Q()
+
+    if horizontal_projection is not None:
+        tiles_query = _get_tiles_query(horizontal_projection)
+        if tiles_query is not None:
+            query &= tiles_query
+
+        query &= Q(
+            geometry__horizontal_projection__geo_intersects=horizontal_projection['coordinates'])
+
+    if user is not None:
+        query &= Q(user=user)
+
+    return query
+
+
+@db_timed
+def get_uas_zones_by_horizontal_projection(horizontal_projection: Optional[dict],
+                                           user: Optional[User] = None) -> List[UASZone]:
+    """
+    Retrieves the UASZones whose geometry intersects the provided horizontal projection. If no
+    horizontal projection is provided then all the UASZones are retrieved.
+
+    :param horizontal_projection:
+    :param user:
+    :return:
+    """
+    query = get_uas_zones_by_horizontal_projection_query(horizontal_projection, user=user)
+
+    return evaluate_queryset(UASZone.objects(query).all())
+
+
+@db_timed
+def get_uas_zones_version() -> int:
+    """
+    Retrieves the current version of the set of UASZones
+    :return:
+    """
+    uas_zones_version = UASZonesVersion.objects(id=UAS_ZONES_VERSION_ID).first()
+
+    return uas_zones_version.version if uas_zones_version is not None else 0
+
+
+def _increase_uas_zones_version() -> int:
+    uas_zones_version = UASZonesVersion.objects(id=UAS_ZONES_VERSION_ID).modify(inc__version=1,
+                                                                               upsert=True,
+                                                                               new=True)
+
+    return uas_zones_version.version
+
+
+@db_timed
+def create_uas_zone(uas_zone: UASZone) -> int:
     """
     Saves the uas_zone in DB
     :param uas_zone:
+    :return: the resulting version of the set of UASZones
     """
     uas_zone.created_at = datetime.now(timezone.utc)
     uas_zone.save()
 
+    return _increase_uas_zones_version()
 
-def delete_uas_zone(uas_zone: UASZone):
+
+@db_timed
+def delete_uas_zone(uas_zone: UASZone) -> int:
     """
     Deletes the uas_zone from DB
     :param uas_zone:
+    :return: the resulting version of the set of UASZones
     """
     uas_zone.delete()
+
+    return _increase_uas_zones_version()
@@ -33,10 +33,12 @@ from mongoengine import MultipleObjectsReturned, DoesNotExist
 from swim_backend.auth.auth import hash_password
 
 from geofencing_service.db.models import User
+from geofencing_service.metrics import db_timed
 
 __author__ = "EUROCONTROL (SWIM)"
 
 
+@db_timed
 def get_user_by_username(username: str) -> Union[User, None]:
     """
     Retrieves a User by its username
@@ -51,6 +53,7 @@ def get_user_by_username(username: str) -> Union[User, None]:
     return result
 
 
+@db_timed
 def create_user(user: User) -> User:
     """
     Saves the user in DB after hashing its password
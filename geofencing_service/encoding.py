@@ -0,0 +1,131 @@
+"""
+Copyright 2020 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+import gzip
+import json
+from typing import Any, Callable, Dict
+
+import brotli
+import cbor2
+import msgpack
+
+__author__ = "EUROCONTROL (SWIM)"
+
+JSON_MIMETYPE = 'application/json'
+MSGPACK_MIMETYPE = 'application/msgpack'
+CBOR_MIMETYPE = 'application/cbor'
+
+GZIP_ENCODING = 'gzip'
+BROTLI_ENCODING = 'br'
+
+MIMETYPES = (JSON_MIMETYPE, MSGPACK_MIMETYPE, CBOR_MIMETYPE)
+ENCODINGS = (BROTLI_ENCODING, GZIP_ENCODING)
+
+
+_SERIALIZERS: Dict[str, Callable[[Any], bytes]] = {
+    JSON_MIMETYPE: lambda data: json.dumps(data).encode('utf-8'),
+    MSGPACK_MIMETYPE: lambda data: msgpack.packb(data, use_bin_type=True),
+    CBOR_MIMETYPE: cbor2.dumps,
+}
+
+_DESERIALIZERS: Dict[str, Callable[[bytes], Any]] = {
+    JSON_MIMETYPE: lambda data: json.loads(data.decode('utf-8')),
+    MSGPACK_MIMETYPE: lambda data: msgpack.unpackb(data, raw=False),
+    CBOR_MIMETYPE: cbor2.loads,
+}
+
+_COMPRESSORS: Dict[str, Callable[[bytes], bytes]] = {
+    GZIP_ENCODING: gzip.compress,
+    BROTLI_ENCODING: brotli.compress,
+}
+
+_DECOMPRESSORS: Dict[str, Callable[[bytes], bytes]] = {
+    GZIP_ENCODING: gzip.decompress,
+    BROTLI_ENCODING: brotli.decompress,
+}
+
+
+def _get_handler(handlers: Dict[str, Callable], key: str) -> Callable:
+    try:
+        return handlers[key]
+    except KeyError:
+        raise ValueError(f'Unsupported value: {key}. Expected one of {list(handlers)}')
+
+
+def serialize(data: Any, mimetype: str) -> bytes:
+    """
+    Serializes already dumped (JSON compatible) data in the format of the given mimetype
+
+    :param data:
+    :param mimetype: one of MIMETYPES
+    :return:
+    """
+    return _get_handler(_SERIALIZERS, mimetype)(data)
+
+
+def deserialize(data: bytes, mimetype: str) -> Any:
+    """
+    :param data:
+    :param mimetype: one of MIMETYPES
+    :return:
+    """
+    return _get_handler(_DESERIALIZERS, mimetype)(data)
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """
+    :param data:
+    :param encoding: one of ENCODINGS
+    :return:
+    """
+    return _get_handler(_COMPRESSORS, encoding)(data)
+
+
+def decompress(data: bytes, encoding: str) -> bytes:
+    """
+    :param data:
+    :param encoding: one of ENCODINGS
+    :return:
+    """
+    return _get_handler(_DECOMPRESSORS, encoding)(data)
+
+
+def make_diff(previous: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Computes the top level fields of `current` that differ from the ones of `previous`. Fields
+    that do not exist in `current` anymore are set to None.
+
+    :param previous:
+    :param current:
+    :return:
+    """
+    diff = {key: value for key, value in current.items() if previous.get(key) != value}
+    diff.update({key: None for key in previous if key not in current})
+
+    return diff
@@ -0,0 +1,116 @@
+"""
+Copyright 2020 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+from typing import List, Optional
+
+from swim_backend.errors import BadRequestError, ConflictError
+
+from geofencing_service.db.geometry import select_simplified_polygon, quantize_polygon, \
+    get_polygon_geojson
+from geofencing_service.db.models import UASZone, UASZonesSubscription
+from geofencing_service.endpoints.reply import UASZoneSubscriptionReplyObject
+from geofencing_service.events import events
+from geofencing_service.events.uas_zones_subscription_handlers import \
+    UASZonesSubscriptionCreateContext, reuse_idempotency_record
+
+__author__ = "EUROCONTROL (SWIM)"
+
+# the helpers shared by the endpoints of the Flask app and of the ASGI app (geofencing_service.aio)
+
+
+def reduce_uas_zones_geometry(uas_zones: List[UASZone],
+                              simplify_tolerance_meters: Optional[float] = None,
+                              coordinate_precision: Optional[int] = None) -> List[UASZone]:
+    """
+    Replaces the horizontal projections of the retrieved UASZones with their precomputed simplified
+    version that best matches the requested tolerance and/or rounds their coordinates to the
+    requested number of decimals. The UASZones are only meant to be serialized and not saved back.
+
+    :param uas_zones:
+    :param simplify_tolerance_meters:
+    :param coordinate_precision:
+    :return:
+    """
+    for uas_zone in uas_zones:
+        for airspace_volume in uas_zone.geometry:
+            polygon = get_polygon_geojson(airspace_volume.horizontal_projection)
+
+            if simplify_tolerance_meters is not None:
+                polygon = select_simplified_polygon(
+                    polygon=polygon,
+                    simplified_polygons=airspace_volume.simplified_projections or {},
+                    tolerance_in_m=simplify_tolerance_meters
+                )
+
+            if coordinate_precision is not None:
+                polygon = quantize_polygon(polygon, coordinate_precision)
+
+                if airspace_volume.circle:
+                    airspace_volume.circle.center = [round(coord, coordinate_precision)
+                                                     for coord in airspace_volume.circle.center]
+
+            airspace_volume.horizontal_projection = polygon
+
+    return uas_zones
+
+
+def create_uas_zones_subscription(context: UASZonesSubscriptionCreateContext) \
+        -> UASZonesSubscriptionCreateContext:
+    """
+    Handles the creation event unless the subscription was created by a previous request with the
+    same idempotency key
+
+    :param context:
+    :return:
+    """
+    try:
+        reuse_idempotency_record(context)
+    except ValueError as e:
+        raise BadRequestError(str(e))
+    except RuntimeError as e:
+        raise ConflictError(str(e))
+
+    if context.uas_zones_subscription is None:
+        context = events.create_uas_zones_subscription_event.handle(context=context)
+
+    return context
+
+
+def get_uas_zones_subscription_reply_object(uas_zones_subscription: UASZonesSubscription) \
+        -> UASZoneSubscriptionReplyObject:
+    """
+    :param uas_zones_subscription:
+    :return:
+    """
+    return UASZoneSubscriptionReplyObject(
+        subscription_id=uas_zones_subscription.id,
+        publication_location=uas_zones_subscription.sm_subscription.queue,
+        active=uas_zones_subscription.sm_subscription.active,
+        uas_zones_filter=uas_zones_subscription.uas_zones_filter
+    )
@@ -34,14 +34,21 @@ from enum import Enum
 from functools import wraps
 from typing import List, Optional, Type
 
+from flask import Response, request, current_app
 from marshmallow import Schema
 from swim_backend.errors import APIError
 
 from geofencing_service.db.models import UASZone,UASZonesFilter
+from geofencing_service.encoding import JSON_MIMETYPE, MIMETYPES, ENCODINGS, serialize, compress
+from geofencing_service.endpoints.schemas.registry import get_schema
 from geofencing_service.endpoints.schemas.reply_schemas import ReplySchema
+from geofencing_service.metrics import REQUESTS, REQUEST_LATENCY, SERIALIZATION_LATENCY, timer
 
 __author__ = "EUROCONTROL (SWIM)"
 
+# responses smaller than this (in bytes) are not compressed
+RESPONSE_COMPRESSION_MIN_SIZE = 1024
+
 
 class RequestStatus(Enum):
     OK = "OK"
@@ -125,18 +132,31 @@ class UASZoneSubscriptionsReply(Reply):
         self.uas_zone_subscriptions = uas_zone_subscriptions
 
 
+def get_accepted_mimetype() -> str:
+    """
+    Negotiates the mimetype of the reply based on the Accept header of the request. JSON is used by
+    default.
+    :return:
+    """
+    return request.accept_mimetypes.best_match(MIMETYPES, default=JSON_MIMETYPE)
+
+
 def handle_response(schema: Type[Schema]):
     """
     Handles the response by dumping the returned object using the provided schema class and by
-    handling any possible exception
+    handling any possible exception. The dumped object is serialized in binary format (MessagePack
+    or CBOR) if requested by the client, otherwise it is left to be returned as JSON.
     :param schema: the schema class
     :return:
     """
     def decorator(func):
+        operation = func.__name__
+
         @wraps(func)
         def wrapper(*args, **kwargs):
             try:
-                result, status_code = func(*args, **kwargs)
+                with timer(REQUEST_LATENCY, operation):
+                    result, status_code = func(*args, **kwargs)
             except Exception as e:
                 traceback.print_exc()
                 result = Reply(
@@ -146,7 +166,18 @@ def handle_response(schema: Type[Schema]):
                     )
                 )
                 status_code = e.status if isinstance(e, APIError) else 500
-            return schema().dump(result), status_code
+
+            REQUESTS.labels(operation, status_code).inc()
+
+            with timer(SERIALIZATION_LATENCY, operation):
+                data = get_schema(schema).dump(result)
+
+                mimetype = get_accepted_mimetype()
+                if mimetype != JSON_MIMETYPE:
+                    return Response(serialize(data, mimetype), status=status_code,
+                                    mimetype=mimetype)
+
+            return data, status_code
         return wrapper
     return decorator
 
@@ -162,6 +193,51 @@ def handle_flask_request_error(response):
             request_status=RequestStatus.NOK.value,
             request_exception_description=response.json['detail']))
 
-        response.data = json.dumps(ReplySchema().dump(reply))
+        response.data = json.dumps(get_schema(ReplySchema).dump(reply))
 
     return response
+
+
+def compress_response(response: Response) -> Response:
+    """
+    Compresses the response body with the best encoding that is accepted by the client (brotli or
+    gzip) in case it exceeds the configured size threshold.
+    :param response:
+    :return:
+    """
+    config = current_app.config.get('RESPONSE_COMPRESSION', {})
+
+    if response.direct_passthrough \
+            or response.status_code in (204, 304) \
+            or 'Content-Encoding' in response.headers:
+        return response
+
+    encoding = request.accept_encodings.best_match(config.get('ENCODINGS', ENCODINGS))
+    if encoding is None:
+        return response
+
+    data = response.get_data()
+    if len(data) < config.get('MIN_SIZE', RESPONSE_COMPRESSION_MIN_SIZE):
+        return response
+
+    response.set_data(compress(data, encoding))
+    response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+
+    return response
+
+
+def make_nok_response(request_exception_description: str, status_code: int) -> Response:
+    """
+    Creates a JSON response with a NOK Reply for endpoints that do not reply with JSON on success
+    :param request_exception_description:
+    :param status_code:
+    :return:
+    """
+    reply = Reply(generic_reply=GenericReply(
+        request_status=RequestStatus.NOK.value,
+        request_exception_description=request_exception_description))
+
+    return Response(json.dumps(get_schema(ReplySchema).dump(reply)),
+                    status=status_code,
+                    mimetype='application/json')
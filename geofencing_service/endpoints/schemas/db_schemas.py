@@ -27,15 +27,23 @@ http://opensource.org/licenses/BSD-3-Clause
 
 Details on EUROCONTROL: http://www.eurocontrol.int
 """
-from marshmallow import Schema, post_dump, pre_load, post_load, validate, ValidationError, EXCLUDE
+from datetime import timezone, time
+from typing import Optional, Sequence
+
+import dateutil.parser
+from marshmallow import Schema, post_dump, post_load, validate, ValidationError, EXCLUDE
 from marshmallow.fields import String, Nested, Integer, Dict, AwareDateTime, List, Email, URL, \
-    Boolean, Float
+    Boolean, Float, Field
 
 from geofencing_service.db import FEET_TO_METERS_RATIO
-from geofencing_service.db.models import UASZone, UomDistance, UASZonesFilter, AirspaceVolume
-from geofencing_service.endpoints.utils import time_str_from_datetime_str, \
-    make_datetime_string_aware, datetime_str_from_time_str, is_valid_duration_format, \
-    circumscribed_polygon_from_circle
+from geofencing_service.db.fields import to_utc_time_of_day, END_OF_DAY
+from geofencing_service.db.models import UASZone, UomDistance, UASZonesFilter, AirspaceVolume, \
+    CodeWeekDay
+from geofencing_service.endpoints.schemas.registry import get_schema
+from geofencing_service.endpoints.schemas.validation import is_request_body_validated
+from geofencing_service.endpoints.utils import datetime_str_from_time_str, \
+    is_valid_duration_format, circumscribed_polygon_from_circle, parse_strict_iso_datetime, \
+    parse_strict_iso_time
 
 __author__ = "EUROCONTROL (SWIM)"
 
@@ -45,6 +53,62 @@ class BaseSchema(Schema):
         unknown = EXCLUDE
 
 
+MIDNIGHT = time(0, 0, tzinfo=timezone.utc)
+END_OF_DAY_ISO = '24:00:00+00:00'
+
+
+class AwareTime(Field):
+    """
+    A timezone aware time, i.e. 09:00:00+02:00. Times without offset are loaded as UTC. The end of
+    the day is represented as 24:00:00+00:00 (only in UTC since it cannot be moved to another day).
+    """
+    default_error_messages = {'invalid': 'Not a valid time.'}
+
+    def _serialize(self, value, attr, obj, **kwargs):
+        if value == END_OF_DAY:
+            return END_OF_DAY_ISO
+
+        return value.isoformat() if value is not None else None
+
+    def _deserialize(self, value, attr, data, **kwargs):
+        if isinstance(value, str) and value.startswith('24:'):
+            if parse_strict_iso_time(f'00:{value[3:]}') != MIDNIGHT:
+                raise self.make_error('invalid')
+
+            return END_OF_DAY
+
+        result = parse_strict_iso_time(value) if isinstance(value, str) else None
+        if result is not None:
+            return result
+
+        try:
+            result = dateutil.parser.isoparse(datetime_str_from_time_str(value))
+        except (TypeError, ValueError):
+            raise self.make_error('invalid')
+
+        if result.tzinfo is None:
+            result = result.replace(tzinfo=timezone.utc)
+
+        return result.timetz()
+
+
+class UTCAwareDateTime(AwareDateTime):
+    """
+    A timezone aware datetime. Datetimes without offset are loaded as UTC. Those in the strict
+    ISO 8601 form, i.e. 2020-01-01T09:00:00.000Z, skip the (slower) lenient parsing of marshmallow.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(default_timezone=timezone.utc, **kwargs)
+
+    def _deserialize(self, value, attr, data, **kwargs):
+        result = parse_strict_iso_datetime(value) if isinstance(value, str) else None
+        if result is not None:
+            return result
+
+        return super()._deserialize(value, attr, data, **kwargs)
+
+
 def validate_polygon_coordinates_linestring(linestring):
 
     if len(linestring) < 3:
@@ -80,16 +144,31 @@ class CircleSchema(BaseSchema):
     radius = Float(required=True, validate=validate_radius)
 
 
+def validate_polygon_rings_closed(coordinates):
+    for index, linestring in enumerate(coordinates):
+        if linestring[0] != linestring[-1]:
+            raise ValidationError(message={'coordinates': {index: ['Linestring is not closed.']}})
+
+
 def validate_horizontal_projection(value):
+    if is_request_body_validated():
+        # the structure of the projection has been validated against openapi.yml along with the
+        # rest of the request body so only the closing of the rings, which can not be expressed
+        # in JSON Schema, is left to be checked
+        if value['type'] == 'Polygon':
+            validate_polygon_rings_closed(value['coordinates'])
+
+        return True
+
     if 'type' not in value:
         raise ValidationError(
             message={'type': ['Missing data for required field.']}
         )
 
     if value['type'] == 'Circle':
-        CircleSchema().load(value)
+        get_schema(CircleSchema).load(value)
     elif value['type'] == 'Polygon':
-        PolygonSchema().load(value)
+        get_schema(PolygonSchema).load(value)
     else:
         raise ValidationError(
             message={'type': ['Invalid geometry type. Expected one of [Circle, Polygon]']})
@@ -104,7 +183,7 @@ class AirspaceVolumeSchema(BaseSchema):
     lower_vertical_reference = String(data_key="lowerVerticalReference", missing=None)
     upper_limit = Integer(data_key="upperLimit", missing=None)
     upper_vertical_reference = String(data_key="upperVerticalReference", missing=None)
-    uom_dimensions = String(data_key="uomDimensions")
+    uom_dimensions = String(data_key="uomDimensions", missing=None)
     circle = Nested(CircleSchema)
 
     @post_load
@@ -147,62 +226,91 @@ class AirspaceVolumeSchema(BaseSchema):
 
 class UASZonesFilterSchema(BaseSchema):
     airspace_volume = Nested(AirspaceVolumeSchema, data_key='airspaceVolume')
-    start_date_time = AwareDateTime(data_key='startDateTime')
-    end_date_time = AwareDateTime(data_key='endDateTime')
+    start_date_time = UTCAwareDateTime(data_key='startDateTime')
+    end_date_time = UTCAwareDateTime(data_key='endDateTime')
     regions = List(Integer)
 
     @post_load
     def load_filter(self, data, **kwargs):
         return UASZonesFilter(**data)
 
-    @pre_load
-    def handle_datetime_awareness_load(self, data, **kwargs):
-        data["startDateTime"] = make_datetime_string_aware(data["startDateTime"])
-        data["endDateTime"] = make_datetime_string_aware(data["endDateTime"])
 
-        return data
+class UASZonesFilterOptionsSchema(BaseSchema):
+    simplify_tolerance_meters = Float(data_key='simplifyToleranceMeters',
+                                      validate=validate.Range(min=0))
+    coordinate_precision = Integer(data_key='coordinatePrecision',
+                                   validate=validate.Range(min=0, max=15))
 
 
 class DailyPeriodSchema(BaseSchema):
     day = String()
-    start_time = AwareDateTime(data_key='startTime', required=True)
-    end_time = AwareDateTime(data_key='endTime', required=True)
+    start_time = AwareTime(data_key='startTime', required=True)
+    end_time = AwareTime(data_key='endTime', required=True)
 
-    @pre_load
-    def convert_time_to_datetime(self, data, **kwargs):
-        data['startTime'] = datetime_str_from_time_str(data['startTime'])
-        data['endTime'] = datetime_str_from_time_str(data['endTime'])
 
-        return data
+WEEK_DAYS = [day.value for day in CodeWeekDay if day != CodeWeekDay.ANY]
 
-    @post_dump
-    def handle_time_format(self, data, **kwargs):
-        """
-        Makes the dumped datetimes timezone aware as it seems that this info is not kept in mongodb
-        TODO: to be checked
 
-        :param data:
-        :param many:
-        :param kwargs:
-        :return:
-        """
 
-        data['startTime'] = time_str_from_datetime_str(make_datetime_string_aware(data['startTime']))
-        data['endTime'] = time_str_from_datetime_str(make_datetime_string_aware(data['endTime']))
+def _shift_week_day(day: Optional[str], days: int) -> Optional[str]:
+    if day not in WEEK_DAYS:
+        # ANY or missing
+        return day
 
-        return data
+    return WEEK_DAYS[(WEEK_DAYS.index(day) + days) % len(WEEK_DAYS)]
+
+
+def to_utc_daily_periods(period: dict) -> Sequence[dict]:
+    """
+    Converts the times of a daily period to UTC and shifts its day if the conversion moves them to
+    another day, i.e. MON 01:00+02:00 - 03:00+02:00 becomes SUN 23:00 - MON 01:00. A period whose
+    start and end end up on different days is split in two at midnight, the first part ending at
+    the end of its day (24:00). A period ending at midnight of the day after its start ends at the
+    end of the day of its start instead, i.e. MON 00:30+01:00 - 01:00+01:00 becomes
+    SUN 23:30 - 24:00.
+
+    :param period: a loaded DailyPeriodSchema
+    :return: the daily periods in UTC
+    """
+    start_time, start_shift = to_utc_time_of_day(period['start_time'])
+    end_time, end_shift = (END_OF_DAY, 0) if period['end_time'] == END_OF_DAY \
+        else to_utc_time_of_day(period['end_time'])
+
+    if end_time == MIDNIGHT and end_shift > start_shift:
+        end_time, end_shift = END_OF_DAY, end_shift - 1
+
+    def make_period(days: int, start: time, end: time) -> dict:
+        result = dict(period, start_time=start, end_time=end)
+        if 'day' in period:
+            result['day'] = _shift_week_day(period['day'], days)
+
+        return result
+
+    if start_shift == end_shift:
+        return [make_period(start_shift, start_time, end_time)]
+
+    return [make_period(start_shift, start_time, END_OF_DAY),
+            make_period(end_shift, MIDNIGHT, end_time)]
 
 
 class TimePeriodSchema(BaseSchema):
     permanent = String()
-    start_date_time = AwareDateTime(data_key='startDateTime', required=True)
-    end_date_time = AwareDateTime(data_key='endDateTime', required=True)
+    start_date_time = UTCAwareDateTime(data_key='startDateTime', required=True)
+    end_date_time = UTCAwareDateTime(data_key='endDateTime', required=True)
     schedule = Nested(DailyPeriodSchema, many=True, data_key='schedule')
 
-    @post_dump
-    def handle_datetime_awareness_dump(self, data, **kwargs):
-        data["startDateTime"] = make_datetime_string_aware(data["startDateTime"])
-        data["endDateTime"] = make_datetime_string_aware(data["endDateTime"])
+    @post_load
+    def schedule_to_utc(self, data, **kwargs):
+        """
+        The daily periods are stored in UTC without their offset, so their days are converted along
+        with their times
+        :param data:
+        :param kwargs:
+        :return:
+        """
+        if data.get('schedule'):
+            data['schedule'] = [utc_period for period in data['schedule']
+                                for utc_period in to_utc_daily_periods(period)]
 
         return data
 
@@ -0,0 +1,84 @@
+"""
+Copyright 2020 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+import threading
+from typing import Dict, Tuple, Type, TypeVar
+
+from marshmallow import Schema
+from marshmallow.fields import Field, Nested, List
+
+__author__ = "EUROCONTROL (SWIM)"
+
+SchemaType = TypeVar('SchemaType', bound=Schema)
+
+_lock = threading.Lock()
+
+_schemas: Dict[Tuple[Type[Schema], bool], Schema] = {}
+
+
+def _resolve_nested_schemas(field: Field) -> None:
+    """
+    Nested fields create their schema upon their first usage. It is done here in advance so that
+    concurrent requests never race to create them.
+
+    :param field:
+    """
+    if isinstance(field, List):
+        _resolve_nested_schemas(field.inner)
+    elif isinstance(field, Nested):
+        for nested_field in field.schema.fields.values():
+            _resolve_nested_schemas(nested_field)
+
+
+def get_schema(schema_class: Type[SchemaType], many: bool = False) -> SchemaType:
+    """
+    Returns a shared instance of the schema class. Building a schema deep copies its declared
+    fields, which is avoided by reusing the same instance across requests and threads. The
+    instances must not be modified (i.e. their context) since they are shared.
+
+    :param schema_class:
+    :param many:
+    :return:
+    """
+    key = (schema_class, many)
+
+    schema = _schemas.get(key)
+    if schema is not None:
+        return schema
+
+    with _lock:
+        if key not in _schemas:
+            schema = schema_class(many=many)
+
+            for field in schema.fields.values():
+                _resolve_nested_schemas(field)
+
+            _schemas[key] = schema
+
+    return _schemas[key]
@@ -39,7 +39,10 @@ from geofencing_service.db.subscriptions import get_uas_zones_subscription_by_id
 from geofencing_service.endpoints.reply import handle_response, SubscribeToUASZonesUpdatesReply, \
     Reply, GenericReply, RequestStatus, UASZoneSubscriptionReply, UASZoneSubscriptionsReply, \
     UASZoneSubscriptionReplyObject
+from geofencing_service.endpoints.helpers import create_uas_zones_subscription, \
+    get_uas_zones_subscription_reply_object
 from geofencing_service.endpoints.schemas.db_schemas import SubscriptionSchema, UASZonesFilterSchema
+from geofencing_service.endpoints.schemas.registry import get_schema
 from geofencing_service.endpoints.schemas.reply_schemas import \
     SubscribeToUASZonesUpdatesReplySchema, ReplySchema, UASZoneSubscriptionReplySchema, \
     UASZoneSubscriptionsReplySchema
@@ -52,27 +55,31 @@ from geofencing_service.events.uas_zones_subscription_handlers import \
 
 _logger = logging.getLogger(__name__)
 
+IDEMPOTENCY_KEY_HEADER = 'Idempotency-Key'
+
 
 @handle_response(SubscribeToUASZonesUpdatesReplySchema)
 def create_subscription_to_uas_zones_updates() -> Tuple[SubscribeToUASZonesUpdatesReply, int]:
     """
     POST /subscriptions/
 
-    Expected HTTP codes: 201, 400, 401, 500
+    Expected HTTP codes: 201, 400, 401, 409, 500
+
+    A retry carrying the same Idempotency-Key header returns the subscription that was created by
+    the first request, or reuses what a failed attempt left in Subscription Manager.
 
     :return:
     """
     try:
-        uas_zones_filter = UASZonesFilterSchema().load(request.get_json())
+        uas_zones_filter = get_schema(UASZonesFilterSchema).load(request.get_json())
     except ValidationError as e:
         raise BadRequestError(str(e))
 
-    context = events.create_uas_zones_subscription_event.handle(
-        context=UASZonesSubscriptionCreateContext(
-            uas_zones_filter=uas_zones_filter,
-            user=request.user
-        )
-    )
+    context = create_uas_zones_subscription(UASZonesSubscriptionCreateContext(
+        uas_zones_filter=uas_zones_filter,
+        user=request.user,
+        idempotency_key=request.headers.get(IDEMPOTENCY_KEY_HEADER)
+    ))
 
     reply = SubscribeToUASZonesUpdatesReply(
         subscription_id=context.uas_zones_subscription.id,
@@ -82,15 +89,6 @@ def create_subscription_to_uas_zones_updates() -> Tuple[SubscribeToUASZonesUpdat
     return reply, 201
 
 
-def _get_uas_zone_subscription_reply_object_from_uas_zones_subscription(uas_zones_subscription):
-    return UASZoneSubscriptionReplyObject(
-        subscription_id=uas_zones_subscription.id,
-        publication_location=uas_zones_subscription.sm_subscription.queue,
-        active=uas_zones_subscription.sm_subscription.active,
-        uas_zones_filter=uas_zones_subscription.uas_zones_filter
-    )
-
-
 @handle_response(UASZoneSubscriptionsReplySchema)
 def get_subscriptions_to_uas_zones_updates() -> Tuple[Reply, int]:
     """
@@ -105,7 +103,7 @@ def get_subscriptions_to_uas_zones_updates() -> Tuple[Reply, int]:
 
     reply = UASZoneSubscriptionsReply(
         uas_zone_subscriptions=[
-            _get_uas_zone_subscription_reply_object_from_uas_zones_subscription(subscription)
+            get_uas_zones_subscription_reply_object(subscription)
             for subscription in uas_zone_subscriptions
         ]
     )
@@ -128,8 +126,7 @@ def get_subscription_to_uas_zones_updates(subscription_id: str) -> Tuple[Reply,
     if uas_zones_subscription is None:
         raise NotFoundError(f"Subscription with id {subscription_id} does not exist")
 
-    reply_object = _get_uas_zone_subscription_reply_object_from_uas_zones_subscription(
-        uas_zones_subscription)
+    reply_object = get_uas_zones_subscription_reply_object(uas_zones_subscription)
 
     return UASZoneSubscriptionReply(uas_zone_subscription=reply_object), 200
 
@@ -150,7 +147,7 @@ def update_subscription_to_uas_zones_updates(subscription_id: str) -> Tuple[Repl
         raise NotFoundError(f"Subscription with id {subscription_id} does not exist")
 
     try:
-        updated_subscription_dict = SubscriptionSchema().load(data=request.get_json())
+        updated_subscription_dict = get_schema(SubscriptionSchema).load(data=request.get_json())
     except ValidationError as e:
         raise BadRequestError(str(e))
 
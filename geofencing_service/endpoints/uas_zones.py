@@ -27,24 +27,31 @@ http://opensource.org/licenses/BSD-3-Clause
 
 Details on EUROCONTROL: http://www.eurocontrol.int
 """
-from typing import Tuple
+from typing import Tuple, List, Optional
 
-from flask import request
+from flask import request, Response
 from marshmallow import ValidationError
 from swim_backend.errors import BadRequestError, NotFoundError
 
 from geofencing_service.db.uas_zones import get_uas_zones as db_get_uas_zones, \
-    get_uas_zones_by_identifier
+    get_uas_zones_by_identifier, get_uas_zones_version
+from geofencing_service.endpoints.helpers import reduce_uas_zones_geometry
 from geofencing_service.endpoints.reply import UASZoneFilterReply, handle_response, \
-    UASZoneCreateReply, Reply, GenericReply, RequestStatus
-from geofencing_service.endpoints.schemas.db_schemas import UASZoneSchema, UASZonesFilterSchema
+    UASZoneCreateReply, Reply, GenericReply, RequestStatus, make_nok_response
+from geofencing_service.endpoints.schemas.db_schemas import UASZoneSchema, UASZonesFilterSchema, \
+    UASZonesFilterOptionsSchema
+from geofencing_service.endpoints.schemas.registry import get_schema
 from geofencing_service.endpoints.schemas.reply_schemas import UASZonesFilterReplySchema, \
     UASZoneCreateReplySchema, ReplySchema
 from geofencing_service.events import events
+from geofencing_service.endpoints.vector_tiles import is_valid_tile, get_vector_tile
 from geofencing_service.events.uas_zone_handlers import UASZoneContext
+from geofencing_service.metrics import UAS_ZONES_RETURNED
 
 __author__ = "EUROCONTROL (SWIM)"
 
+MVT_MIMETYPE = 'application/vnd.mapbox-vector-tile'
+
 
 @handle_response(UASZonesFilterReplySchema)
 def filter_uas_zones() -> Tuple[UASZoneFilterReply, int]:
@@ -56,11 +63,24 @@ def filter_uas_zones() -> Tuple[UASZoneFilterReply, int]:
     :return:
     """
     try:
-        uas_zones_filter = UASZonesFilterSchema().load(request.get_json())
+        uas_zones_filter = get_schema(UASZonesFilterSchema).load(request.get_json())
+        filter_options = get_schema(UASZonesFilterOptionsSchema).load(request.get_json())
     except ValidationError as e:
         raise BadRequestError(str(e))
 
-    uas_zones = db_get_uas_zones(uas_zones_filter, user=request.user)
+    simplify_tolerance_meters = filter_options.get('simplify_tolerance_meters')
+    coordinate_precision = filter_options.get('coordinate_precision')
+
+    uas_zones = db_get_uas_zones(uas_zones_filter,
+                                 user=request.user,
+                                 with_simplified_projections=simplify_tolerance_meters is not None)
+
+    UAS_ZONES_RETURNED.observe(len(uas_zones))
+
+    if simplify_tolerance_meters is not None or coordinate_precision is not None:
+        uas_zones = reduce_uas_zones_geometry(uas_zones,
+                                              simplify_tolerance_meters=simplify_tolerance_meters,
+                                              coordinate_precision=coordinate_precision)
 
     return UASZoneFilterReply(uas_zones=uas_zones), 200
 
@@ -74,7 +94,7 @@ def create_uas_zone() -> Tuple[UASZoneCreateReply, int]:
     :return:
     """
     try:
-        uas_zone = UASZoneSchema().load(request.get_json())
+        uas_zone = get_schema(UASZoneSchema).load(request.get_json())
     except ValidationError as e:
         raise BadRequestError(str(e))
 
@@ -103,3 +123,22 @@ def delete_uas_zone(uas_zone_identifier: str) -> Tuple[Reply, int]:
                                                                user=request.user))
 
     return Reply(generic_reply=GenericReply(request_status=RequestStatus.OK.value)), 204
+
+
+def get_uas_zones_vector_tile(z: int, x: int, y: int) -> Response:
+    """
+    GET /uas_zones/tiles/{z}/{x}/{y}
+
+    Expected HTTP codes: 200, 400, 401, 500
+
+    :param z: zoom level
+    :param x: tile column
+    :param y: tile row
+    :return:
+    """
+    if not is_valid_tile(z, x, y):
+        return make_nok_response(f"Invalid tile {z}/{x}/{y}", 400)
+
+    tile = get_vector_tile(request.user.id, get_uas_zones_version(), z, x, y)
+
+    return Response(tile, status=200, mimetype=MVT_MIMETYPE)
@@ -31,32 +31,26 @@ __author__ = "EUROCONTROL (SWIM)"
 
 import json
 import re
-from datetime import datetime, timezone
+from datetime import datetime, timezone, time
+from typing import Optional
 
-import dateutil.parser
-
-import geog
-import numpy as np
-import shapely.geometry
 
 POLYGON_TO_CIRCLE_EDGES = 10
 
 _ISO_8601_CHECK_PATTERN = r'^P(?!$)((?P<years>\d+)Y)?((?P<months>\d+)M)?(\d+W)?(\d+D)?(T(?=\d)(\d+H)?(\d+M)?(\d+S)?)?$'
 _iso_8601_check_regex = re.compile(_ISO_8601_CHECK_PATTERN)
 
+# the forms supported by datetime.fromisoformat and time.fromisoformat since python 3.7 (plus `Z`)
+_ISO_TIME_STRICT_PATTERN = r'\d{2}:\d{2}:\d{2}(\.\d{3}|\.\d{6})?(Z|[+-]\d{2}:\d{2})?'
+_iso_datetime_strict_regex = re.compile(rf'^\d{{4}}-\d{{2}}-\d{{2}}T{_ISO_TIME_STRICT_PATTERN}$')
+_iso_time_strict_regex = re.compile(rf'^{_ISO_TIME_STRICT_PATTERN}$')
 
-def time_str_from_datetime_str(date_string: str) -> str:
-    """
-    Extracts the time parts of a datetime.
+UTC = timezone.utc
 
-    Example:
-        2019-12-03T09:00:00.12345 will be converted to:
-        09:00:00.12345
 
-    :param date_string:
-    :return:
-    """
-    return date_string.split('T')[1]
+def _utc_offset_from_z(value: str) -> str:
+    # fromisoformat does not support the `Z` suffix before python 3.11
+    return value[:-1] + '+00:00' if value.endswith('Z') else value
 
 
 def datetime_str_from_time_str(time_str: str) -> str:
@@ -69,14 +63,43 @@ def datetime_str_from_time_str(time_str: str) -> str:
     return f"2000-01-01T{time_str}"
 
 
-def make_datetime_string_aware(dt: str) -> str:
+def parse_strict_iso_datetime(value: str) -> Optional[datetime]:
     """
-    Applies UTC timezone on a datetime string,
+    Parses fast, with datetime.fromisoformat, a datetime in the strict ISO 8601 form
+    YYYY-MM-DDTHH:MM:SS[.fff|.ffffff][Z|+HH:MM]. Naive datetimes are considered UTC.
 
-    :param dt:
-    :return:
+    :param value:
+    :return: the aware datetime or None if the value is not in the strict form, in which case it is
+             left to the (slower) lenient parsers
+    """
+    if not _iso_datetime_strict_regex.match(value):
+        return None
+
+    try:
+        result = datetime.fromisoformat(_utc_offset_from_z(value))
+    except ValueError:
+        return None
+
+    return result if result.tzinfo is not None else result.replace(tzinfo=UTC)
+
+
+def parse_strict_iso_time(value: str) -> Optional[time]:
+    """
+    Parses fast, with time.fromisoformat, a time in the strict ISO 8601 form
+    HH:MM:SS[.fff|.ffffff][Z|+HH:MM]. Naive times are considered UTC.
+
+    :param value:
+    :return: the aware time or None if the value is not in the strict form
     """
-    return make_datetime_aware(dateutil.parser.parse(dt)).isoformat()
+    if not _iso_time_strict_regex.match(value):
+        return None
+
+    try:
+        result = time.fromisoformat(_utc_offset_from_z(value))
+    except ValueError:
+        return None
+
+    return result if result.tzinfo is not None else result.replace(tzinfo=UTC)
 
 
 def make_datetime_aware(dt: datetime) -> datetime:
@@ -106,6 +129,12 @@ def inscribed_polygon_from_circle(lon: float, lat: float, radius_in_m: float, n_
     :param n_edges: how many edges should the polygon have
     :return:
     """
+    # the geometry libraries are imported on first use in order to keep them out of the start up
+    # time
+    import geog
+    import numpy as np
+    import shapely.geometry
+
     center_point = shapely.geometry.Point([lon, lat])
 
     # linspace accepts number of points so we add 1 to have the desired number of edges
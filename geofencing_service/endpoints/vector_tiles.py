@@ -0,0 +1,209 @@
+"""
+Copyright 2020 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+import math
+from functools import lru_cache
+from typing import Tuple, List, Optional, Dict, Any
+
+from geofencing_service.db.models import UASZone, AirspaceVolume
+from geofencing_service.db.uas_zones import get_uas_zones_by_horizontal_projection
+
+__author__ = "EUROCONTROL (SWIM)"
+
+MAX_ZOOM = 22
+TILE_EXTENT = 4096
+# the buffer around the tile (in tile units) that is kept while clipping in order to avoid
+# rendering artifacts on the tile borders
+TILE_BUFFER = 64
+# the simplification tolerance in tile units
+TILE_SIMPLIFY_TOLERANCE = 1
+# below this zoom level the tiles are too large to be used as a geospatial query
+MIN_QUERY_ZOOM = 3
+VECTOR_TILES_CACHE_SIZE = 1024
+LAYER_NAME = 'uas_zones'
+
+_EARTH_RADIUS_IN_M = 6378137.0
+_MERCATOR_MAX_LAT = 85.0511287798066
+
+
+def is_valid_tile(z: int, x: int, y: int) -> bool:
+    """
+    :param z: zoom level
+    :param x: tile column
+    :param y: tile row
+    :return:
+    """
+    return 0 <= z <= MAX_ZOOM and 0 <= x < 2 ** z and 0 <= y < 2 ** z
+
+
+def tile_bounds(z: int, x: int, y: int) -> Tuple[float, float, float, float]:
+    """
+    Calculates the bounds of a Web Mercator (XYZ) tile in (lon, lat) coordinates
+    :param z:
+    :param x:
+    :param y:
+    :return: (min_lon, min_lat, max_lon, max_lat)
+    """
+    n_tiles = 2 ** z
+
+    def lat(row):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / n_tiles))))
+
+    return x / n_tiles * 360.0 - 180.0, lat(y + 1), (x + 1) / n_tiles * 360.0 - 180.0, lat(y)
+
+
+def lon_lat_to_mercator(lon: float, lat: float) -> Tuple[float, float]:
+    """
+    Projects (lon, lat) coordinates to Web Mercator (EPSG:3857) coordinates in meters
+    :param lon:
+    :param lat:
+    :return:
+    """
+    lat = max(min(lat, _MERCATOR_MAX_LAT), -_MERCATOR_MAX_LAT)
+
+    return (
+        _EARTH_RADIUS_IN_M * math.radians(lon),
+        _EARTH_RADIUS_IN_M * math.log(math.tan(math.pi / 4 + math.radians(lat) / 2))
+    )
+
+
+def _project_to_mercator(geometry):
+    import shapely.ops
+
+    return shapely.ops.transform(
+        lambda lons, lats, zs=None: tuple(zip(*[lon_lat_to_mercator(lon, lat)
+                                                for lon, lat in zip(lons, lats)])),
+        geometry
+    )
+
+
+def _get_feature_properties(uas_zone: UASZone, airspace_volume: AirspaceVolume) \
+        -> Dict[str, Any]:
+    properties = {
+        'identifier': uas_zone.identifier,
+        'name': uas_zone.name,
+        'country': uas_zone.country,
+        'region': uas_zone.region,
+        'type': uas_zone.type,
+        'restriction': uas_zone.restriction,
+        'uomDimensions': airspace_volume.uom_dimensions,
+        'lowerLimit': airspace_volume.lower_limit,
+        'upperLimit': airspace_volume.upper_limit,
+    }
+
+    # MVT does not support null values
+    return {key: value for key, value in properties.items() if value is not None}
+
+
+def render_vector_tile(uas_zones: List[UASZone], z: int, x: int, y: int) -> bytes:
+    """
+    Clips and simplifies the horizontal projections of the provided UASZones within the given
+    tile and encodes them in a Mapbox Vector Tile.
+
+    :param uas_zones:
+    :param z:
+    :param x:
+    :param y:
+    :return: the protobuf encoded tile
+    """
+    # the rendering libraries are imported on first use in order to keep them out of the start up
+    # time
+    import mapbox_vector_tile
+    import shapely.geometry
+
+    min_lon, min_lat, max_lon, max_lat = tile_bounds(z, x, y)
+    min_x, min_y = lon_lat_to_mercator(min_lon, min_lat)
+    max_x, max_y = lon_lat_to_mercator(max_lon, max_lat)
+
+    tile_unit = (max_x - min_x) / TILE_EXTENT
+    clip_buffer = TILE_BUFFER * tile_unit
+    clip_box = shapely.geometry.box(min_x - clip_buffer,
+                                    min_y - clip_buffer,
+                                    max_x + clip_buffer,
+                                    max_y + clip_buffer)
+    features = []
+    for uas_zone in uas_zones:
+        for airspace_volume in uas_zone.geometry:
+            projection = shapely.geometry.shape(airspace_volume.horizontal_projection)
+            geometry = _project_to_mercator(projection).intersection(clip_box)
+
+            if geometry.is_empty:
+                continue
+
+            features.append({
+                'geometry': geometry.simplify(TILE_SIMPLIFY_TOLERANCE * tile_unit,
+                                              preserve_topology=True),
+                'properties': _get_feature_properties(uas_zone, airspace_volume)
+            })
+
+    return mapbox_vector_tile.encode(
+        [{'name': LAYER_NAME, 'features': features}],
+        quantize_bounds=(min_x, min_y, max_x, max_y),
+        extents=TILE_EXTENT
+    )
+
+
+def _get_tile_query_polygon(z: int, x: int, y: int) -> Optional[dict]:
+    import shapely.geometry
+
+    if z < MIN_QUERY_ZOOM:
+        return None
+
+    min_lon, min_lat, max_lon, max_lat = tile_bounds(z, x, y)
+    # the edges of the GeoJSON polygons are geodesics in MongoDB so the tile is slightly enlarged
+    # in order not to miss any UASZone along its edges
+    lon_margin, lat_margin = (max_lon - min_lon) / 8, (max_lat - min_lat) / 8
+    query_box = shapely.geometry.box(max(min_lon - lon_margin, -180.0),
+                                     max(min_lat - lat_margin, -90.0),
+                                     min(max_lon + lon_margin, 180.0),
+                                     min(max_lat + lat_margin, 90.0))
+
+    return shapely.geometry.mapping(query_box)
+
+
+@lru_cache(maxsize=VECTOR_TILES_CACHE_SIZE)
+def get_vector_tile(user_id: Any, uas_zones_version: int, z: int, x: int, y: int) -> bytes:
+    """
+    Renders the vector tile of the UASZones of the given user. The rendered tiles are cached by
+    the version of the set of UASZones so that any creation or deletion of a UASZone invalidates
+    them.
+
+    :param user_id:
+    :param uas_zones_version:
+    :param z:
+    :param x:
+    :param y:
+    :return:
+    """
+    uas_zones = get_uas_zones_by_horizontal_projection(
+        horizontal_projection=_get_tile_query_polygon(z, x, y),
+        user=user_id
+    )
+
+    return render_vector_tile(uas_zones, z, x, y)
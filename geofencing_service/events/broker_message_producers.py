@@ -32,16 +32,26 @@ __author__ = "EUROCONTROL (SWIM)"
 
 import enum
 import logging
+from typing import Optional, Dict, Any, TYPE_CHECKING
 
-import proton
 from flask import current_app
 
 from geofencing_service.db.models import UASZone
+from geofencing_service.encoding import JSON_MIMETYPE, serialize, compress, make_diff
 from geofencing_service.endpoints.schemas.db_schemas import UASZoneSchema
+from geofencing_service.endpoints.schemas.registry import get_schema
 from geofencing_service.events.uas_zone_handlers import UASZoneContext
+from geofencing_service.metrics import MESSAGES_ENQUEUED
+from geofencing_service.publisher import get_swim_publisher
+
+if TYPE_CHECKING:
+    import proton
 
 _logger = logging.getLogger(__name__)
 
+# the values of the fields that are left out of the diff of a UASZone creation
+_EMPTY_VALUES = (None, '', [], {})
+
 
 class UASZonesUpdatesMessageType(enum.Enum):
     UAS_ZONE_CREATION = 'UAS_ZONE_CREATION'
@@ -49,13 +59,57 @@ class UASZonesUpdatesMessageType(enum.Enum):
 
 
 class UASZonesUpdatesMessageProducerContext:
-    def __init__(self, message_type: UASZonesUpdatesMessageType, uas_zone: UASZone):
+    def __init__(self,
+                 message_type: UASZonesUpdatesMessageType,
+                 uas_zone: UASZone,
+                 uas_zones_version: Optional[int] = None,
+                 content_type: str = JSON_MIMETYPE,
+                 content_encoding: Optional[str] = None,
+                 delta: bool = False):
+        """
+        :param message_type:
+        :param uas_zone:
+        :param uas_zones_version: the version of the set of UASZones after the update
+        :param content_type: the mimetype the message body will be serialized in
+        :param content_encoding: the compression (if any) of the serialized message body
+        :param delta: whether the message body should only contain the changed fields
+        """
         self.message_type = message_type
         self.uas_zone: UASZone = uas_zone
+        self.uas_zones_version = uas_zones_version
+        self.content_type = content_type
+        self.content_encoding = content_encoding
+        self.delta = delta
+
+
+def _make_delta_message_body(context: UASZonesUpdatesMessageProducerContext) -> Dict[str, Any]:
+    """
+    UASZones are only created or deleted, so the diff of a creation consists of the non empty
+    fields of the UASZone (None, empty strings, lists and dicts are left out) and the diff of a
+    deletion is empty.
+
+    :param context:
+    :return:
+    """
+    if context.message_type == UASZonesUpdatesMessageType.UAS_ZONE_CREATION:
+        uas_zone = get_schema(UASZoneSchema).dump(context.uas_zone)
+        diff = make_diff(previous={},
+                         current={key: value for key, value in uas_zone.items()
+                                  if value not in _EMPTY_VALUES})
+    elif context.message_type == UASZonesUpdatesMessageType.UAS_ZONE_DELETION:
+        diff = {}
+    else:
+        raise Exception('Invalid message_type')
+
+    return {
+        'uas_zone_identifier': context.uas_zone.identifier,
+        'uas_zones_version': context.uas_zones_version,
+        'diff': diff
+    }
 
 
 def uas_zones_updates_message_producer(context: UASZonesUpdatesMessageProducerContext) \
-        -> proton.Message:
+        -> 'proton.Message':
     """
     The message producer (UASZones retrieval) that will be called every time the topic is triggered
     for publishing.
@@ -64,9 +118,14 @@ def uas_zones_updates_message_producer(context: UASZonesUpdatesMessageProducerCo
     filtering criteria of the subscription
     :return:
     """
-    if context.message_type == UASZonesUpdatesMessageType.UAS_ZONE_CREATION:
+    # proton is imported on first use in order to keep it out of the start up time
+    import proton
+
+    if context.delta:
+        message_body = _make_delta_message_body(context)
+    elif context.message_type == UASZonesUpdatesMessageType.UAS_ZONE_CREATION:
         message_body = {
-            'uas_zone': UASZoneSchema().dump(context.uas_zone)
+            'uas_zone': get_schema(UASZoneSchema).dump(context.uas_zone)
         }
     elif context.message_type == UASZonesUpdatesMessageType.UAS_ZONE_DELETION:
         message_body = {
@@ -77,7 +136,19 @@ def uas_zones_updates_message_producer(context: UASZonesUpdatesMessageProducerCo
 
     message_body['message_type'] = context.message_type.value
 
-    return proton.Message(body=message_body, content_type="application/json")
+    if context.content_type == JSON_MIMETYPE and context.content_encoding is None:
+        return proton.Message(body=message_body, content_type=JSON_MIMETYPE)
+
+    # the serialized body is sent as is in an AMQP data section
+    message = proton.Message(body=serialize(message_body, context.content_type),
+                             inferred=True,
+                             content_type=context.content_type)
+
+    if context.content_encoding is not None:
+        message.body = compress(message.body, context.content_encoding)
+        message.content_encoding = context.content_encoding
+
+    return message
 
 
 def publish_uas_zone_creation(event_context: UASZoneContext):
@@ -91,10 +162,19 @@ def publish_uas_zone_deletion(event_context: UASZoneContext):
 def _publish_uas_zone_update(event_context: UASZoneContext,
                              message_type: UASZonesUpdatesMessageType):
 
+    config = current_app.config.get('BROKER_MESSAGES', {})
+
     message_producer_context = UASZonesUpdatesMessageProducerContext(
         message_type=message_type,
-        uas_zone=event_context.uas_zone
+        uas_zone=event_context.uas_zone,
+        uas_zones_version=event_context.uas_zones_version,
+        content_type=config.get('CONTENT_TYPE', JSON_MIMETYPE),
+        content_encoding=config.get('CONTENT_ENCODING'),
+        delta=config.get('DELTA', False)
     )
+    swim_publisher = get_swim_publisher()
     for subscription in event_context.uas_zones_subscriptions:
-        current_app.swim_publisher.publish_topic(topic_name=subscription.sm_subscription.topic_name,
-                                                 context=message_producer_context)
+        swim_publisher.publish_topic(topic_name=subscription.sm_subscription.topic_name,
+                                     context=message_producer_context)
+
+    MESSAGES_ENQUEUED.labels(message_type.value).inc(len(event_context.uas_zones_subscriptions))
@@ -27,18 +27,85 @@ http://opensource.org/licenses/BSD-3-Clause
 
 Details on EUROCONTROL: http://www.eurocontrol.int
 """
-from typing import TypeVar
+import contextvars
+import copy
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from typing import TypeVar, Iterable, Callable, Optional, Dict, Set, Tuple, Any, List
+
+from flask import Flask, current_app, has_app_context
 
 import geofencing_service.events.broker_message_producers
 from geofencing_service.events import uas_zone_handlers
 from geofencing_service.events import uas_zones_subscription_handlers
 from geofencing_service.events.uas_zones_subscription_handlers import update_sm_subscription, \
     uas_zones_subscription_db_update, delete_sm_subscription, uas_zones_subscription_db_delete
+from geofencing_service.tracing import EventTracer
 
 __author__ = "EUROCONTROL (SWIM)"
 
+_logger = logging.getLogger(__name__)
+
 Context = TypeVar('Context')
 
+# the size of the thread pool running the independent handlers of the events, shared by all the
+# events of a process
+HANDLERS_MAX_WORKERS = 8
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_pid: Optional[int] = None
+_executor_lock = threading.Lock()
+
+_MISSING = object()
+
+
+def _get_handlers_max_workers() -> int:
+    if not has_app_context():
+        return HANDLERS_MAX_WORKERS
+
+    return current_app.config.get('EVENTS', {}).get('HANDLERS_MAX_WORKERS', HANDLERS_MAX_WORKERS)
+
+
+def _get_executor(max_workers: int) -> ThreadPoolExecutor:
+    """
+    :param max_workers:
+    :return: the thread pool of the current process. The threads of a pool do not survive a fork,
+             so a pool created in another process (i.e. the preloading gunicorn master) is replaced.
+    """
+    global _executor, _executor_pid
+
+    with _executor_lock:
+        if _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(max_workers=max_workers,
+                                           thread_name_prefix='geofencing-event-handlers')
+            _executor_pid = os.getpid()
+
+    return _executor
+
+
+def _get_name(handler: Callable) -> str:
+    return getattr(handler, '__name__', type(handler).__name__)
+
+
+def _merge_context(context: Context, handler_context: Context, snapshot: Dict[str, Any]) -> None:
+    """
+    Applies on the context the attributes that a handler changed on its copy of it.
+
+    :param context: the context of the event
+    :param handler_context: the copy of the context passed to the handler
+    :param snapshot: the attributes of the context when it was copied
+    """
+    for name, value in vars(handler_context).items():
+        if snapshot.get(name, _MISSING) is value:
+            continue
+
+        if vars(context).get(name, _MISSING) is not snapshot.get(name, _MISSING):
+            raise RuntimeError(f"Context attribute '{name}' was changed by concurrent handlers")
+
+        setattr(context, name, value)
+
 
 class Event(list):
     """
@@ -46,16 +113,168 @@ class Event(list):
 
     A list of callables handlers. They all accept a `context` keyword parameter which is supposed to
     be shared and updated among them.
-    The handlers will be called in ascending order by index.
+    Without declared dependencies the handlers will be called in ascending order by index. With
+    them, each handler is called as soon as the handlers it depends on are done, and the handlers
+    that are ready at the same time run concurrently in a thread pool, each one on its own copy of
+    the context. The attributes they set are then merged back in the context.
+    If a handler fails, the compensations of the handlers that were done are called in the reverse
+    order of their completion in order to undo them, and the error is raised.
+    Each handler is traced in a span named after the event.
     """
     _type = 'Generic'
 
+    def __init__(self,
+                 handlers: Iterable[Callable] = (),
+                 name: Optional[str] = None,
+                 dependencies: Optional[Dict[Callable, Iterable[Callable]]] = None,
+                 compensations: Optional[Dict[Callable, Callable]] = None):
+        """
+        :param handlers: in an order that satisfies their dependencies
+        :param name:
+        :param dependencies: the handlers that each handler depends on. Handlers missing from it
+                             depend on none. If None, each handler depends on the previous ones.
+        :param compensations: the callables that undo what each handler did, called with the
+                              context once a following handler failed. They should only rely on
+                              the context and leave in it what they could not undo.
+        """
+        super().__init__(handlers)
+        self.name = name or self._type
+        self.dependencies: Optional[Dict[Callable, Set[Callable]]] = None
+        self.compensations: Dict[Callable, Callable] = dict(compensations or {})
+
+        if dependencies is not None:
+            self.dependencies = {handler: set(handler_dependencies)
+                                 for handler, handler_dependencies in dependencies.items()}
+            self._validate_dependencies()
+
+        self._validate_compensations()
+
+    def _validate_dependencies(self):
+        for handler, handler_dependencies in self.dependencies.items():
+            if handler not in self:
+                raise ValueError(f'{handler} is not a handler of the event {self.name}')
+
+            previous_handlers = self[:self.index(handler)]
+            for dependency in handler_dependencies:
+                if dependency not in previous_handlers:
+                    raise ValueError(f'{handler} depends on {dependency} which is not a previous '
+                                     f'handler of the event {self.name}')
+
+    def _validate_compensations(self):
+        for handler in self.compensations:
+            if handler not in self:
+                raise ValueError(f'{handler} is not a handler of the event {self.name}')
+
     def handle(self, context: Context):
-        for handler in self:
-            handler(context)
+        tracer = EventTracer(self.name)
+        max_workers = _get_handlers_max_workers()
+        completed: List[Callable] = []
+
+        with tracer.event_span():
+            try:
+                if self.dependencies is None or max_workers == 0:
+                    for handler in self:
+                        self._call_handler(handler, context, tracer)
+                        completed.append(handler)
+                else:
+                    self._handle_concurrently(context, tracer, _get_executor(max_workers),
+                                              completed)
+            except Exception:
+                self._compensate(context, tracer, completed)
+                raise
 
         return context
 
+    def _compensate(self, context: Context, tracer: EventTracer,
+                    completed: List[Callable]) -> None:
+        """
+        Calls the compensations of the completed handlers in the reverse order of their completion.
+        A failing compensation is logged and does not prevent the next ones, so that the error of
+        the handler is the one raised.
+
+        :param context:
+        :param tracer:
+        :param completed: the handlers that were done, in the order of their completion
+        """
+        for handler in reversed(completed):
+            compensation = self.compensations.get(handler)
+            if compensation is None:
+                continue
+
+            try:
+                self._call_handler(compensation, context, tracer)
+            except Exception:
+                _logger.exception(f'Failed to compensate {_get_name(handler)} of the event '
+                                  f'{self.name}')
+
+    @staticmethod
+    def _call_handler(handler: Callable, context: Context, tracer: EventTracer,
+                      app: Optional[Flask] = None) -> None:
+        if app is not None:
+            with app.app_context():
+                return Event._call_handler(handler, context, tracer)
+
+        with tracer.handler_span(_get_name(handler)):
+            handler(context)
+
+    def _handle_concurrently(self, context: Context, tracer: EventTracer,
+                             executor: ThreadPoolExecutor, completed: List[Callable]) -> None:
+        """
+        Calls the handlers as soon as their dependencies are done. A handler that is the only one
+        to run is called in the current thread. If a handler fails no more handlers are started,
+        the running ones are waited for and the first error is raised.
+
+        :param context:
+        :param tracer:
+        :param executor:
+        :param completed: where the handlers are appended once done
+        """
+        app = current_app._get_current_object() if has_app_context() else None
+        mergeable = hasattr(context, '__dict__')
+        pending = list(self)
+        done: Set[Callable] = set()
+        running: Dict[Future, Tuple[Callable, Context, Dict[str, Any]]] = {}
+        error: Optional[Exception] = None
+
+        while running or (pending and error is None):
+            ready = [] if error is not None else \
+                [handler for handler in pending if self.dependencies.get(handler, set()) <= done]
+
+            if len(ready) == 1 and not running:
+                pending.remove(ready[0])
+                self._call_handler(ready[0], context, tracer)
+                done.add(ready[0])
+                completed.append(ready[0])
+                continue
+
+            for handler in ready:
+                pending.remove(handler)
+                handler_context = copy.copy(context) if mergeable else context
+                snapshot = dict(vars(context)) if mergeable else {}
+                # the context variables (i.e. the current OpenTelemetry span) are passed along
+                future = executor.submit(contextvars.copy_context().run,
+                                         self._call_handler, handler, handler_context, tracer, app)
+                running[future] = (handler, handler_context, snapshot)
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+
+            for future in finished:
+                handler, handler_context, snapshot = running.pop(future)
+
+                try:
+                    # the changes of failed handlers are kept as well, as in sequential handling
+                    if handler_context is not context:
+                        _merge_context(context, handler_context, snapshot)
+                    future.result()
+                except Exception as e:
+                    error = error or e
+                else:
+                    done.add(handler)
+                    completed.append(handler)
+
+        if error is not None:
+            raise error
+
     def __repr__(self):
         return f"{self._type} Event({list.__repr__(self)})"
 
@@ -65,31 +284,68 @@ create_uas_zones_subscription_event = Event([
     uas_zones_subscription_handlers.add_broker_topic,
     uas_zones_subscription_handlers.get_or_create_sm_topic,
     uas_zones_subscription_handlers.create_sm_subscription,
-    uas_zones_subscription_handlers.uas_zones_subscription_db_save
-])
+    uas_zones_subscription_handlers.uas_zones_subscription_db_save,
+    uas_zones_subscription_handlers.idempotency_record_db_save
+], name='create_uas_zones_subscription', dependencies={
+    uas_zones_subscription_handlers.add_broker_topic: [
+        uas_zones_subscription_handlers.get_topic_name
+    ],
+    uas_zones_subscription_handlers.get_or_create_sm_topic: [
+        uas_zones_subscription_handlers.get_topic_name
+    ],
+    uas_zones_subscription_handlers.create_sm_subscription: [
+        uas_zones_subscription_handlers.get_or_create_sm_topic
+    ],
+    uas_zones_subscription_handlers.uas_zones_subscription_db_save: [
+        uas_zones_subscription_handlers.add_broker_topic,
+        uas_zones_subscription_handlers.create_sm_subscription
+    ],
+    uas_zones_subscription_handlers.idempotency_record_db_save: [
+        uas_zones_subscription_handlers.uas_zones_subscription_db_save
+    ],
+}, compensations={
+    # the broker and Subscription Manager topics are not removed: the publisher can not remove
+    # topics, the Subscription Manager topic may have been bound to by a concurrent request with
+    # the same filtering criteria, and a retry adds or reuses the same ones since their name is
+    # derived from the filtering criteria
+    uas_zones_subscription_handlers.create_sm_subscription:
+        uas_zones_subscription_handlers.delete_created_sm_subscription,
+    uas_zones_subscription_handlers.uas_zones_subscription_db_save:
+        uas_zones_subscription_handlers.delete_created_uas_zones_subscription,
+    # the first handler is compensated last, once the others have deleted what they could
+    uas_zones_subscription_handlers.get_topic_name:
+        uas_zones_subscription_handlers.keep_sm_leftovers,
+})
 
 
+# the DB is updated only once the Subscription Manager is, so that a failed call to the latter
+# does not leave the DB out of sync with it
 update_uas_zones_subscription_event = Event([
     update_sm_subscription,
     uas_zones_subscription_db_update,
-])
+], name='update_uas_zones_subscription', dependencies={
+    uas_zones_subscription_db_update: [update_sm_subscription]
+})
 
 
 delete_uas_zones_subscription_event = Event([
     delete_sm_subscription,
     uas_zones_subscription_db_delete
-])
+], name='delete_uas_zones_subscription', dependencies={
+    uas_zones_subscription_db_delete: [delete_sm_subscription]
+})
 
 
+# the subscriptions are matched against the UASZones in DB so these handlers run in sequence
 create_uas_zone_event = Event([
     uas_zone_handlers.uas_zone_db_save,
     uas_zone_handlers.get_relevant_uas_zones_subscriptions,
     geofencing_service.events.broker_message_producers.publish_uas_zone_creation
-])
+], name='create_uas_zone')
 
 
 delete_uas_zone_event = Event([
     uas_zone_handlers.get_relevant_uas_zones_subscriptions,
     uas_zone_handlers.uas_zones_db_delete,
     geofencing_service.events.broker_message_producers.publish_uas_zone_deletion
-])
+], name='delete_uas_zone')
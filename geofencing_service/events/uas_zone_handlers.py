@@ -28,13 +28,15 @@ http://opensource.org/licenses/BSD-3-Clause
 Details on EUROCONTROL: http://www.eurocontrol.int
 """
 import logging
-from typing import List
+from typing import List, Optional
 
 from geofencing_service.db.models import UASZone, UASZonesSubscription, User
 from geofencing_service.db.uas_zones import create_uas_zone as db_create_uas_zone, \
-    get_uas_zones as db_get_uas_zones
+    get_uas_zones as db_get_uas_zones, delete_uas_zone as db_delete_uas_zone
 from geofencing_service.db.subscriptions import \
     get_uas_zones_subscriptions as db_get_uas_zones_subscriptions
+from geofencing_service.db.tiles import tiles_overlap
+from geofencing_service.metrics import SUBSCRIPTIONS_MATCHED
 
 __author__ = "EUROCONTROL (SWIM)"
 
@@ -54,10 +56,13 @@ class UASZoneContext:
         """Holds the subscriptions whose filter_zone intersect the provided UASZone """
         self.uas_zones_subscriptions: List[UASZonesSubscription] = []
 
+        """Holds the version of the set of UASZones after the creation or deletion"""
+        self.uas_zones_version: Optional[int] = None
+
 
 def uas_zone_db_save(context: UASZoneContext) -> None:
     context.uas_zone.user = context.user
-    db_create_uas_zone(context.uas_zone)
+    context.uas_zones_version = db_create_uas_zone(context.uas_zone)
 
 
 def _uas_zone_matches_subscription_uas_zones_filter(uas_zone: UASZone,
@@ -68,6 +73,15 @@ def _uas_zone_matches_subscription_uas_zones_filter(uas_zone: UASZone,
     :param subscription:
     :return:
     """
+    uas_zone_tiles = [tile
+                      for airspace_volume in uas_zone.geometry
+                      for tile in airspace_volume.tiles]
+    filter_tiles = subscription.uas_zones_filter.airspace_volume.tiles
+
+    # the tiles are compared first in order to avoid hitting the DB for distant UASZones
+    if uas_zone_tiles and filter_tiles and not tiles_overlap(uas_zone_tiles, filter_tiles):
+        return False
+
     uas_zones = db_get_uas_zones(uas_zones_filter=subscription.uas_zones_filter)
 
     return uas_zone in uas_zones
@@ -87,10 +101,12 @@ def get_relevant_uas_zones_subscriptions(context: UASZoneContext) -> None:
         _uas_zone_matches_subscription_uas_zones_filter(context.uas_zone, subscription)
     ]
 
+    SUBSCRIPTIONS_MATCHED.observe(len(context.uas_zones_subscriptions))
+
 
 def uas_zones_db_delete(context: UASZoneContext):
     """
     Deletes the UASZone in context
     :param context:
     """
-    context.uas_zone.delete()
+    context.uas_zones_version = db_delete_uas_zone(context.uas_zone)
@@ -31,28 +31,41 @@ import hashlib
 import json
 import logging
 import uuid
-from typing import Optional, List
+from datetime import datetime, timezone
+from typing import Optional, List, TYPE_CHECKING
 
 from flask import current_app
-from subscription_manager_client.models import Subscription as SMSubscription, Topic as SMTopic
-from subscription_manager_client.subscription_manager import SubscriptionManagerClient
 from swim_backend.local import AppContextProxy
 
 from geofencing_service.events.broker_message_producers import uas_zones_updates_message_producer
 from geofencing_service.db.models import UASZonesSubscription, GeofencingSMSubscription, User, \
-    UASZonesFilter
+    UASZonesFilter, IdempotencyRecord
 from geofencing_service.db.subscriptions import \
     create_uas_zones_subscription as db_create_uas_zones_subscription,\
     update_uas_zones_subscription as db_update_uas_zones_subscription, \
-    delete_uas_zones_subscription as db_delete_uas_zones_subscription
+    delete_uas_zones_subscription as db_delete_uas_zones_subscription, \
+    get_uas_zones_subscription_by_id, get_idempotency_record, save_idempotency_record, \
+    delete_idempotency_record, get_idempotency_record_id, insert_idempotency_record, \
+    claim_idempotency_record
 from geofencing_service.endpoints.schemas.db_schemas import UASZonesFilterSchema
+from geofencing_service.endpoints.schemas.registry import get_schema
+from geofencing_service.publisher import get_swim_publisher
+
+if TYPE_CHECKING:
+    from subscription_manager_client.models import Subscription as SMSubscription, \
+        Topic as SMTopic
+    from subscription_manager_client.subscription_manager import SubscriptionManagerClient
 
 __author__ = "EUROCONTROL (SWIM)"
 
 _logger = logging.getLogger(__name__)
 
 
-def _get_sm_client_from_config() -> SubscriptionManagerClient:
+def _get_sm_client_from_config() -> 'SubscriptionManagerClient':
+    # the client (and its HTTP stack) is imported upon its first usage in order to keep it out of
+    # the start up time. The same goes for its models below.
+    from subscription_manager_client.subscription_manager import SubscriptionManagerClient
+
     return SubscriptionManagerClient.create(
         host=current_app.config['SUBSCRIPTION-MANAGER-API']['host'],
         https=current_app.config['SUBSCRIPTION-MANAGER-API']['https'],
@@ -67,23 +80,26 @@ sm_client = AppContextProxy(_get_sm_client_from_config)
 
 
 class UASZonesSubscriptionCreateContext:
-    def __init__(self, uas_zones_filter: UASZonesFilter, user: User) -> None:
+    def __init__(self, uas_zones_filter: UASZonesFilter, user: User,
+                 idempotency_key: Optional[str] = None) -> None:
         """
         :param uas_zones_filter: The filtering criteria of the subscription
         :param user: The current user
+        :param idempotency_key: The key identifying the retries of the creation, if any
         """
 
         self.uas_zones_filter: UASZonesFilter = uas_zones_filter
         self.user: User = user
+        self.idempotency_key: Optional[str] = idempotency_key
 
         """Holds the new topic name where the new subscription will be subscribed to"""
         self.topic_name: Optional[str] = None
 
         """Holds the topic of the Subscription Manager"""
-        self.sm_topic: Optional[SMTopic] = None
+        self.sm_topic: Optional['SMTopic'] = None
 
         """Holds the subscription of the Subscription Manager"""
-        self.sm_subscription: Optional[SMSubscription] = None
+        self.sm_subscription: Optional['SMSubscription'] = None
 
         """Holds the UASZone subscription that is eventually created"""
         self.uas_zones_subscription: Optional[UASZonesSubscription] = None
@@ -99,27 +115,91 @@ class UASZonesSubscriptionUpdateContext:
         self.user = user
 
 
+def reuse_idempotency_record(context: UASZonesSubscriptionCreateContext) -> None:
+    """
+    Reserves the idempotency key of a creation by inserting its record in progress. If the key was
+    used before, the subscription that was created by then is set in the context, otherwise the
+    record is claimed and the Subscription Manager artefacts that were left by a failed attempt
+    are set in the context in order to be reused. A record that is in progress can be claimed once
+    its lease has expired, i.e. if the worker handling the request was killed.
+
+    :param context:
+    :raises ValueError: if the key was used with other filtering criteria
+    :raises RuntimeError: if a creation with the same key is in progress
+    """
+    from subscription_manager_client.models import Subscription as SMSubscription, \
+        Topic as SMTopic
+
+    if context.idempotency_key is None:
+        return
+
+    get_topic_name(context)
+
+    if insert_idempotency_record(IdempotencyRecord(
+            id=get_idempotency_record_id(context.idempotency_key, context.user),
+            user=context.user,
+            topic_name=context.topic_name,
+            in_progress=True,
+            claimed_at=datetime.now(timezone.utc))):
+        return
+
+    record = get_idempotency_record(context.idempotency_key, context.user)
+    if record is not None and record.topic_name != context.topic_name:
+        raise ValueError(f'Idempotency key {context.idempotency_key} was used with different '
+                         f'filtering criteria')
+
+    if record is not None and record.uas_zones_subscription_id is not None:
+        # None if the subscription has been deleted since, in which case it is created again
+        context.uas_zones_subscription = get_uas_zones_subscription_by_id(
+            record.uas_zones_subscription_id, user=context.user)
+        if context.uas_zones_subscription is not None:
+            return
+
+    record = claim_idempotency_record(context.idempotency_key, context.user)
+    if record is None:
+        # or it just expired, in which case the request can be retried
+        raise RuntimeError(f'A subscription creation with the idempotency key '
+                           f'{context.idempotency_key} is in progress')
+
+    if record.sm_topic_id is not None:
+        context.sm_topic = SMTopic(id=record.sm_topic_id, name=record.topic_name)
+
+    if record.sm_subscription is not None:
+        context.sm_subscription = SMSubscription(id=record.sm_subscription.id,
+                                                 queue=record.sm_subscription.queue,
+                                                 active=record.sm_subscription.active,
+                                                 topic_id=record.sm_topic_id)
+
+
 def get_topic_name(context: UASZonesSubscriptionCreateContext) -> None:
     """
     Hashes the json of the subscription filter criteria in order to create a unique topic name
 
     :param context:
     """
-    uas_zones_filter_dict = UASZonesFilterSchema().dump(context.uas_zones_filter)
+    uas_zones_filter_dict = get_schema(UASZonesFilterSchema).dump(context.uas_zones_filter)
     context.topic_name = hashlib.sha1(json.dumps(uas_zones_filter_dict).encode()).hexdigest()
 
 
 def add_broker_topic(context: UASZonesSubscriptionCreateContext):
-    current_app.swim_publisher.add_topic(topic_name=context.topic_name,
-                                         message_producer=uas_zones_updates_message_producer)
+    get_swim_publisher().add_topic(topic_name=context.topic_name,
+                                   message_producer=uas_zones_updates_message_producer)
 
 
 def get_or_create_sm_topic(context: UASZonesSubscriptionCreateContext) -> None:
     """
-    Checks if the topic_name already exists in Subscription Manager and it creates it if not
+    Checks if the topic_name already exists in Subscription Manager and it creates it if not,
+    unless the topic is reused from a previous attempt. The topic is not deleted if the creation
+    fails: it is shared by the subscriptions with the same filtering criteria, which concurrent
+    requests may have bound to it in the meantime, and a retry reuses it.
 
     :param context:
     """
+    from subscription_manager_client.models import Topic as SMTopic
+
+    if context.sm_topic is not None:
+        return
+
     sm_topics: List[SMTopic] = sm_client.get_topics()
 
     try:
@@ -130,15 +210,31 @@ def get_or_create_sm_topic(context: UASZonesSubscriptionCreateContext) -> None:
 
 def create_sm_subscription(context: UASZonesSubscriptionCreateContext) -> None:
     """
-    Creates a new subscription in Subscription Manager
+    Creates a new subscription in Subscription Manager, unless it is reused from a previous attempt
 
     :param context:
     """
+    from subscription_manager_client.models import Subscription as SMSubscription
+
+    if context.sm_subscription is not None:
+        return
+
     sm_subscription = SMSubscription(topic_id=context.sm_topic.id, active=False)
 
     context.sm_subscription = sm_client.post_subscription(sm_subscription)
 
 
+def delete_created_sm_subscription(context: UASZonesSubscriptionCreateContext) -> None:
+    """
+    Compensates create_sm_subscription: deletes the subscription of Subscription Manager
+
+    :param context:
+    """
+    sm_client.delete_subscription_by_id(context.sm_subscription.id)
+
+    context.sm_subscription = None
+
+
 def uas_zones_subscription_db_save(context: UASZonesSubscriptionCreateContext) -> None:
     """
     Creates and saves the UASZoneSubscription
@@ -161,6 +257,71 @@ def uas_zones_subscription_db_save(context: UASZonesSubscriptionCreateContext) -
     context.uas_zones_subscription = subscription
 
 
+def delete_created_uas_zones_subscription(context: UASZonesSubscriptionCreateContext) -> None:
+    """
+    Compensates uas_zones_subscription_db_save: deletes the UASZoneSubscription
+
+    :param context:
+    """
+    db_delete_uas_zones_subscription(context.uas_zones_subscription)
+
+    context.uas_zones_subscription = None
+
+
+def idempotency_record_db_save(context: UASZonesSubscriptionCreateContext) -> None:
+    """
+    Records the created UASZoneSubscription under the idempotency key, if any, so that the retries
+    of the creation return it
+
+    :param context:
+    """
+    if context.idempotency_key is None:
+        return
+
+    save_idempotency_record(IdempotencyRecord(
+        id=get_idempotency_record_id(context.idempotency_key, context.user),
+        user=context.user,
+        topic_name=context.topic_name,
+        uas_zones_subscription_id=context.uas_zones_subscription.id
+    ))
+
+
+def keep_sm_leftovers(context: UASZonesSubscriptionCreateContext) -> None:
+    """
+    Called after the other compensations of a failed creation (as the compensation of its first
+    handler). The Subscription Manager subscription that could not be deleted is logged and
+    recorded under the idempotency key, if any, along with its topic in order to be reused by the
+    retries. The key is released if none is left.
+
+    :param context:
+    """
+    if context.sm_subscription is not None:
+        # logged in any case since the records of the keys expire
+        _logger.warning(f'Failed to delete the Subscription Manager subscription of a failed '
+                        f'subscription creation: {context.sm_subscription.id}')
+
+    if context.idempotency_key is None:
+        return
+
+    if context.sm_subscription is None:
+        # releases the key, the artefacts of a previous attempt might have been reused and deleted
+        delete_idempotency_record(context.idempotency_key, context.user)
+        return
+
+    save_idempotency_record(IdempotencyRecord(
+        id=get_idempotency_record_id(context.idempotency_key, context.user),
+        user=context.user,
+        topic_name=context.topic_name,
+        sm_topic_id=context.sm_topic.id,
+        sm_subscription=GeofencingSMSubscription(
+            id=context.sm_subscription.id,
+            queue=context.sm_subscription.queue,
+            topic_name=context.topic_name,
+            active=context.sm_subscription.active
+        )
+    ))
+
+
 def update_sm_subscription(context: UASZonesSubscriptionUpdateContext) -> None:
     sm_client.put_subscription(context.uas_zones_subscription.sm_subscription.id,
                                {'active': context.uas_zones_subscription.sm_subscription.active})
@@ -0,0 +1,76 @@
+"""
+Copyright 2020 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+import multiprocessing
+import os
+
+__author__ = "EUROCONTROL (SWIM)"
+
+# Production settings of gunicorn:
+#
+#   gunicorn -c python:geofencing_service.gunicorn_config
+#
+# The main settings can be overridden by environment variables and any setting by GUNICORN_CMD_ARGS
+
+wsgi_app = 'geofencing_service.wsgi_preload:app'
+
+bind = os.environ.get('GEOFENCING_BIND', '0.0.0.0:8000')
+
+# the requests spend most of their time waiting on MongoDB, the Subscription Manager or the broker
+# so each worker serves several of them in threads
+worker_class = os.environ.get('GEOFENCING_WORKER_CLASS', 'gthread')
+workers = int(os.environ.get('GEOFENCING_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('GEOFENCING_THREADS', 4))
+
+# the app is created once in the master and shared copy-on-write by the workers
+preload_app = True
+
+# the workers are recycled after a (jittered, so that they do not restart at once) number of
+# requests in order to bound the effect of any memory growth
+max_requests = int(os.environ.get('GEOFENCING_MAX_REQUESTS', 10000))
+max_requests_jitter = int(os.environ.get('GEOFENCING_MAX_REQUESTS_JITTER', 1000))
+
+timeout = 60
+graceful_timeout = 30
+keepalive = 5
+
+# the heartbeat files of the workers are kept in memory rather than on a possibly slow disk
+worker_tmp_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+
+def post_worker_init(worker):
+    from geofencing_service.app import init_worker
+
+    init_worker()
+
+
+def child_exit(server, worker):
+    from geofencing_service.metrics import mark_process_dead
+
+    mark_process_dead(worker.pid)
@@ -0,0 +1,70 @@
+"""
+Copyright 2020 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+import logging
+from typing import Dict, Any
+
+from flask import current_app, jsonify, Response
+from mongoengine import connection
+
+from geofencing_service.publisher import get_swim_publisher_health
+
+__author__ = "EUROCONTROL (SWIM)"
+
+_logger = logging.getLogger(__name__)
+
+
+def get_mongo_health() -> Dict[str, Any]:
+    try:
+        connection.get_db().command('ping')
+    except Exception as e:
+        _logger.warning(f'MongoDB health check failed: {str(e)}')
+        return {'ok': False, 'error': str(e)}
+
+    return {'ok': True}
+
+
+def health() -> Response:
+    """
+    GET /health
+
+    Reports whether the process is connected to MongoDB and runs its own SWIMPublisher. Replies
+    with 503 if any of them is not healthy.
+    :return:
+    """
+    checks = {
+        'mongo': get_mongo_health(),
+        'swim_publisher': get_swim_publisher_health(current_app._get_current_object()),
+    }
+    ok = all(check['ok'] for check in checks.values())
+
+    response = jsonify({'status': 'OK' if ok else 'NOK', 'checks': checks})
+    response.status_code = 200 if ok else 503
+
+    return response
@@ -0,0 +1,343 @@
+"""
+Copyright 2020 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+import argparse
+import logging
+import logging.config
+import os
+import queue
+import socket
+import socketserver
+import struct
+import threading
+import time
+from typing import Callable, Dict, Any, Optional, Tuple, Iterator, TYPE_CHECKING
+
+from mongoengine import connect
+from pkg_resources import resource_filename
+from swim_backend.config import load_app_config
+
+from geofencing_service.db.subscriptions import get_uas_zones_subscriptions
+from geofencing_service.metrics import IPC_RECORDS_DROPPED
+
+if TYPE_CHECKING:
+    import proton
+
+__author__ = "EUROCONTROL (SWIM)"
+
+_logger = logging.getLogger(__name__)
+
+# the length of the topic name and of the encoded message preceding them in every record
+RECORD_HEADER = struct.Struct('!II')
+
+QUEUE_SIZE = 10000
+
+BATCH_SIZE = 100
+
+RECONNECT_INTERVAL_IN_SEC = 1
+
+# the socket is created as rw-rw---- so that only the processes of the same user and group can
+# publish
+SOCKET_UMASK = 0o117
+
+
+def encode_record(topic_name: str, message: 'proton.Message') -> bytes:
+    """
+    Encodes a message to be published on a topic as a compact record: the lengths of the topic
+    name and of the AMQP encoded message followed by both of them.
+
+    :param topic_name:
+    :param message:
+    :return:
+    """
+    encoded_topic_name = topic_name.encode()
+    encoded_message = message.encode()
+
+    return RECORD_HEADER.pack(len(encoded_topic_name), len(encoded_message)) \
+        + encoded_topic_name + encoded_message
+
+
+def decode_message(encoded_message: bytes) -> 'proton.Message':
+    """
+    The message producer of the topics published by the PublisherServer. The messages are produced
+    by the workers, so they only have to be decoded.
+
+    :param encoded_message:
+    :return:
+    """
+    import proton
+
+    message = proton.Message()
+    message.decode(encoded_message)
+
+    return message
+
+
+def read_records(stream) -> Iterator[Tuple[str, bytes]]:
+    """
+    Reads the records of a stream until it is closed.
+
+    :param stream: a binary file-like object
+    :return: the topic name and the encoded message of every record
+    """
+    while True:
+        header = stream.read(RECORD_HEADER.size)
+        if len(header) < RECORD_HEADER.size:
+            return
+
+        topic_name_length, message_length = RECORD_HEADER.unpack(header)
+        topic_name = stream.read(topic_name_length).decode()
+        encoded_message = stream.read(message_length)
+
+        if len(encoded_message) < message_length:
+            return
+
+        yield topic_name, encoded_message
+
+
+class IPCPublisherClient:
+
+    def __init__(self,
+                 socket_path: str,
+                 queue_size: int = QUEUE_SIZE,
+                 reconnect_interval_in_sec: float = RECONNECT_INTERVAL_IN_SEC):
+        """
+        Stands in for the SWIMPublisher of a worker when the broker messages are published by a
+        dedicated PublisherServer process. The messages are produced in a background thread and
+        sent as records to the server through a Unix socket. publish_topic never blocks: when the
+        queue is full (i.e. the server is down or cannot keep up) the message is dropped.
+
+        :param socket_path: the Unix socket the PublisherServer listens to
+        :param queue_size: the number of messages that can wait for being sent
+        :param reconnect_interval_in_sec:
+        """
+        self.socket_path = socket_path
+        self.reconnect_interval_in_sec = reconnect_interval_in_sec
+        self._message_producers: Dict[str, Callable] = {}
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._socket: Optional[socket.socket] = None
+
+    @classmethod
+    def create_from_config(cls, config_file: str) -> 'IPCPublisherClient':
+        config = load_app_config(filename=config_file)['BROKER_PUBLISHER']
+
+        return cls(socket_path=config['IPC_SOCKET'],
+                   queue_size=config.get('IPC_QUEUE_SIZE', QUEUE_SIZE))
+
+    def run(self, threaded: bool = True):
+        threading.Thread(target=self._send_records, daemon=True).start()
+
+    def add_topic(self, topic_name: str, message_producer: Callable):
+        # the server creates the topics on their first record
+        self._message_producers[topic_name] = message_producer
+
+    def preload_topic_message_producer(self, topic_name: str, message_producer: Callable):
+        self._message_producers[topic_name] = message_producer
+
+    def publish_topic(self, topic_name: str, context: Any):
+        message_producer = self._message_producers.get(topic_name)
+
+        if message_producer is None:
+            _logger.error(f'No message producer for topic: {topic_name}')
+            return
+
+        try:
+            self._queue.put_nowait((topic_name, message_producer, context))
+        except queue.Full:
+            IPC_RECORDS_DROPPED.inc()
+            _logger.error(f'The publisher queue is full, dropped message of topic: {topic_name}')
+
+    def _connect(self) -> socket.socket:
+        while True:
+            try:
+                sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                sock.connect(self.socket_path)
+                return sock
+            except OSError as e:
+                sock.close()
+                _logger.error(f'Cannot connect to the publisher at {self.socket_path}: {str(e)}')
+                time.sleep(self.reconnect_interval_in_sec)
+
+    def _send(self, record: bytes) -> None:
+        for _ in range(2):
+            if self._socket is None:
+                self._socket = self._connect()
+
+            try:
+                self._socket.sendall(record)
+                return
+            except OSError as e:
+                _logger.error(f'Error while sending record to the publisher: {str(e)}')
+                self._socket.close()
+                self._socket = None
+
+        IPC_RECORDS_DROPPED.inc()
+
+    def _send_records(self):
+        while True:
+            topic_name, message_producer, context = self._queue.get()
+            try:
+                record = encode_record(topic_name, message_producer(context))
+            except Exception as e:
+                _logger.error(f'Error while producing message: {str(e)}')
+                continue
+
+            self._send(record)
+
+
+class PublisherServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self,
+                 socket_path: str,
+                 swim_publisher,
+                 batch_size: int = BATCH_SIZE,
+                 queue_size: int = QUEUE_SIZE):
+        """
+        Receives the records of the workers and publishes them with a single SWIMPublisher (and
+        broker connection). The records are queued and published in batches by one thread so that
+        the workers are never slowed down by the broker.
+
+        :param socket_path: the Unix socket to listen to
+        :param swim_publisher: a running SWIMPublisher
+        :param batch_size: the maximum number of records published at once
+        :param queue_size: the number of records that can wait for being published
+        """
+        socket_dir = os.path.dirname(socket_path)
+
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        elif socket_dir:
+            os.makedirs(socket_dir, exist_ok=True)
+
+        super().__init__(socket_path, _RecordsHandler)
+
+        self.swim_publisher = swim_publisher
+        self.batch_size = batch_size
+        self.records: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._topic_names = set()
+
+    def server_bind(self) -> None:
+        # the permissions are set at creation so that other users cannot connect before a chmod
+        umask = os.umask(SOCKET_UMASK)
+        try:
+            super().server_bind()
+        finally:
+            os.umask(umask)
+
+    def preload_topic(self, topic_name: str) -> None:
+        self.swim_publisher.preload_topic_message_producer(topic_name=topic_name,
+                                                           message_producer=decode_message)
+        self._topic_names.add(topic_name)
+
+    def _next_batch(self):
+        batch = [self.records.get()]
+
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.records.get_nowait())
+            except queue.Empty:
+                break
+
+        return batch
+
+    def publish_records(self) -> None:
+        while True:
+            for topic_name, encoded_message in self._next_batch():
+                if topic_name not in self._topic_names:
+                    self.swim_publisher.add_topic(topic_name=topic_name,
+                                                  message_producer=decode_message)
+                    self._topic_names.add(topic_name)
+
+                self.swim_publisher.publish_topic(topic_name=topic_name, context=encoded_message)
+
+    def serve(self) -> None:
+        threading.Thread(target=self.publish_records, daemon=True).start()
+
+        _logger.info(f'Publishing the records received on {self.server_address}')
+
+        self.serve_forever()
+
+
+class _RecordsHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        for record in read_records(self.rfile):
+            try:
+                self.server.records.put_nowait(record)
+            except queue.Full:
+                IPC_RECORDS_DROPPED.inc()
+                _logger.error(f'The records queue is full, dropped message of topic: {record[0]}')
+
+
+def run_publisher_server(config_file: str) -> None:
+    """
+    Runs the dedicated publisher process with the topics of the existing subscriptions preloaded.
+
+    :param config_file:
+    """
+    # the workers import this module as well but they don't need the broker libraries
+    from pubsub_facades.swim_pubsub import SWIMPublisher
+
+    config = load_app_config(filename=config_file)
+
+    if config.get('LOGGING'):
+        logging.config.dictConfig(config['LOGGING'])
+
+    connect(**config['MONGO'])
+
+    swim_publisher = SWIMPublisher.create_from_config(config_file)
+
+    publisher_config = config['BROKER_PUBLISHER']
+    server = PublisherServer(socket_path=publisher_config['IPC_SOCKET'],
+                             swim_publisher=swim_publisher,
+                             batch_size=publisher_config.get('IPC_BATCH_SIZE', BATCH_SIZE),
+                             queue_size=publisher_config.get('IPC_QUEUE_SIZE', QUEUE_SIZE))
+
+    for subscription in get_uas_zones_subscriptions():
+        server.preload_topic(subscription.sm_subscription.topic_name)
+
+    swim_publisher.run(threaded=True)
+
+    server.serve()
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description='Publishes the broker messages of the workers running in IPC mode')
+    parser.add_argument('--config', default=resource_filename('geofencing_service', 'config.yml'),
+                        help='the config file of the service')
+
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = _parse_args()
+
+    run_publisher_server(args.config)
@@ -0,0 +1,225 @@
+"""
+Copyright 2020 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+import os
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Optional
+
+from flask import Response
+from prometheus_client import Counter, Histogram, CollectorRegistry, REGISTRY, generate_latest, \
+    CONTENT_TYPE_LATEST, multiprocess
+
+__author__ = "EUROCONTROL (SWIM)"
+
+# when the service runs in several processes (i.e. gunicorn workers) each one of them writes its
+# metrics in this directory and they are aggregated upon collection. It has to be set (and emptied)
+# before the workers are started.
+MULTIPROC_DIR_ENV_VARS = ('PROMETHEUS_MULTIPROC_DIR', 'prometheus_multiproc_dir')
+
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, float('inf'))
+
+REQUESTS = Counter(
+    'geofencing_requests_total',
+    'Handled API requests',
+    ['operation', 'status']
+)
+
+REQUEST_LATENCY = Histogram(
+    'geofencing_request_duration_seconds',
+    'Duration of the API requests handling, excluding authentication',
+    ['operation']
+)
+
+SERIALIZATION_LATENCY = Histogram(
+    'geofencing_serialization_duration_seconds',
+    'Duration of the replies serialization',
+    ['operation']
+)
+
+AUTH_LATENCY = Histogram(
+    'geofencing_auth_duration_seconds',
+    'Duration of the basic authentication'
+)
+
+EVENT_HANDLER_LATENCY = Histogram(
+    'geofencing_event_handler_duration_seconds',
+    'Duration of the event handlers',
+    ['event', 'handler']
+)
+
+DB_LATENCY = Histogram(
+    'geofencing_db_duration_seconds',
+    'Duration of the DB operations',
+    ['function']
+)
+
+DB_QUERY_LATENCY = Histogram(
+    'geofencing_db_query_duration_seconds',
+    'Duration of the diagnosed DB queries per query shape',
+    ['collection', 'shape']
+)
+
+DB_SLOW_QUERIES = Counter(
+    'geofencing_db_slow_queries_total',
+    'Explained DB queries exceeding the diagnostics threshold per query shape and winning plan',
+    ['collection', 'shape', 'plan']
+)
+
+DB_SLOW_QUERIES_DOCS_EXAMINED = Counter(
+    'geofencing_db_slow_queries_docs_examined_total',
+    'Documents examined by the slow DB queries per query shape',
+    ['collection', 'shape']
+)
+
+DB_SLOW_QUERIES_DOCS_RETURNED = Counter(
+    'geofencing_db_slow_queries_docs_returned_total',
+    'Documents returned by the slow DB queries per query shape',
+    ['collection', 'shape']
+)
+
+UAS_ZONES_RETURNED = Histogram(
+    'geofencing_uas_zones_returned',
+    'Number of UASZones returned per filter request',
+    buckets=COUNT_BUCKETS
+)
+
+SUBSCRIPTIONS_MATCHED = Histogram(
+    'geofencing_subscriptions_matched',
+    'Number of subscriptions matched per UASZone creation or deletion',
+    buckets=COUNT_BUCKETS
+)
+
+MESSAGES_ENQUEUED = Counter(
+    'geofencing_messages_enqueued_total',
+    'Messages enqueued in the SWIMPublisher to be published to the broker',
+    ['message_type']
+)
+
+IPC_RECORDS_DROPPED = Counter(
+    'geofencing_ipc_records_dropped_total',
+    'Broker messages dropped on their way to the dedicated publisher process'
+)
+
+
+def get_multiprocess_dir() -> Optional[str]:
+    for env_var in MULTIPROC_DIR_ENV_VARS:
+        if os.environ.get(env_var):
+            return os.environ[env_var]
+
+    return None
+
+
+@contextmanager
+def timer(histogram: Histogram, *labels: str):
+    """
+    Observes the duration of the enclosed block in the provided histogram
+
+    :param histogram:
+    :param labels: the label values of the histogram, if any
+    """
+    if labels:
+        histogram = histogram.labels(*labels)
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.observe(time.perf_counter() - start)
+
+
+def timed(histogram: Histogram, *labels: str) -> Callable:
+    """
+    Decorator version of `timer`
+
+    :param histogram:
+    :param labels:
+    :return:
+    """
+    def decorator(func):
+        # the labelled child is resolved once instead of on every call
+        child = histogram.labels(*labels) if labels else histogram
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                child.observe(time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def db_timed(func: Callable) -> Callable:
+    """
+    Observes the duration of a DB function labelled with its name
+
+    :param func:
+    :return:
+    """
+    return timed(DB_LATENCY, func.__name__)(func)
+
+
+def get_registry() -> CollectorRegistry:
+    """
+    In multiprocess mode a fresh registry aggregating the metrics of all the processes is created
+    on every collection, otherwise the default registry of the process is used.
+
+    :return:
+    """
+    if get_multiprocess_dir() is None:
+        return REGISTRY
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+
+    return registry
+
+
+def metrics() -> Response:
+    """
+    GET /metrics
+
+    Exposes the metrics in the Prometheus text format
+    :return:
+    """
+    return Response(generate_latest(get_registry()), content_type=CONTENT_TYPE_LATEST)
+
+
+def mark_process_dead(pid: int) -> None:
+    """
+    Cleans up the metrics files of a dead process in multiprocess mode. It is meant to be called
+    from the `child_exit` hook of gunicorn.
+
+    :param pid:
+    """
+    if get_multiprocess_dir() is not None:
+        multiprocess.mark_process_dead(pid)
@@ -0,0 +1,159 @@
+"""
+Copyright 2020 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+import copy
+import hashlib
+import json
+import logging
+import os
+import stat
+from functools import lru_cache
+from typing import Dict, Any, Optional
+
+import yaml
+from pkg_resources import resource_filename
+
+__author__ = "EUROCONTROL (SWIM)"
+
+_logger = logging.getLogger(__name__)
+
+OPENAPI_SPEC_FILE = resource_filename('geofencing_service', 'openapi.yml')
+
+# the cache is private to the user running the service: its files are trusted as the spec that
+# connexion enforces, including the security requirements of the operations
+OPENAPI_CACHE_DIR = os.path.join(os.environ.get('XDG_CACHE_HOME', os.path.join('~', '.cache')),
+                                 'geofencing_service')
+
+# the C loader of libyaml is an order of magnitude faster than the pure python one
+_YAMLLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+def _is_private(stat_result: os.stat_result) -> bool:
+    """
+    :param stat_result:
+    :return: whether the file or directory is owned by the current user and can not be written by
+             anyone else
+    """
+    return stat_result.st_uid == os.getuid() \
+        and not stat_result.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+
+def _get_private_cache_dir(cache_dir: str) -> Optional[str]:
+    """
+    Creates the cache directory with mode 0700 if it does not exist
+
+    :param cache_dir:
+    :return: the absolute path of the directory or None if it can not be created or it is not
+             private to the current user
+    """
+    cache_dir = os.path.abspath(os.path.expanduser(cache_dir))
+
+    try:
+        os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+        stat_result = os.lstat(cache_dir)
+    except OSError as e:
+        _logger.warning(f'Cannot create the OpenAPI cache directory {cache_dir}: {str(e)}')
+        return None
+
+    if not stat.S_ISDIR(stat_result.st_mode) or not _is_private(stat_result):
+        _logger.warning(f'The OpenAPI spec is not cached in {cache_dir} since it is not a '
+                        f'directory private to the current user')
+        return None
+
+    return cache_dir
+
+
+def _get_cache_filename(spec_contents: bytes, cache_dir: str) -> str:
+    return os.path.join(cache_dir, f'openapi.{hashlib.sha1(spec_contents).hexdigest()}.json')
+
+
+def _read_cached_spec(cache_filename: str) -> Optional[Dict[str, Any]]:
+    try:
+        fd = os.open(cache_filename, os.O_RDONLY | os.O_NOFOLLOW)
+    except OSError:
+        return None
+
+    with open(fd) as f:
+        if not _is_private(os.fstat(fd)):
+            _logger.warning(f'Ignoring the cached OpenAPI spec {cache_filename} since it is not '
+                            f'private to the current user')
+            return None
+
+        try:
+            return json.load(f)
+        except ValueError:
+            return None
+
+
+def _write_cached_spec(spec: Dict[str, Any], cache_filename: str) -> None:
+    # written aside and renamed so that concurrently starting processes never read a partial file
+    tmp_filename = f'{cache_filename}.{os.getpid()}'
+    try:
+        fd = os.open(tmp_filename, os.O_WRONLY | os.O_CREAT | os.O_EXCL | os.O_NOFOLLOW, 0o600)
+        with open(fd, 'w') as f:
+            json.dump(spec, f)
+        os.replace(tmp_filename, cache_filename)
+    except OSError as e:
+        _logger.warning(f'Cannot cache the OpenAPI spec in {cache_filename}: {str(e)}')
+
+
+@lru_cache(maxsize=None)
+def _load_openapi_spec(spec_file: str, cache_dir: Optional[str]) -> Dict[str, Any]:
+    with open(spec_file, 'rb') as f:
+        spec_contents = f.read()
+
+    cache_dir = _get_private_cache_dir(cache_dir) if cache_dir else None
+    cache_filename = _get_cache_filename(spec_contents, cache_dir) if cache_dir else None
+
+    if cache_filename is not None:
+        spec = _read_cached_spec(cache_filename)
+        if spec is not None:
+            return spec
+
+    spec = yaml.load(spec_contents, Loader=_YAMLLoader)
+
+    if cache_filename is not None:
+        _write_cached_spec(spec, cache_filename)
+
+    return spec
+
+
+def load_openapi_spec(spec_file: str = OPENAPI_SPEC_FILE,
+                      cache_dir: Optional[str] = OPENAPI_CACHE_DIR) -> Dict[str, Any]:
+    """
+    Loads the OpenAPI spec of the service. The parsed spec is kept in memory and in `cache_dir`
+    as JSON (parsed much faster than YAML) under the hash of the spec file, so that it is parsed
+    once per version of the file instead of on every start. The cache is skipped unless the
+    directory and its files are owned by the current user and not writable by anyone else.
+
+    :param spec_file:
+    :param cache_dir: created with mode 0700 if missing. The spec is not cached on disk if None
+    :return: a copy of the spec that can be freely modified (i.e. by connexion)
+    """
+    return copy.deepcopy(_load_openapi_spec(spec_file, cache_dir))
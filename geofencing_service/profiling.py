@@ -0,0 +1,220 @@
+"""
+Copyright 2020 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+import hmac
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional, Iterable, Callable
+
+from flask import Flask
+from werkzeug.exceptions import HTTPException
+from werkzeug.wsgi import ClosingIterator
+
+__author__ = "EUROCONTROL (SWIM)"
+
+_logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = 'X-Profile'
+SAMPLE_RATE = 0.01
+SAMPLING_INTERVAL_MS = 5
+MAX_OUTPUT_DIR_SIZE_MB = 100
+COLLAPSED_STACKS_EXTENSION = '.collapsed'
+
+
+def _frame_name(frame) -> str:
+    return f"{frame.f_globals.get('__name__', '?')}.{frame.f_code.co_name}"
+
+
+class StackSampler(threading.Thread):
+
+    def __init__(self, thread_id: int, interval_ms: float = SAMPLING_INTERVAL_MS):
+        """
+        Samples periodically the call stack of another thread and counts the collapsed stacks
+        (frames from the outermost to the innermost one separated by `;`), as expected by
+        flamegraph tools. The profiled thread is not interrupted, so the overhead is limited to
+        the sampling thread competing for the GIL.
+
+        Greenlet based workers (gevent, eventlet) are not supported since all their requests run
+        in the same thread.
+
+        :param thread_id: the ident of the thread to be sampled
+        :param interval_ms:
+        """
+        super().__init__(daemon=True)
+        self._thread_id = thread_id
+        self._interval = interval_ms / 1000
+        self._stopped = threading.Event()
+        self.stacks: Counter = Counter()
+
+    def run(self):
+        while not self._stopped.wait(self._interval):
+            frame = sys._current_frames().get(self._thread_id)
+
+            if frame is None:
+                continue
+
+            frames = []
+            while frame is not None:
+                frames.append(_frame_name(frame))
+                frame = frame.f_back
+
+            self.stacks[';'.join(reversed(frames))] += 1
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+
+def write_collapsed_stacks(stacks: Dict[str, int], filename: str) -> None:
+    with open(filename, 'w') as f:
+        for stack, count in stacks.items():
+            f.write(f'{stack} {count}\n')
+
+
+def rotate_output_dir(output_dir: str, max_size_in_bytes: int) -> None:
+    """
+    Deletes the oldest collapsed stacks files until the total size of the directory does not
+    exceed the provided size
+
+    :param output_dir:
+    :param max_size_in_bytes:
+    """
+    entries = [entry for entry in os.scandir(output_dir)
+               if entry.is_file() and entry.name.endswith(COLLAPSED_STACKS_EXTENSION)]
+    entries.sort(key=lambda entry: entry.stat().st_mtime)
+
+    total_size = sum(entry.stat().st_size for entry in entries)
+
+    for entry in entries:
+        if total_size <= max_size_in_bytes:
+            break
+
+        try:
+            os.remove(entry.path)
+        except FileNotFoundError:
+            # already rotated by another worker
+            pass
+
+        # the stat of the entries is cached
+        total_size -= entry.stat().st_size
+
+
+class ProfilerMiddleware:
+
+    def __init__(self,
+                 app: Flask,
+                 output_dir: str,
+                 sample_rate: float = SAMPLE_RATE,
+                 header: str = PROFILE_HEADER,
+                 token: Optional[str] = None,
+                 interval_ms: float = SAMPLING_INTERVAL_MS,
+                 max_output_dir_size_mb: float = MAX_OUTPUT_DIR_SIZE_MB):
+        """
+        WSGI middleware that profiles a random fraction of the requests, along with the requests
+        carrying the profiling header with the configured token, with a StackSampler. The
+        collapsed stacks of each profiled request are written in
+        `<output_dir>/<endpoint>.<timestamp>.<pid>.collapsed` and can be merged per endpoint into a
+        flamegraph, i.e.:
+
+            cat filter_uas_zones.*.collapsed | flamegraph.pl > filter_uas_zones.svg
+
+        :param app: the Flask app whose wsgi_app is wrapped
+        :param output_dir:
+        :param sample_rate: the fraction of requests to profile
+        :param header: requests carrying this header with the token as value are profiled
+        :param token: the header is ignored if not set
+        :param interval_ms: the sampling interval
+        :param max_output_dir_size_mb: the oldest files are deleted beyond this size
+        """
+        self._app = app
+        self._wsgi_app = app.wsgi_app
+        self._output_dir = output_dir
+        self._sample_rate = sample_rate
+        self._header_key = 'HTTP_' + header.upper().replace('-', '_')
+        self._token = token
+        self._interval_ms = interval_ms
+        self._max_output_dir_size = max_output_dir_size_mb * 1024 * 1024
+
+        os.makedirs(self._output_dir, exist_ok=True)
+
+    def _should_profile(self, environ: dict) -> bool:
+        header_value = environ.get(self._header_key)
+
+        if self._token and header_value is not None \
+                and hmac.compare_digest(header_value.encode(), self._token.encode()):
+            return True
+
+        return random.random() < self._sample_rate
+
+    def _get_endpoint(self, environ: dict) -> str:
+        try:
+            rule, _ = self._app.url_map.bind_to_environ(environ).match(return_rule=True)
+        except HTTPException:
+            return 'unknown'
+
+        # connexion endpoints are named after the operationId
+        return rule.endpoint.rsplit('.', 1)[-1].replace('/', '_')
+
+    def _save(self, sampler: StackSampler, environ: dict) -> None:
+        sampler.stop()
+
+        if not sampler.stacks:
+            return
+
+        filename = os.path.join(
+            self._output_dir,
+            f'{self._get_endpoint(environ)}.{time.time():.6f}.{os.getpid()}'
+            f'{COLLAPSED_STACKS_EXTENSION}'
+        )
+        try:
+            write_collapsed_stacks(sampler.stacks, filename)
+            rotate_output_dir(self._output_dir, self._max_output_dir_size)
+        except OSError as e:
+            _logger.error(f'Error while saving profile: {str(e)}')
+
+    def __call__(self, environ: dict, start_response: Callable) -> Iterable[bytes]:
+        if not self._should_profile(environ):
+            return self._wsgi_app(environ, start_response)
+
+        sampler = StackSampler(threading.get_ident(), self._interval_ms)
+        sampler.start()
+
+        try:
+            response = self._wsgi_app(environ, start_response)
+        except Exception:
+            self._save(sampler, environ)
+            raise
+
+        # the profiling stops once the response has been sent
+        return ClosingIterator(response, lambda: self._save(sampler, environ))
@@ -0,0 +1,127 @@
+"""
+Copyright 2020 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+import logging
+import os
+import threading
+from typing import Dict, Any, Optional, List, TYPE_CHECKING
+
+from flask import Flask, current_app
+
+from geofencing_service.db.models import UASZonesSubscription
+from geofencing_service.db.subscriptions import get_uas_zones_subscriptions
+
+if TYPE_CHECKING:
+    from pubsub_facades.swim_pubsub import SWIMPublisher
+
+__author__ = "EUROCONTROL (SWIM)"
+
+_logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+
+
+def _preload_swim_publisher(swim_publisher: 'SWIMPublisher',
+                            subscriptions: List[UASZonesSubscription]):
+    """
+    Initializes the publisher with the existing subscriptions if any
+    :param swim_publisher:
+    :param subscriptions:
+    """
+    # imported here since the message producers get the publisher from this module
+    from geofencing_service.events.broker_message_producers import \
+        uas_zones_updates_message_producer
+
+    for subscription in subscriptions:
+        swim_publisher.preload_topic_message_producer(
+            topic_name=subscription.sm_subscription.topic_name,
+            message_producer=uas_zones_updates_message_producer
+        )
+        _logger.info(f'Added message_producer for topic: {subscription.sm_subscription.topic_name}')
+
+
+def start_swim_publisher(app: Flask) -> None:
+    """
+    Starts the SWIMPublisher of the app in the current process, unless it is already running in
+    it. The threads and the broker connection of a publisher do not survive a fork, so a publisher
+    that was started in another process (i.e. the master of a preloading server) is recreated
+    with the app's swim_publisher_factory. Apps without a factory (i.e. testing ones) are left
+    untouched.
+
+    :param app:
+    """
+    factory = getattr(app, 'swim_publisher_factory', None)
+    if factory is None:
+        return
+
+    with _lock:
+        pid = getattr(app, 'swim_publisher_pid', None)
+
+        if pid == os.getpid():
+            return
+
+        if pid is not None or app.swim_publisher is None:
+            with app.app_context():
+                app.swim_publisher = factory()
+
+        # the SWIMPublisher is started in threaded mode in order to be able to use add the
+        # message_producers on demand
+        app.swim_publisher.run(threaded=True)
+
+        _preload_swim_publisher(swim_publisher=app.swim_publisher,
+                                subscriptions=get_uas_zones_subscriptions())
+
+        app.swim_publisher_pid = os.getpid()
+
+        _logger.info(f'Started the SWIMPublisher of process {os.getpid()}')
+
+
+def get_swim_publisher() -> Optional['SWIMPublisher']:
+    """
+    :return: the SWIMPublisher of the current app, started in the current process if needed
+    """
+    app = current_app._get_current_object()
+
+    if getattr(app, 'swim_publisher_pid', None) != os.getpid():
+        start_swim_publisher(app)
+
+    return app.swim_publisher
+
+
+def get_swim_publisher_health(app: Flask) -> Dict[str, Any]:
+    """
+    :param app:
+    :return: whether the publisher of the app is running in the current process
+    """
+    if getattr(app, 'swim_publisher_factory', None) is None:
+        return {'ok': app.swim_publisher is not None}
+
+    pid = getattr(app, 'swim_publisher_pid', None)
+
+    return {'ok': pid == os.getpid(), 'pid': os.getpid(), 'started_in_pid': pid}
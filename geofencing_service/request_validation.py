@@ -0,0 +1,149 @@
+"""
+Copyright 2020 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+import functools
+import json
+import logging
+from typing import Any, Callable, Dict, Optional
+
+import fastjsonschema
+from connexion.decorators.validation import RequestBodyValidator
+from connexion.exceptions import BadRequestProblem
+from connexion.utils import is_null
+from fastjsonschema.draft04 import CodeGeneratorDraft04
+
+from geofencing_service.endpoints.schemas.validation import request_body_validated
+
+__author__ = "EUROCONTROL (SWIM)"
+
+_logger = logging.getLogger(__name__)
+
+CONNEXION_MODE = 'connexion'
+SINGLE_PASS_MODE = 'single_pass'
+
+# the datetimes are parsed (and therefore validated) by the marshmallow schemas anyway
+PARSED_FORMATS = ('date-time', 'time')
+
+CHECKED_FORMATS = tuple(set(CodeGeneratorDraft04.FORMAT_REGEXS) - set(PARSED_FORMATS))
+
+
+def to_json_schema(schema: Any) -> Any:
+    """
+    Converts an OpenAPI schema object, with its references resolved, to a JSON Schema that can be
+    compiled by fastjsonschema:
+        - the formats that are not checked are dropped, since fastjsonschema does not accept unknown
+          formats unlike the JSON Schema validators
+        - openapi.yml documents the horizontal projection of the AirspaceVolume as
+          `horizontal_projection` whereas the requests carry `horizontalProjection`. It is
+          validated under the latter. The spec is left as is because in the `connexion` mode the
+          invalid projections are reported with the (detailed) messages of the marshmallow schemas.
+
+    :param schema:
+    :return:
+    """
+    if isinstance(schema, list):
+        return [to_json_schema(item) for item in schema]
+
+    if not isinstance(schema, dict):
+        return schema
+
+    json_schema = {key: to_json_schema(value) for key, value in schema.items()}
+
+    if json_schema.get('format') not in CHECKED_FORMATS:
+        json_schema.pop('format', None)
+
+    properties = json_schema.get('properties')
+    if isinstance(properties, dict) and 'horizontal_projection' in properties:
+        properties['horizontalProjection'] = properties.pop('horizontal_projection')
+
+    return json_schema
+
+
+@functools.lru_cache(maxsize=None)
+def _compile(json_schema: str) -> Callable[[Any], Any]:
+    return fastjsonschema.compile(json.loads(json_schema))
+
+
+def compile_request_body_validator(schema: Dict[str, Any]) -> Callable[[Any], Any]:
+    """
+    Generates the Python code that validates a request body against the given OpenAPI schema. The
+    code is generated once per schema and the returned function raises
+    fastjsonschema.JsonSchemaException for invalid data.
+
+    :param schema:
+    :return:
+    """
+    return _compile(json.dumps(to_json_schema(schema), sort_keys=True))
+
+
+class CompiledRequestBodyValidator(RequestBodyValidator):
+    """
+    Replaces the jsonschema validation of the JSON request bodies with the code compiled from their
+    schemas and marks them as validated, so that the marshmallow schemas only transform them
+    instead of walking their geometries once more.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.compiled_validator = compile_request_body_validator(self.schema)
+
+    def __call__(self, function):
+        @functools.wraps(function)
+        def validated_function(request):
+            with request_body_validated():
+                return function(request)
+
+        return super().__call__(validated_function)
+
+    def validate_schema(self, data, url):
+        if self.is_null_value_valid and is_null(data):
+            return None
+
+        try:
+            self.compiled_validator(data)
+        except fastjsonschema.JsonSchemaException as e:
+            _logger.error(f"{url} validation error: {e.message}", extra={'validator': 'body'})
+            raise BadRequestProblem(detail=e.message)
+
+        return None
+
+
+def get_validator_map(mode: str) -> Optional[Dict[str, type]]:
+    """
+    :param mode: one of `connexion` or `single_pass`
+    :return: the custom validators to be passed to connexion for the given validation mode
+    """
+    if mode == CONNEXION_MODE:
+        return None
+
+    if mode == SINGLE_PASS_MODE:
+        return {'body': CompiledRequestBodyValidator}
+
+    raise ValueError(f"Invalid request validation mode: {mode}")
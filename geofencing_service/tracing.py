@@ -0,0 +1,198 @@
+"""
+Copyright 2020 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+import json
+import logging
+import time
+from contextlib import contextmanager, ExitStack
+from typing import List, Callable, Dict, Any, Optional, Iterator
+
+from flask import current_app, has_app_context
+
+from geofencing_service.metrics import EVENT_HANDLER_LATENCY
+
+try:
+    from opentelemetry import trace as otel_trace
+except ImportError:
+    # OpenTelemetry is optional, the spans are then only exported locally
+    otel_trace = None
+
+__author__ = "EUROCONTROL (SWIM)"
+
+_logger = logging.getLogger(__name__)
+
+CONSOLE_EXPORTER = 'console'
+FILE_EXPORTER = 'file'
+OPENTELEMETRY_EXPORTER = 'opentelemetry'
+
+# events taking longer than this are logged as warnings with the duration of each handler
+SLOW_EVENT_THRESHOLD_MS = 500
+
+TRACES_FILE = 'event_traces.jsonl'
+
+_event_trace_listeners: List[Callable[['EventTrace'], None]] = []
+
+
+class Span:
+
+    def __init__(self, name: str, start_time: float):
+        """
+        The timing of a unit of work, named after the OpenTelemetry span it mirrors
+
+        :param name:
+        :param start_time: epoch time in seconds
+        """
+        self.name = name
+        self.start_time = start_time
+        self.duration_ms: Optional[float] = None
+        self.error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'start_time': self.start_time,
+            'duration_ms': self.duration_ms,
+            'error': self.error
+        }
+
+
+class EventTrace(Span):
+
+    def __init__(self, event_name: str, start_time: float):
+        """
+        The timing of an event handling along with the timings of its handlers
+
+        :param event_name:
+        :param start_time: epoch time in seconds
+        """
+        super().__init__(event_name, start_time)
+        self.handler_spans: List[Span] = []
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = super().to_dict()
+        result['handlers'] = [span.to_dict() for span in self.handler_spans]
+
+        return result
+
+    def __str__(self):
+        handlers = ', '.join(f'{span.name}: {span.duration_ms:.1f} ms'
+                             for span in self.handler_spans)
+
+        return f'{self.name} took {self.duration_ms:.1f} ms ({handlers})'
+
+
+def add_event_trace_listener(listener: Callable[[EventTrace], None]) -> None:
+    """
+    Registers a callable that will be called with every finished EventTrace
+
+    :param listener:
+    """
+    _event_trace_listeners.append(listener)
+
+
+def remove_event_trace_listener(listener: Callable[[EventTrace], None]) -> None:
+    _event_trace_listeners.remove(listener)
+
+
+def _get_config() -> Dict[str, Any]:
+    return current_app.config.get('TRACING', {}) if has_app_context() else {}
+
+
+@contextmanager
+def _timed_span(span: Span, otel_span_name: Optional[str], use_opentelemetry: bool):
+    """
+    Times the enclosed block into `span` and wraps it in an OpenTelemetry span if requested.
+    """
+    with ExitStack() as stack:
+        if use_opentelemetry:
+            stack.enter_context(
+                otel_trace.get_tracer(__name__).start_as_current_span(otel_span_name))
+
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            span.error = str(e)
+            raise
+        finally:
+            span.duration_ms = (time.perf_counter() - start) * 1000
+
+
+def _export(event_trace: EventTrace, config: Dict[str, Any]) -> None:
+    exporter = config.get('EXPORTER')
+
+    if exporter == CONSOLE_EXPORTER:
+        _logger.info(str(event_trace))
+    elif exporter == FILE_EXPORTER:
+        with open(config.get('FILE', TRACES_FILE), 'a') as f:
+            f.write(json.dumps(event_trace.to_dict()) + '\n')
+
+    if event_trace.duration_ms > config.get('SLOW_EVENT_THRESHOLD_MS', SLOW_EVENT_THRESHOLD_MS):
+        _logger.warning(f'Slow event: {event_trace}')
+
+    for listener in list(_event_trace_listeners):
+        listener(event_trace)
+
+
+class EventTracer:
+
+    def __init__(self, event_name: str):
+        """
+        Traces the handling of an event and of each one of its handlers. The spans are created in
+        OpenTelemetry if it is installed and selected as exporter, so that they are nested in the
+        span of the request. Otherwise they are logged or written in a JSON lines file depending
+        on the TRACING configuration.
+
+        :param event_name:
+        """
+        self._config = _get_config()
+        self._use_opentelemetry = otel_trace is not None \
+            and self._config.get('EXPORTER') == OPENTELEMETRY_EXPORTER
+        self.event_trace = EventTrace(event_name, time.time())
+
+    @contextmanager
+    def event_span(self) -> Iterator[EventTrace]:
+        try:
+            with _timed_span(self.event_trace, self.event_trace.name, self._use_opentelemetry):
+                yield self.event_trace
+        finally:
+            _export(self.event_trace, self._config)
+
+    @contextmanager
+    def handler_span(self, handler_name: str) -> Iterator[Span]:
+        span = Span(handler_name, time.time())
+        self.event_trace.handler_spans.append(span)
+
+        try:
+            with _timed_span(span, f'{self.event_trace.name}.{handler_name}',
+                             self._use_opentelemetry):
+                yield span
+        finally:
+            EVENT_HANDLER_LATENCY.labels(self.event_trace.name,
+                                         handler_name).observe(span.duration_ms / 1000)
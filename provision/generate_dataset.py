@@ -0,0 +1,471 @@
+"""
+Copyright 2020 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import random
+import uuid
+from datetime import datetime, timezone, timedelta
+from itertools import islice
+from typing import Iterator, Iterable, List, Tuple, Dict, Any
+
+from mongoengine import Document
+from pkg_resources import resource_filename
+
+from geofencing_service.db import METERS_TO_FEET_RATIO
+from geofencing_service.db.geometry import METERS_PER_DEGREE
+from geofencing_service.db.models import User, UASZone, UASZonesSubscription, \
+    GeofencingSMSubscription, CodeZoneType, CodeRestrictionType, CodeZoneReasonType, \
+    CodeYesNoType, CodeUSpaceClassType, CodeVerticalReferenceType, CodeAuthorityRole, UomDistance, \
+    CodeWeekDay
+from geofencing_service.db.users import get_user_by_username, create_user
+from geofencing_service.endpoints.schemas.db_schemas import UASZoneSchema, UASZonesFilterSchema
+from geofencing_service.endpoints.schemas.registry import get_schema
+from provision.provision_db import configure
+
+__author__ = "EUROCONTROL (SWIM)"
+
+_logger = logging.getLogger(__name__)
+
+# rough bounding boxes (min_lon, min_lat, max_lon, max_lat) of the countries the UASZones are
+# spread in
+COUNTRIES_BBOXES = {
+    'BEL': (2.55, 49.5, 6.4, 51.5),
+    'NLD': (3.36, 50.75, 7.2, 53.5),
+    'FRA': (-4.8, 42.3, 8.2, 51.1),
+    'DEU': (5.9, 47.3, 15.0, 55.0),
+    'ESP': (-9.3, 36.0, 3.3, 43.8),
+    'ITA': (6.6, 36.6, 18.5, 47.1),
+}
+
+N_REGIONS = 100
+
+CIRCLES_RATIO = 0.3
+
+# the radii of the UASZones follow a log-normal distribution with a median of 500m
+RADIUS_MEDIAN_IN_M = 500
+RADIUS_SIGMA = 1.0
+RADIUS_RANGE_IN_M = (50, 20000)
+
+# the half size of the filters' boxes follows a log-normal distribution with a median of 5km
+FILTER_HALF_SIZE_MEDIAN_IN_M = 5000
+FILTER_HALF_SIZE_SIGMA = 0.8
+
+LOWER_LIMITS_IN_M = (0, 0, 0, 30, 60, 120)
+ALTITUDE_BANDS_IN_M = (60, 120, 150, 300, 500, 1000, 1500)
+
+# all the generated applicability periods fall in this range
+APPLICABILITY_START = datetime(2020, 1, 1, tzinfo=timezone.utc)
+APPLICABILITY_END = datetime(2023, 1, 1, tzinfo=timezone.utc)
+
+WORKING_DAYS = (CodeWeekDay.MON, CodeWeekDay.TUE, CodeWeekDay.WED, CodeWeekDay.THU,
+                CodeWeekDay.FRI)
+WEEKEND_DAYS = (CodeWeekDay.SAT, CodeWeekDay.SUN)
+
+INSERT_CHUNK_SIZE = 1000
+
+# the identifiers of the UASZones are their zero padded indices and can not exceed the max_length of
+# UASZone.identifier
+UAS_ZONE_IDENTIFIER_LENGTH = UASZone.identifier.max_length
+MAX_UAS_ZONES = 10 ** UAS_ZONE_IDENTIFIER_LENGTH
+
+
+def _random_log_normal(rnd: random.Random,
+                       median: float,
+                       sigma: float,
+                       value_range: Tuple[float, float] = (0, math.inf)) -> float:
+    value = rnd.lognormvariate(math.log(median), sigma)
+
+    return min(max(value, value_range[0]), value_range[1])
+
+
+def _meters_to_degrees(lat: float, meters: float) -> Tuple[float, float]:
+    """
+    :param lat: the latitude where the distance is measured
+    :param meters:
+    :return: the respective (longitude, latitude) degrees
+    """
+    return meters / (METERS_PER_DEGREE * math.cos(math.radians(lat))), meters / METERS_PER_DEGREE
+
+
+def _random_point(rnd: random.Random, bbox: Tuple[float, float, float, float]) -> List[float]:
+    min_lon, min_lat, max_lon, max_lat = bbox
+
+    return [round(rnd.uniform(min_lon, max_lon), 6), round(rnd.uniform(min_lat, max_lat), 6)]
+
+
+def _random_polygon(rnd: random.Random, center: List[float], radius_in_m: float) -> dict:
+    """
+    Creates a star shaped (thus valid) polygon around the center whose vertices are up to
+    `radius_in_m` far from it. Larger polygons tend to have more vertices.
+    """
+    n_vertices = min(4 + int(radius_in_m / 250) + rnd.randint(0, 8), 60)
+    angles = sorted(rnd.uniform(0, 2 * math.pi) for _ in range(n_vertices))
+
+    linestring = []
+    for angle in angles:
+        lon_radius, lat_radius = _meters_to_degrees(center[1],
+                                                    rnd.uniform(radius_in_m / 2, radius_in_m))
+        linestring.append([round(center[0] + lon_radius * math.cos(angle), 6),
+                           round(center[1] + lat_radius * math.sin(angle), 6)])
+    linestring.append(linestring[0])
+
+    return {'type': 'Polygon', 'coordinates': [linestring]}
+
+
+def _random_airspace_volume(rnd: random.Random, center: List[float]) -> dict:
+    uom_dimensions = rnd.choice(UomDistance.choices())
+    uom_ratio = METERS_TO_FEET_RATIO if uom_dimensions == UomDistance.FEET.value else 1
+
+    lower_limit_in_m = rnd.choice(LOWER_LIMITS_IN_M)
+    upper_limit_in_m = lower_limit_in_m + rnd.choice(ALTITUDE_BANDS_IN_M)
+
+    radius_in_m = _random_log_normal(rnd, RADIUS_MEDIAN_IN_M, RADIUS_SIGMA, RADIUS_RANGE_IN_M)
+
+    if rnd.random() < CIRCLES_RATIO:
+        horizontal_projection = {
+            'type': 'Circle',
+            'center': center,
+            'radius': round(radius_in_m * uom_ratio)
+        }
+    else:
+        horizontal_projection = _random_polygon(rnd, center, radius_in_m)
+
+    return {
+        'uomDimensions': uom_dimensions,
+        'lowerLimit': int(lower_limit_in_m * uom_ratio),
+        'lowerVerticalReference': rnd.choice(CodeVerticalReferenceType.choices()),
+        'upperLimit': int(upper_limit_in_m * uom_ratio),
+        'upperVerticalReference': rnd.choice(CodeVerticalReferenceType.choices()),
+        'horizontalProjection': horizontal_projection
+    }
+
+
+def _random_schedule(rnd: random.Random) -> List[dict]:
+    """
+    Creates a weekly schedule: either none (always applicable), working days, weekends or any day
+    within the same hours
+    """
+    days = rnd.choice([(), WORKING_DAYS, WEEKEND_DAYS, (CodeWeekDay.ANY,)])
+
+    start_hour = rnd.randint(6, 12)
+    end_hour = min(start_hour + rnd.randint(2, 10), 23)
+
+    return [
+        {
+            'day': day.value,
+            'startTime': f'{start_hour:02d}:00:00+00:00',
+            'endTime': f'{end_hour:02d}:00:00+00:00'
+        }
+        for day in days
+    ]
+
+
+def _random_applicability(rnd: random.Random) -> dict:
+    start_date_time = APPLICABILITY_START + timedelta(days=rnd.randint(0, 365))
+    end_date_time = min(start_date_time + timedelta(days=rnd.randint(30, 730)), APPLICABILITY_END)
+    schedule = _random_schedule(rnd)
+
+    return {
+        'permanent': CodeYesNoType.NO.value if schedule else CodeYesNoType.YES.value,
+        'startDateTime': start_date_time.isoformat(),
+        'endDateTime': end_date_time.isoformat(),
+        'schedule': schedule
+    }
+
+
+def _random_zone_authority(rnd: random.Random, country: str) -> dict:
+    return {
+        'name': f'{country} authority {rnd.randint(1, 10)}',
+        'service': 'UAS zones service',
+        'email': f'uas.zones@authority.{country.lower()}',
+        'contactName': 'UAS zones manager',
+        'siteURL': f'https://www.authority.{country.lower()}',
+        'phone': '0123456789',
+        'purpose': rnd.choice(CodeAuthorityRole.choices()),
+        'intervalBefore': f'P{rnd.randint(1, 30)}D'
+    }
+
+
+class DatasetGenerator:
+
+    def __init__(self, seed: int):
+        """
+        Generates UASZones and UASZonesFilters in the format of the API requests. The same seed
+        always yields the same dataset.
+
+        :param seed:
+        """
+        self._rnd = random.Random(seed)
+
+        """Generates the ids of the subscriptions apart so that they do not alter the filters"""
+        self._ids_rnd = random.Random(seed)
+
+        """Holds the (center, region) of the generated UASZones for the filters to match them"""
+        self._uas_zones_anchors: List[Tuple[List[float], int]] = []
+
+    def uas_zones(self, n: int, first_index: int = 0) -> Iterator[dict]:
+        """
+        :param n: the number of UASZones to generate
+        :param first_index: the identifiers of the UASZones are consecutive starting from it
+        :return:
+        :raises ValueError: if the identifiers would exceed MAX_UAS_ZONES
+        """
+        if first_index < 0 or first_index + n > MAX_UAS_ZONES:
+            raise ValueError(f'The identifiers of the UASZones must be in [0, {MAX_UAS_ZONES}), '
+                             f'got [{first_index}, {first_index + n})')
+
+        return self._generate_uas_zones(n, first_index)
+
+    def _generate_uas_zones(self, n: int, first_index: int) -> Iterator[dict]:
+        for index in range(first_index, first_index + n):
+            country = self._rnd.choice(list(COUNTRIES_BBOXES))
+            center = _random_point(self._rnd, COUNTRIES_BBOXES[country])
+            region = self._rnd.randrange(N_REGIONS)
+
+            self._uas_zones_anchors.append((center, region))
+
+            yield {
+                'identifier': str(index).zfill(UAS_ZONE_IDENTIFIER_LENGTH),
+                'country': country,
+                'name': f'Synthetic UASZone {index}',
+                'type': self._rnd.choice(CodeZoneType.choices()),
+                'restriction': self._rnd.choice(CodeRestrictionType.choices()),
+                'restrictionConditions': [],
+                'region': region,
+                'reason': self._rnd.sample(CodeZoneReasonType.choices(), self._rnd.randint(1, 3)),
+                'otherReasonInfo': '',
+                'regulationExemption': self._rnd.choice(CodeYesNoType.choices()),
+                'uSpaceClass': self._rnd.choice(CodeUSpaceClassType.choices()),
+                'message': f'Synthetic UASZone {index}',
+                'zoneAuthority': _random_zone_authority(self._rnd, country),
+                'applicability': _random_applicability(self._rnd),
+                'geometry': [_random_airspace_volume(self._rnd, center)],
+                'extendedProperties': {}
+            }
+
+    def uas_zones_filters(self, n: int) -> Iterator[dict]:
+        """
+        Generates filters around the already generated UASZones so that each one of them matches
+        at least one UASZone. Random locations are used if no UASZones have been generated.
+
+        :param n: the number of UASZonesFilters to generate
+        :return:
+        """
+        for _ in range(n):
+            if self._uas_zones_anchors:
+                center, region = self._rnd.choice(self._uas_zones_anchors)
+            else:
+                bbox = COUNTRIES_BBOXES[self._rnd.choice(list(COUNTRIES_BBOXES))]
+                center, region = _random_point(self._rnd, bbox), self._rnd.randrange(N_REGIONS)
+
+            half_size_in_m = _random_log_normal(self._rnd,
+                                                FILTER_HALF_SIZE_MEDIAN_IN_M,
+                                                FILTER_HALF_SIZE_SIGMA)
+            lon_delta, lat_delta = _meters_to_degrees(center[1], half_size_in_m)
+            min_lon, min_lat = round(center[0] - lon_delta, 6), round(center[1] - lat_delta, 6)
+            max_lon, max_lat = round(center[0] + lon_delta, 6), round(center[1] + lat_delta, 6)
+
+            yield {
+                'airspaceVolume': {
+                    'uomDimensions': UomDistance.METERS.value,
+                    'lowerLimit': 0,
+                    'lowerVerticalReference': CodeVerticalReferenceType.AMSL.value,
+                    'upperLimit': 5000,
+                    'upperVerticalReference': CodeVerticalReferenceType.AMSL.value,
+                    'horizontalProjection': {
+                        'type': 'Polygon',
+                        'coordinates': [[
+                            [min_lon, min_lat],
+                            [max_lon, min_lat],
+                            [max_lon, max_lat],
+                            [min_lon, max_lat],
+                            [min_lon, min_lat]
+                        ]]
+                    }
+                },
+                'regions': sorted({region, *self._rnd.sample(range(N_REGIONS), 4)}),
+                'startDateTime': APPLICABILITY_START.isoformat(),
+                'endDateTime': APPLICABILITY_END.isoformat()
+            }
+
+    def subscription_ids(self) -> Iterator[str]:
+        """
+        Generates the ids of the UASZonesSubscriptions. They depend on the seed only and do not
+        repeat across the calls of the same generator.
+
+        :return: an endless iterator of ids
+        """
+        while True:
+            yield uuid.UUID(int=self._ids_rnd.getrandbits(128)).hex
+
+
+def _chunks(iterable: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def bulk_insert(documents: Iterable[Document], chunk_size: int = INSERT_CHUNK_SIZE) -> int:
+    """
+    Inserts the documents in chunks directly in their collection. They are validated explicitly as
+    the bulk insert skips the validation and thus the computation of the helper fields.
+
+    :param documents: documents of the same type
+    :param chunk_size:
+    :return: the number of inserted documents
+    """
+    n_inserted = 0
+    for chunk in _chunks(documents, chunk_size):
+        for document in chunk:
+            document.validate()
+
+        type(chunk[0])._get_collection().insert_many([document.to_mongo() for document in chunk])
+        n_inserted += len(chunk)
+
+    return n_inserted
+
+
+def load_uas_zones(uas_zones_data: Iterable[dict], user: User) -> Iterator[Document]:
+    """
+    :param uas_zones_data: UASZones in the format of the API requests
+    :param user: an already saved user that will own the UASZones
+    :return:
+    """
+    for uas_zone_data in uas_zones_data:
+        uas_zone = get_schema(UASZoneSchema).load(uas_zone_data)
+        uas_zone.user = user
+
+        yield uas_zone
+
+
+def load_uas_zones_subscriptions(uas_zones_filters_data: Iterable[dict],
+                                 user: User,
+                                 subscription_ids: Iterable[str]) -> Iterator[Document]:
+    """
+    The subscriptions are not registered in the Subscription Manager, so they are given synthetic
+    queues and topics.
+
+    :param uas_zones_filters_data: UASZonesFilters in the format of the API requests
+    :param user: an already saved user that will own the subscriptions
+    :param subscription_ids: i.e. DatasetGenerator.subscription_ids()
+    :return:
+    """
+    uas_zones_filters_with_ids = zip(uas_zones_filters_data, subscription_ids)
+
+    for index, (uas_zones_filter_data, subscription_id) in enumerate(uas_zones_filters_with_ids):
+
+        yield UASZonesSubscription(
+            id=subscription_id,
+            sm_subscription=GeofencingSMSubscription(id=index,
+                                                     queue=f'synthetic-{subscription_id}',
+                                                     topic_name=f'synthetic-{subscription_id}',
+                                                     active=True),
+            uas_zones_filter=get_schema(UASZonesFilterSchema).load(uas_zones_filter_data),
+            user=user
+        )
+
+
+def write_jsonl(records: Iterable[Dict[str, Any]], filename: str) -> int:
+    """
+    :param records:
+    :param filename:
+    :return: the number of written records
+    """
+    n_written = 0
+    with open(filename, 'w') as f:
+        for record in records:
+            f.write(json.dumps(record) + '\n')
+            n_written += 1
+
+    return n_written
+
+
+def _get_or_create_user(username: str, password: str) -> User:
+    return get_user_by_username(username) or create_user(User(username=username,
+                                                               password=password))
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description='Generates a synthetic dataset of UASZones and '
+                                                 'UASZonesFilter subscriptions')
+    parser.add_argument('--uas-zones', type=int, default=1000, help='number of UASZones')
+    parser.add_argument('--subscriptions', type=int, default=100,
+                        help='number of UASZonesFilter subscriptions')
+    parser.add_argument('--seed', type=int, default=2020)
+    parser.add_argument('--first-index', type=int, default=0,
+                        help='the identifier of the first UASZone')
+
+    output = parser.add_mutually_exclusive_group(required=True)
+    output.add_argument('--output-dir',
+                        help='writes uas_zones.jsonl and uas_zones_filters.jsonl in this directory')
+    output.add_argument('--mongo', action='store_true',
+                        help='inserts the dataset in the DB configured in provision/config.yml')
+
+    args = parser.parse_args()
+
+    if args.first_index < 0 or args.first_index + args.uas_zones > MAX_UAS_ZONES:
+        parser.error(f'the identifiers of the UASZones can not exceed {MAX_UAS_ZONES - 1}')
+
+    return args
+
+
+if __name__ == '__main__':
+    args = _parse_args()
+
+    generator = DatasetGenerator(seed=args.seed)
+    uas_zones = generator.uas_zones(args.uas_zones, first_index=args.first_index)
+
+    if args.output_dir:
+        logging.basicConfig(level=logging.INFO)
+        os.makedirs(args.output_dir, exist_ok=True)
+
+        count = write_jsonl(uas_zones, os.path.join(args.output_dir, 'uas_zones.jsonl'))
+        _logger.info(f'Written {count} UASZones')
+
+        count = write_jsonl(generator.uas_zones_filters(args.subscriptions),
+                            os.path.join(args.output_dir, 'uas_zones_filters.jsonl'))
+        _logger.info(f'Written {count} UASZonesFilters')
+    else:
+        config = configure(resource_filename(__name__, 'config.yml'))
+        user_data = config['DB_USERS'][0]
+        user = _get_or_create_user(user_data['user'], user_data['pass'])
+
+        count = bulk_insert(load_uas_zones(uas_zones, user))
+        _logger.info(f'Inserted {count} UASZones')
+
+        count = bulk_insert(load_uas_zones_subscriptions(
+            generator.uas_zones_filters(args.subscriptions), user, generator.subscription_ids()))
+        _logger.info(f'Inserted {count} UASZonesSubscriptions')
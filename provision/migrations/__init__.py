@@ -0,0 +1,80 @@
+"""
+Copyright 2020 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+from typing import Dict, Any, Callable, List, Optional
+
+from pymongo.collection import Collection
+
+__author__ = "EUROCONTROL (SWIM)"
+
+# the module names of the migration scripts, i.e. v0001_normalize_altitude_limits
+MIGRATION_MODULE_PATTERN = r'^v\d{4}_\w+$'
+
+
+class MigrationStep:
+
+    def __init__(self,
+                 name: str,
+                 get_collection: Callable[[], Collection],
+                 query: Dict[str, Any],
+                 get_update: Callable[[Dict[str, Any]], Dict[str, Any]],
+                 projection: Optional[Dict[str, Any]] = None) -> None:
+        """
+        A rewrite of the documents of a collection
+
+        :param name: unique within its migration, used to checkpoint the step
+        :param get_collection: returns the collection to migrate (called once the DB is connected)
+        :param query: matches the documents still to be migrated
+        :param get_update: returns the update operators of a document (no update if empty)
+        :param projection: the fields of the documents required by get_update
+        """
+        self.name = name
+        self.get_collection = get_collection
+        self.query = query
+        self.get_update = get_update
+        self.projection = projection
+
+
+class Migration:
+
+    def __init__(self,
+                 description: str,
+                 steps: List[MigrationStep],
+                 finalize: Optional[Callable[[], None]] = None) -> None:
+        """
+        Each migration script defines a MIGRATION which is applied once by the runner, in the
+        order of the script versions.
+
+        :param description:
+        :param steps: applied in order
+        :param finalize: called once all the steps are applied, i.e. to build new indexes
+        """
+        self.description = description
+        self.steps = steps
+        self.finalize = finalize
@@ -0,0 +1,73 @@
+"""
+Copyright 2020 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+import argparse
+import logging
+
+from pkg_resources import resource_filename
+
+from provision.migrations.runner import MigrationRunner, BATCH_SIZE, get_migrations, \
+    get_migrations_collection
+from provision.provision_db import configure
+
+__author__ = "EUROCONTROL (SWIM)"
+
+_logger = logging.getLogger(__name__)
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Applies the pending DB migrations')
+    parser.add_argument('--target', help='the last version to apply, i.e. v0001 (default: all)')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                        help='number of documents updated per bulk write')
+    parser.add_argument('--max-docs-per-second', type=float,
+                        help='throttles the migrations (default: unthrottled)')
+    parser.add_argument('--list', action='store_true',
+                        help='lists the migrations and whether they are applied')
+
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = _parse_args()
+
+    configure(resource_filename('provision', 'config.yml'))
+
+    runner = MigrationRunner(get_migrations_collection(),
+                             batch_size=args.batch_size,
+                             max_docs_per_second=args.max_docs_per_second)
+    migrations = get_migrations()
+
+    if args.list:
+        for version, migration in migrations:
+            status = 'applied' if runner.is_applied(version) else 'pending'
+            print(f'{version} [{status}] {migration.description}')
+    else:
+        applied = runner.run(migrations, target=args.target)
+        _logger.info(f'Applied {len(applied)} migrations: {applied}')
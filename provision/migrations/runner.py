@@ -0,0 +1,230 @@
+"""
+Copyright 2020 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+import importlib
+import logging
+import pkgutil
+import re
+import time
+from datetime import datetime, timezone
+from typing import Dict, Any, Callable, List, Optional, Tuple, NamedTuple
+
+from mongoengine import connection
+from pymongo import UpdateOne
+from pymongo.collection import Collection
+
+import provision.migrations
+from provision.migrations import Migration, MigrationStep, MIGRATION_MODULE_PATTERN
+
+__author__ = "EUROCONTROL (SWIM)"
+
+_logger = logging.getLogger(__name__)
+
+MIGRATIONS_COLLECTION = 'migrations'
+
+BATCH_SIZE = 1000
+
+
+class MigrationProgress(NamedTuple):
+    version: str
+    step: str
+    n_processed: int
+    n_updated: int
+    total: int
+    elapsed_in_s: float
+
+    @property
+    def rate(self) -> float:
+        return self.n_processed / self.elapsed_in_s if self.elapsed_in_s else 0.
+
+    def __str__(self):
+        percentage = 100. * self.n_processed / self.total if self.total else 100.
+
+        return f'{self.version}/{self.step}: {self.n_processed}/{self.total} ({percentage:.1f}%) ' \
+               f'documents processed, {self.n_updated} updated, {self.rate:.0f} docs/s'
+
+
+def log_progress(progress: MigrationProgress) -> None:
+    _logger.info(str(progress))
+
+
+def get_migrations() -> List[Tuple[str, Migration]]:
+    """
+    :return: the (version, migration) of the migration scripts of provision.migrations in order
+    """
+    versions = sorted(
+        module.name for module in pkgutil.iter_modules(provision.migrations.__path__)
+        if re.match(MIGRATION_MODULE_PATTERN, module.name)
+    )
+
+    return [
+        (version, importlib.import_module(f'{provision.migrations.__name__}.{version}').MIGRATION)
+        for version in versions
+    ]
+
+
+def get_migrations_collection() -> Collection:
+    return connection.get_db()[MIGRATIONS_COLLECTION]
+
+
+class MigrationRunner:
+
+    def __init__(self,
+                 migrations_collection: Collection,
+                 batch_size: int = BATCH_SIZE,
+                 max_docs_per_second: Optional[float] = None,
+                 progress: Callable[[MigrationProgress], None] = log_progress) -> None:
+        """
+        Applies the migrations that have not been applied yet. The documents are processed in
+        the order of their _id and the last processed _id of each step is checkpointed after every
+        bulk write, so that an interrupted migration resumes where it stopped.
+
+        :param migrations_collection: where the state of the migrations is kept
+        :param batch_size: the number of documents updated per bulk write
+        :param max_docs_per_second: throttles the processing of the documents so that the
+                                    migration of large collections does not starve the service
+        :param progress: called after every bulk write
+        """
+        self.migrations_collection = migrations_collection
+        self.batch_size = batch_size
+        self.max_docs_per_second = max_docs_per_second
+        self.progress = progress
+
+    def _get_state(self, version: str) -> Dict[str, Any]:
+        return self.migrations_collection.find_one({'_id': version}) or {}
+
+    def is_applied(self, version: str) -> bool:
+        return self._get_state(version).get('completed_at') is not None
+
+    def _checkpoint(self, version: str, step: MigrationStep, last_id: Any, n_updated: int) -> None:
+        self.migrations_collection.update_one(
+            {'_id': version},
+            {'$set': {f'checkpoints.{step.name}': {'last_id': last_id, 'n_updated': n_updated}}},
+            upsert=True
+        )
+
+    def _throttle(self, n_processed: int, started_at: float) -> None:
+        if self.max_docs_per_second:
+            delay = n_processed / self.max_docs_per_second - (time.monotonic() - started_at)
+            if delay > 0:
+                time.sleep(delay)
+
+    def apply_step(self, version: str, step: MigrationStep) -> int:
+        """
+        :param version:
+        :param step:
+        :return: the total number of updated documents, including the ones updated before a resume
+        """
+        checkpoint = self._get_state(version).get('checkpoints', {}).get(step.name, {})
+        n_updated = checkpoint.get('n_updated', 0)
+
+        query = dict(step.query)
+        if 'last_id' in checkpoint:
+            query['_id'] = {'$gt': checkpoint['last_id']}
+            _logger.info(f"Resuming {version}/{step.name} after _id {checkpoint['last_id']}")
+
+        collection = step.get_collection()
+        total = collection.count_documents(query)
+        cursor = collection.find(query, projection=step.projection).sort('_id', 1)
+
+        started_at = time.monotonic()
+        n_processed = 0
+        updates = []
+        last_id = None
+
+        def flush():
+            nonlocal n_updated, updates
+
+            if updates:
+                n_updated += collection.bulk_write(updates, ordered=False).modified_count
+                updates = []
+
+            self._checkpoint(version, step, last_id, n_updated)
+            self.progress(MigrationProgress(version, step.name, n_processed, n_updated, total,
+                                            time.monotonic() - started_at))
+            self._throttle(n_processed, started_at)
+
+        for document in cursor:
+            update = step.get_update(document)
+            if update:
+                updates.append(UpdateOne({'_id': document['_id']}, update))
+
+            n_processed += 1
+            last_id = document['_id']
+
+            if n_processed % self.batch_size == 0:
+                flush()
+
+        if n_processed % self.batch_size:
+            flush()
+
+        return n_updated
+
+    def apply(self, version: str, migration: Migration) -> None:
+        _logger.info(f'Applying {version}: {migration.description}')
+
+        self.migrations_collection.update_one(
+            {'_id': version},
+            {'$set': {'description': migration.description},
+             '$setOnInsert': {'started_at': datetime.now(timezone.utc)}},
+            upsert=True
+        )
+
+        for step in migration.steps:
+            n_updated = self.apply_step(version, step)
+            _logger.info(f'{version}/{step.name}: {n_updated} documents updated')
+
+        if migration.finalize is not None:
+            migration.finalize()
+
+        self.migrations_collection.update_one(
+            {'_id': version},
+            {'$set': {'completed_at': datetime.now(timezone.utc)}}
+        )
+
+    def run(self, migrations: List[Tuple[str, Migration]], target: Optional[str] = None) \
+            -> List[str]:
+        """
+        :param migrations: the (version, migration) to apply in order
+        :param target: the number of the last version to apply, i.e. v0001 (the latest if None)
+        :return: the applied versions
+        """
+        applied = []
+
+        for version, migration in migrations:
+            if target is not None and version.split('_')[0] > target:
+                break
+
+            if self.is_applied(version):
+                continue
+
+            self.apply(version, migration)
+            applied.append(version)
+
+        return applied
@@ -0,0 +1,67 @@
+"""
+Copyright 2020 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+from typing import Dict, Any
+
+from geofencing_service.db import AIRSPACE_VOLUME_UPPER_LIMIT, AIRSPACE_VOLUME_LOWER_LIMIT
+from geofencing_service.db.models import UASZone, distance_to_meters
+from provision.migrations import Migration, MigrationStep
+
+__author__ = "EUROCONTROL (SWIM)"
+
+
+def _get_normalized_limits_update(uas_zone: Dict[str, Any]) -> Dict[str, Any]:
+    update = {}
+
+    for index, airspace_volume in enumerate(uas_zone['geometry']):
+        uom = airspace_volume['uom_dimensions']
+        update[f'geometry.{index}.lowerLimitInM'] = distance_to_meters(
+            airspace_volume.get('lowerLimit', AIRSPACE_VOLUME_LOWER_LIMIT), uom)
+        update[f'geometry.{index}.upperLimitInM'] = distance_to_meters(
+            airspace_volume.get('upperLimit', AIRSPACE_VOLUME_UPPER_LIMIT), uom)
+
+    return {'$set': update}
+
+
+# UASZones are never updated in place so their geometry can be safely updated by position
+MIGRATION = Migration(
+    description='Adds the limits in meters to the airspace volumes of the UASZones',
+    steps=[
+        MigrationStep(
+            name='uas_zones',
+            get_collection=UASZone._get_collection,
+            query={'geometry': {'$elemMatch': {'upperLimitInM': {'$exists': False}}}},
+            projection={'geometry.uom_dimensions': 1,
+                        'geometry.lowerLimit': 1,
+                        'geometry.upperLimit': 1},
+            get_update=_get_normalized_limits_update
+        )
+    ],
+    finalize=UASZone.ensure_indexes
+)
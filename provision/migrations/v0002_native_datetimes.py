@@ -0,0 +1,116 @@
+"""
+Copyright 2020 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+import logging
+from typing import Dict, Any
+
+from geofencing_service.db.fields import parse_legacy_datetime, MinuteOfDayField, \
+    UTCDateTimeField
+from geofencing_service.db.models import UASZone, UASZonesSubscription
+from provision.migrations import Migration, MigrationStep
+
+__author__ = "EUROCONTROL (SWIM)"
+
+_logger = logging.getLogger(__name__)
+
+_datetime_field = UTCDateTimeField()
+_minute_of_day_field = MinuteOfDayField()
+
+
+def _to_datetime(value: str):
+    return _datetime_field.to_mongo(parse_legacy_datetime(value))
+
+
+def _to_minute_of_day(value: str) -> int:
+    return _minute_of_day_field.to_mongo(parse_legacy_datetime(value))
+
+
+def _convert(document: Dict[str, Any], update: Dict[str, Any], path: str, value: Any,
+             convert) -> None:
+    if not isinstance(value, str):
+        return
+
+    try:
+        update[path] = convert(value)
+    except ValueError:
+        _logger.warning(f"Skipping invalid value '{value}' of {path} of document {document['_id']}")
+
+
+def _get_uas_zone_update(uas_zone: Dict[str, Any]) -> Dict[str, Any]:
+    applicability = uas_zone.get('applicability', {})
+    update = {}
+
+    for key in ('startDateTime', 'endDateTime'):
+        _convert(uas_zone, update, f'applicability.{key}', applicability.get(key), _to_datetime)
+
+    for index, daily_period in enumerate(applicability.get('schedule', [])):
+        for key in ('startTime', 'endTime'):
+            _convert(uas_zone, update, f'applicability.schedule.{index}.{key}',
+                     daily_period.get(key), _to_minute_of_day)
+
+    return {'$set': update} if update else {}
+
+
+def _get_subscription_update(subscription: Dict[str, Any]) -> Dict[str, Any]:
+    uas_zones_filter = subscription.get('uas_zones_filter', {})
+    update = {}
+
+    for key in ('startDateTime', 'endDateTime'):
+        _convert(subscription, update, f'uas_zones_filter.{key}', uas_zones_filter.get(key),
+                 _to_datetime)
+
+    return {'$set': update} if update else {}
+
+
+MIGRATION = Migration(
+    description='Converts the datetimes stored as strings to BSON datetimes and the times of the '
+                'daily periods to minutes of the day',
+    steps=[
+        MigrationStep(
+            name='uas_zones',
+            get_collection=UASZone._get_collection,
+            query={'$or': [{'applicability.startDateTime': {'$type': 'string'}},
+                           {'applicability.endDateTime': {'$type': 'string'}},
+                           {'applicability.schedule.startTime': {'$type': 'string'}},
+                           {'applicability.schedule.endTime': {'$type': 'string'}}]},
+            projection={'applicability': 1},
+            get_update=_get_uas_zone_update
+        ),
+        MigrationStep(
+            name='uas_zones_subscriptions',
+            get_collection=UASZonesSubscription._get_collection,
+            query={'$or': [{'uas_zones_filter.startDateTime': {'$type': 'string'}},
+                           {'uas_zones_filter.endDateTime': {'$type': 'string'}}]},
+            projection={'uas_zones_filter.startDateTime': 1,
+                        'uas_zones_filter.endDateTime': 1},
+            get_update=_get_subscription_update
+        )
+    ],
+    finalize=UASZone.ensure_indexes
+)
@@ -0,0 +1,92 @@
+"""
+Copyright 2020 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+from typing import Dict, Any, List, Optional
+
+from geofencing_service.db import UAS_ZONE_TILES_PRECISION, UAS_ZONE_TILES_MAX
+from geofencing_service.db.geometry import get_polygon_geojson
+from geofencing_service.db.models import UASZone, UASZonesSubscription
+from geofencing_service.db.tiles import covering_tiles
+from provision.migrations import Migration, MigrationStep
+
+__author__ = "EUROCONTROL (SWIM)"
+
+
+def _get_tiles(airspace_volume: Dict[str, Any]) -> Optional[List[str]]:
+    return covering_tiles(polygon=get_polygon_geojson(airspace_volume['horizontal_projection']),
+                          precision=UAS_ZONE_TILES_PRECISION,
+                          max_tiles=UAS_ZONE_TILES_MAX)
+
+
+def _get_uas_zone_update(uas_zone: Dict[str, Any]) -> Dict[str, Any]:
+    update = {}
+
+    for index, airspace_volume in enumerate(uas_zone['geometry']):
+        tiles = _get_tiles(airspace_volume)
+        if tiles != airspace_volume.get('tiles'):
+            update[f'geometry.{index}.tiles'] = tiles
+
+    return {'$set': update} if update else {}
+
+
+def _get_subscription_update(subscription: Dict[str, Any]) -> Dict[str, Any]:
+    airspace_volume = subscription['uas_zones_filter']['airspaceVolume']
+    tiles = _get_tiles(airspace_volume)
+
+    if tiles == airspace_volume.get('tiles'):
+        return {}
+
+    return {'$set': {'uas_zones_filter.airspaceVolume.tiles': tiles}}
+
+
+# the tiles computed before v0003 covered the planar edges of the polygons instead of their geodesics
+# (as matched by MongoDB), so all of them are recomputed and only the ones that differ are updated
+MIGRATION = Migration(
+    description='Recomputes the tiles of the airspace volumes so that they cover the geodesic edges '
+                'of their horizontal projection',
+    steps=[
+        MigrationStep(
+            name='uas_zones',
+            get_collection=UASZone._get_collection,
+            query={'geometry.horizontal_projection': {'$exists': True}},
+            projection={'geometry.horizontal_projection': 1,
+                        'geometry.tiles': 1},
+            get_update=_get_uas_zone_update
+        ),
+        MigrationStep(
+            name='uas_zones_subscriptions',
+            get_collection=UASZonesSubscription._get_collection,
+            query={'uas_zones_filter.airspaceVolume.horizontal_projection': {'$exists': True}},
+            projection={'uas_zones_filter.airspaceVolume.horizontal_projection': 1,
+                        'uas_zones_filter.airspaceVolume.tiles': 1},
+            get_update=_get_subscription_update
+        )
+    ],
+    finalize=UASZone.ensure_indexes
+)
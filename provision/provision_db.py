@@ -44,6 +44,7 @@ from geofencing_service.db.uas_zones import create_uas_zone
 
 from geofencing_service.db.users import create_user
 from geofencing_service.endpoints.schemas.db_schemas import UASZoneSchema
+from geofencing_service.endpoints.schemas.registry import get_schema
 
 _logger = logging.getLogger(__name__)
 
@@ -87,7 +88,7 @@ if __name__ == '__main__':
 
     for uas_zone_data in uas_zones:
         try:
-            uas_zone = UASZoneSchema().load(uas_zone_data)
+            uas_zone = get_schema(UASZoneSchema).load(uas_zone_data)
         except ValidationError as e:
             _logger.error(f"Invalid UASZone: {str(e)}")
             continue
@@ -37,7 +37,7 @@ setup(
     description='Geofencing',
     author='EUROCONTROL (SWIM)',
     author_email='',
-    packages=find_packages(exclude=['tests']),
+    packages=find_packages(exclude=['tests', 'benchmarks']),
     url='https://github.com/eurocontrol-swim/geofencing-service',
     install_requires=[
     ],
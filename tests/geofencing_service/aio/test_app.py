@@ -0,0 +1,122 @@
+"""
+Copyright 2019 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+import pytest
+from connexion.json_schema import resolve_refs
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from geofencing_service.aio import endpoints
+from geofencing_service.aio.app import get_routes, HTTP_METHODS, _validated_body
+from geofencing_service.endpoints.schemas.validation import is_request_body_validated
+from geofencing_service.openapi import load_openapi_spec
+from geofencing_service.request_validation import compile_request_body_validator
+
+__author__ = "EUROCONTROL (SWIM)"
+
+BASE_PATH = '/geofencing-service/api/1.0'
+
+
+def test_get_routes__every_operation_is_routed_to_its_async_handler():
+    spec = load_openapi_spec()
+
+    operations = {
+        (operation['operationId'].rsplit('.', 1)[-1], method.upper())
+        for path_item in spec['paths'].values()
+        for method, operation in path_item.items() if method in HTTP_METHODS
+    }
+
+    routes = get_routes(spec)
+
+    assert {(route.endpoint.__name__, method)
+            for route in routes for method in route.methods if method != 'HEAD'} == operations
+    assert all(route.path.startswith(BASE_PATH) for route in routes)
+    assert all(hasattr(endpoints, name) for name, _ in operations)
+
+
+def test_get_routes__integer_path_parameters_are_converted():
+    paths = [route.path for route in get_routes(load_openapi_spec())]
+
+    assert f'{BASE_PATH}/uas_zones/tiles/{{z:int}}/{{x:int}}/{{y:int}}' in paths
+    assert f'{BASE_PATH}/uas_zones/{{uas_zone_identifier}}' in paths
+
+
+@pytest.fixture(scope='module')
+def filter_client():
+    schema = resolve_refs(load_openapi_spec())['components']['schemas']['UASZonesFilterRequest']
+
+    async def handler(request):
+        return JSONResponse({'validated': is_request_body_validated()})
+
+    app = Starlette(routes=[
+        Route('/filter', _validated_body(handler, compile_request_body_validator(schema)),
+              methods=['POST'])
+    ])
+    app.state.config = {}
+
+    return TestClient(app)
+
+
+def _make_filter_data(**airspace_volume):
+    return {
+        "airspaceVolume": {
+            "horizontalProjection": {"type": "Circle", "center": [4.3, 50.8], "radius": 100},
+            **airspace_volume
+        },
+        "startDateTime": "2020-01-01T00:00:00+00:00",
+        "endDateTime": "2020-01-02T00:00:00+00:00"
+    }
+
+
+@pytest.mark.parametrize('data', [
+    {},
+    [],
+    _make_filter_data(upperVerticalReference='invalid'),
+    {**_make_filter_data(), 'coordinatePrecision': 16},
+])
+def test_validated_body__invalid_body__returns_400(filter_client, data):
+    response = filter_client.post('/filter', json=data)
+
+    assert 400 == response.status_code
+    assert 'NOK' == response.json()['genericReply']['RequestStatus']
+
+
+def test_validated_body__invalid_json__returns_400(filter_client):
+    response = filter_client.post('/filter', data=b'not json')
+
+    assert 400 == response.status_code
+
+
+def test_validated_body__valid_body__is_handled_as_validated(filter_client):
+    response = filter_client.post('/filter', json=_make_filter_data())
+
+    assert 200 == response.status_code
+    assert {'validated': True} == response.json()
@@ -0,0 +1,75 @@
+"""
+Copyright 2019 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+import asyncio
+from unittest import mock
+
+from mongoengine import Q, connection
+
+from geofencing_service.aio import db as aio_db
+from geofencing_service.aio.db import create_motor_db, get_uas_zones
+from geofencing_service.db.models import UASZone
+from tests.geofencing_service.utils import make_uas_zone, BASILIQUE_POLYGON, \
+    make_uas_zones_filter_from_db_uas_zone
+
+__author__ = "EUROCONTROL (SWIM)"
+
+
+def _get_uas_zones_sons(uas_zone: UASZone, with_simplified_projections: bool) -> list:
+    """
+    Runs the motor query of get_uas_zones for the given UASZone and returns the raw documents
+    """
+    async def _get_uas_zones():
+        motor_db = create_motor_db({'db': connection.get_db().name})
+
+        return await get_uas_zones(motor_db,
+                                   make_uas_zones_filter_from_db_uas_zone(uas_zone),
+                                   with_simplified_projections=with_simplified_projections)
+
+    # the geospatial part of the filter is covered by the sync queries
+    with mock.patch.object(aio_db, 'get_uas_zones_query',
+                           return_value=Q(identifier=uas_zone.identifier)), \
+            mock.patch.object(UASZone, '_from_son', side_effect=UASZone._from_son) as from_son:
+        asyncio.run(_get_uas_zones())
+
+    return [call_args[0][0] for call_args in from_son.call_args_list]
+
+
+def test_get_uas_zones__simplified_projections_are_not_fetched_unless_requested(test_user):
+    uas_zone = make_uas_zone(BASILIQUE_POLYGON, user=test_user)
+    uas_zone.save()
+
+    [son] = _get_uas_zones_sons(uas_zone, with_simplified_projections=False)
+
+    assert 'simplifiedProjections' not in son['geometry'][0]
+    assert 'horizontal_projection' in son['geometry'][0]
+
+    [son] = _get_uas_zones_sons(uas_zone, with_simplified_projections=True)
+
+    assert son['geometry'][0]['simplifiedProjections']
@@ -0,0 +1,181 @@
+"""
+Copyright 2019 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+import json
+import logging
+from unittest import mock
+
+import pytest
+from prometheus_client import REGISTRY
+
+from geofencing_service.db import diagnostics
+from geofencing_service.db.diagnostics import get_query_shape, get_query_shape_id, \
+    summarize_plan, evaluate_queryset, explain, QUERY_VALUE_PLACEHOLDER
+from geofencing_service.db.models import UASZone
+from tests.geofencing_service.utils import make_uas_zone, BASILIQUE_POLYGON
+
+__author__ = "EUROCONTROL (SWIM)"
+
+EXPLAIN_OUTPUT = {
+    'queryPlanner': {
+        'winningPlan': {
+            'stage': 'FETCH',
+            'inputStage': {
+                'stage': 'OR',
+                'inputStages': [
+                    {'stage': 'IXSCAN', 'indexName': 'geometry.tiles_1'},
+                    {'stage': 'IXSCAN', 'indexName': 'region_1'},
+                ]
+            }
+        }
+    },
+    'executionStats': {
+        'nReturned': 2,
+        'totalDocsExamined': 50,
+        'totalKeysExamined': 60,
+    }
+}
+
+
+def _query(region, start_date_time):
+    return {
+        '$and': [
+            {'region': {'$in': region}},
+            {'applicability.startDateTime': {'$gte': start_date_time}},
+        ]
+    }
+
+
+def test_get_query_shape__values_are_replaced_by_placeholders():
+    assert {
+        '$and': [
+            {'applicability.startDateTime': {'$gte': QUERY_VALUE_PLACEHOLDER}},
+            {'region': {'$in': QUERY_VALUE_PLACEHOLDER}},
+        ]
+    } == get_query_shape(_query([1, 2], '2020-01-01'))
+
+
+def test_get_query_shape_id__same_shape_for_different_values():
+    assert get_query_shape_id(get_query_shape(_query([1, 2], '2020-01-01'))) == \
+        get_query_shape_id(get_query_shape(_query([3], '2021-01-01')))
+
+
+def test_get_query_shape_id__different_shapes():
+    assert get_query_shape_id(get_query_shape(_query([1, 2], '2020-01-01'))) != \
+        get_query_shape_id(get_query_shape({'region': {'$in': [1, 2]}}))
+
+
+def test_summarize_plan():
+    assert 'FETCH(OR(IXSCAN[geometry.tiles_1], IXSCAN[region_1]))' == \
+        summarize_plan(EXPLAIN_OUTPUT['queryPlanner']['winningPlan'])
+
+
+@pytest.fixture(autouse=True)
+def explained_query_shapes():
+    with mock.patch.dict(diagnostics._explained_query_shapes, clear=True):
+        yield
+
+
+@pytest.fixture
+def db_uas_zone():
+    uas_zone = make_uas_zone(BASILIQUE_POLYGON)
+    uas_zone.save()
+
+    return uas_zone
+
+
+def test_explain__explains_the_cursor_of_the_queryset():
+    queryset = UASZone.objects(region=1).only('identifier')
+
+    with mock.patch.object(type(queryset), 'explain', return_value=EXPLAIN_OUTPUT) as mock_explain:
+        assert EXPLAIN_OUTPUT == explain(queryset)
+
+    mock_explain.assert_called_once_with()
+
+
+def test_evaluate_queryset__diagnostics_disabled__query_is_not_explained(app, db_uas_zone):
+    app.config['DB_DIAGNOSTICS'] = {'ENABLED': False}
+
+    with app.app_context(), mock.patch('geofencing_service.db.diagnostics.explain') as explain:
+        assert [db_uas_zone] == evaluate_queryset(UASZone.objects(region=db_uas_zone.region))
+
+    explain.assert_not_called()
+
+
+def test_evaluate_queryset__slow_query__is_explained_logged_and_counted(app, db_uas_zone, caplog):
+    app.config['DB_DIAGNOSTICS'] = {'ENABLED': True, 'SLOW_QUERY_THRESHOLD_MS': -1}
+    queryset = UASZone.objects(region=db_uas_zone.region)
+    labels = {'collection': queryset._collection.name,
+              'shape': get_query_shape_id(get_query_shape(queryset._query))}
+
+    def sample(name):
+        return REGISTRY.get_sample_value(name, labels) or 0
+
+    docs_examined_before = sample('geofencing_db_slow_queries_docs_examined_total')
+
+    with app.app_context(), caplog.at_level(logging.WARNING), \
+            mock.patch('geofencing_service.db.diagnostics.explain', return_value=EXPLAIN_OUTPUT):
+        assert [db_uas_zone] == evaluate_queryset(queryset)
+
+    assert 'winning plan: FETCH(OR(IXSCAN[geometry.tiles_1], IXSCAN[region_1]))' in caplog.text
+    assert 'docs examined: 50, docs returned: 2' in caplog.text
+    assert docs_examined_before + 50 == sample('geofencing_db_slow_queries_docs_examined_total')
+
+
+def test_evaluate_queryset__slow_query__is_logged_with_its_shape_instead_of_its_values(
+        app, db_uas_zone, caplog
+):
+    app.config['DB_DIAGNOSTICS'] = {'ENABLED': True, 'SLOW_QUERY_THRESHOLD_MS': -1}
+    queryset = UASZone.objects(identifier=db_uas_zone.identifier)
+
+    with app.app_context(), caplog.at_level(logging.WARNING), \
+            mock.patch('geofencing_service.db.diagnostics.explain', return_value=EXPLAIN_OUTPUT):
+        evaluate_queryset(queryset)
+
+    assert json.dumps(get_query_shape(queryset._query), sort_keys=True) in caplog.text
+    assert db_uas_zone.identifier not in caplog.text
+
+
+@pytest.mark.parametrize('explain_interval_ms, expected_explain_calls', [
+    (60000, 1),
+    (0, 2),
+])
+def test_evaluate_queryset__slow_queries_of_the_same_shape__are_explained_once_per_interval(
+        app, db_uas_zone, explain_interval_ms, expected_explain_calls
+):
+    app.config['DB_DIAGNOSTICS'] = {'ENABLED': True,
+                                    'SLOW_QUERY_THRESHOLD_MS': -1,
+                                    'SLOW_QUERY_EXPLAIN_INTERVAL_MS': explain_interval_ms}
+
+    with app.app_context(), mock.patch('geofencing_service.db.diagnostics.explain',
+                                       return_value=EXPLAIN_OUTPUT) as mock_explain:
+        for region in (1, 2):
+            evaluate_queryset(UASZone.objects(region=region))
+
+    assert expected_explain_calls == mock_explain.call_count
@@ -0,0 +1,99 @@
+"""
+Copyright 2019 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+from datetime import datetime, timezone, timedelta, time
+
+import pytest
+
+from geofencing_service.db.fields import parse_legacy_datetime, to_utc_datetime, \
+    UTCDateTimeField, MinuteOfDayField, to_utc_time_of_day, END_OF_DAY
+
+__author__ = "EUROCONTROL (SWIM)"
+
+CET = timezone(timedelta(hours=1))
+
+
+def test_parse_legacy_datetime():
+    assert parse_legacy_datetime('2020,03,01,10,30,15,123456') == \
+        datetime(2020, 3, 1, 10, 30, 15, 123456, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize('value, expected', [
+    (datetime(2020, 3, 1, 10, 0, 0, 123456), datetime(2020, 3, 1, 10, 0, 0, 123000, tzinfo=timezone.utc)),
+    (datetime(2020, 3, 1, 10, 0, tzinfo=CET), datetime(2020, 3, 1, 9, 0, tzinfo=timezone.utc)),
+])
+def test_to_utc_datetime(value, expected):
+    assert to_utc_datetime(value) == expected
+    assert to_utc_datetime(value).tzinfo == timezone.utc
+
+
+@pytest.mark.parametrize('value, expected_python, expected_mongo', [
+    (datetime(2020, 3, 1, 10, 0, tzinfo=CET),
+     datetime(2020, 3, 1, 9, 0, tzinfo=timezone.utc),
+     datetime(2020, 3, 1, 9, 0)),
+    (datetime(2020, 3, 1, 9, 0),
+     datetime(2020, 3, 1, 9, 0, tzinfo=timezone.utc),
+     datetime(2020, 3, 1, 9, 0)),
+    ('2020,03,01,09,00,00,000000',
+     datetime(2020, 3, 1, 9, 0, tzinfo=timezone.utc),
+     datetime(2020, 3, 1, 9, 0)),
+    (None, None, None),
+])
+def test_utc_datetime_field(value, expected_python, expected_mongo):
+    field = UTCDateTimeField()
+
+    assert field.to_python(value) == expected_python
+    assert field.to_mongo(value) == expected_mongo
+
+
+@pytest.mark.parametrize('value, expected_python, expected_mongo', [
+    (time(10, 30, tzinfo=CET), time(9, 30, tzinfo=timezone.utc), 570),
+    (time(9, 30, 45), time(9, 30, tzinfo=timezone.utc), 570),
+    (570, time(9, 30, tzinfo=timezone.utc), 570),
+    ('2000,01,01,09,30,00,000000', time(9, 30, tzinfo=timezone.utc), 570),
+    (time(0, 30, tzinfo=CET), time(23, 30, tzinfo=timezone.utc), 1410),
+    (END_OF_DAY, END_OF_DAY, 1440),
+    (1440, END_OF_DAY, 1440),
+    (None, None, None),
+])
+def test_minute_of_day_field(value, expected_python, expected_mongo):
+    field = MinuteOfDayField()
+
+    assert field.to_python(value) == expected_python
+    assert field.to_mongo(value) == expected_mongo
+
+
+@pytest.mark.parametrize('value, expected', [
+    (time(10, 30, 45, tzinfo=CET), (time(9, 30, tzinfo=timezone.utc), 0)),
+    (time(0, 30, tzinfo=CET), (time(23, 30, tzinfo=timezone.utc), -1)),
+    (time(23, 30, tzinfo=timezone(timedelta(hours=-2))), (time(1, 30, tzinfo=timezone.utc), 1)),
+    (time(23, 30), (time(23, 30, tzinfo=timezone.utc), 0)),
+])
+def test_to_utc_time_of_day(value, expected):
+    assert expected == to_utc_time_of_day(value)
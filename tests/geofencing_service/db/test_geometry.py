@@ -0,0 +1,132 @@
+"""
+Copyright 2019 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+import pytest
+
+from geofencing_service.db.geometry import get_polygon_geojson, get_simplified_polygons, \
+    quantize_polygon, select_simplified_polygon
+from tests.geofencing_service.utils import BASILIQUE_POLYGON
+
+__author__ = "EUROCONTROL (SWIM)"
+
+
+SIMPLIFIED_BASILIQUE_POLYGON = {
+    'type': 'Polygon',
+    'coordinates': [[
+        [4.326508, 50.862792],
+        [4.317369, 50.86847],
+        [4.314826, 50.867671],
+        [4.326508, 50.862792]
+    ]]
+}
+
+
+def test_get_polygon_geojson():
+    coordinates = BASILIQUE_POLYGON['coordinates']
+
+    assert BASILIQUE_POLYGON == get_polygon_geojson(BASILIQUE_POLYGON)
+    assert BASILIQUE_POLYGON == get_polygon_geojson(coordinates)
+
+
+def test_get_simplified_polygons__simplifications_that_do_not_reduce_vertices_are_omitted():
+    result = get_simplified_polygons(BASILIQUE_POLYGON, tolerances_in_m=(10, 100, 1000))
+
+    assert ['1000'] == list(result.keys())
+
+    # the exact vertices that are kept depend on the GEOS version
+    original_vertices = BASILIQUE_POLYGON['coordinates'][0]
+    simplified_vertices = result['1000']['coordinates'][0]
+    assert 'Polygon' == result['1000']['type']
+    assert 4 <= len(simplified_vertices) < len(original_vertices)
+    assert simplified_vertices[0] == simplified_vertices[-1]
+    assert all(vertex in original_vertices for vertex in simplified_vertices)
+
+
+@pytest.mark.parametrize('tolerance_in_m, expected_polygon', [
+    (0, BASILIQUE_POLYGON),
+    (999.9, BASILIQUE_POLYGON),
+    (1000, SIMPLIFIED_BASILIQUE_POLYGON),
+    (5000, SIMPLIFIED_BASILIQUE_POLYGON),
+])
+def test_select_simplified_polygon(tolerance_in_m, expected_polygon):
+    simplified_polygons = {'1000': SIMPLIFIED_BASILIQUE_POLYGON}
+
+    assert expected_polygon == select_simplified_polygon(polygon=BASILIQUE_POLYGON,
+                                                         simplified_polygons=simplified_polygons,
+                                                         tolerance_in_m=tolerance_in_m)
+
+
+def test_select_simplified_polygon__no_simplified_polygons__returns_original():
+    assert BASILIQUE_POLYGON == select_simplified_polygon(polygon=BASILIQUE_POLYGON,
+                                                          simplified_polygons={},
+                                                          tolerance_in_m=1000)
+
+
+@pytest.mark.parametrize('precision, expected_coordinates', [
+    (
+        3,
+        [[
+            [4.329, 50.864],
+            [4.328, 50.865],
+            [4.317, 50.868],
+            [4.315, 50.868],
+            [4.316, 50.866],
+            [4.327, 50.863],
+            [4.329, 50.864]
+        ]]
+    ),
+    (
+        2,
+        [[
+            [4.33, 50.86],
+            [4.33, 50.87],
+            [4.32, 50.87],
+            [4.31, 50.87],
+            [4.32, 50.87],
+            [4.33, 50.86]
+        ]]
+    ),
+    (
+        1,
+        [[
+            [4.3, 50.9],
+            [4.3, 50.9],
+            [4.3, 50.9],
+            [4.3, 50.9],
+            [4.3, 50.9],
+            [4.3, 50.9],
+            [4.3, 50.9]
+        ]]
+    ),
+])
+def test_quantize_polygon(precision, expected_coordinates):
+    result = quantize_polygon(BASILIQUE_POLYGON, precision)
+
+    assert 'Polygon' == result['type']
+    assert expected_coordinates == result['coordinates']
@@ -27,13 +27,18 @@ http://opensource.org/licenses/BSD-3-Clause
 
 Details on EUROCONTROL: http://www.eurocontrol.int
 """
+from datetime import datetime, timezone, timedelta
+
 import pytest
 from mongoengine import DoesNotExist
 
-from geofencing_service.db.models import UASZonesSubscription
+from geofencing_service.db import IDEMPOTENCY_RECORD_LEASE_IN_SECONDS
+from geofencing_service.db.models import UASZonesSubscription, IdempotencyRecord
 from geofencing_service.db.subscriptions import get_uas_zones_subscriptions, \
     get_uas_zones_subscription_by_id, create_uas_zones_subscription, update_uas_zones_subscription,\
-    delete_uas_zones_subscription
+    delete_uas_zones_subscription, get_idempotency_record, save_idempotency_record, \
+    delete_idempotency_record, get_idempotency_record_id, insert_idempotency_record, \
+    claim_idempotency_record
 from tests.geofencing_service.utils import make_uas_zones_subscription
 
 __author__ = "EUROCONTROL (SWIM)"
@@ -86,3 +91,71 @@ def test_delete_uas_zones_subscription():
 
     with pytest.raises(DoesNotExist):
         UASZonesSubscription.objects.get(id=subscription.id)
+
+
+def test_save_idempotency_record__replaces_the_record_of_the_key(test_user):
+    record_id = get_idempotency_record_id('key', test_user)
+    save_idempotency_record(IdempotencyRecord(id=record_id, user=test_user, topic_name='topic',
+                                              sm_topic_id=1))
+    save_idempotency_record(IdempotencyRecord(id=record_id, user=test_user, topic_name='topic',
+                                              uas_zones_subscription_id='id'))
+
+    record = get_idempotency_record('key', test_user)
+    assert 1 == IdempotencyRecord.objects.count()
+    assert 'id' == record.uas_zones_subscription_id
+    assert record.sm_topic_id is None
+
+
+def test_delete_idempotency_record(test_user):
+    save_idempotency_record(IdempotencyRecord(id=get_idempotency_record_id('key', test_user),
+                                              user=test_user, topic_name='topic'))
+
+    delete_idempotency_record('key', test_user)
+
+    assert get_idempotency_record('key', test_user) is None
+
+
+def test_insert_idempotency_record__key_has_a_record__is_not_inserted(test_user):
+    record_id = get_idempotency_record_id('key', test_user)
+
+    assert insert_idempotency_record(IdempotencyRecord(id=record_id, user=test_user,
+                                                       topic_name='topic', in_progress=True))
+    assert not insert_idempotency_record(IdempotencyRecord(id=record_id, user=test_user,
+                                                           topic_name='other_topic'))
+
+    assert 'topic' == get_idempotency_record('key', test_user).topic_name
+
+
+def test_claim_idempotency_record__only_once(test_user):
+    save_idempotency_record(IdempotencyRecord(id=get_idempotency_record_id('key', test_user),
+                                              user=test_user, topic_name='topic'))
+
+    assert claim_idempotency_record('key', test_user).in_progress is True
+    assert claim_idempotency_record('key', test_user) is None
+
+
+@pytest.mark.parametrize('claimed_seconds_ago, claimed', [
+    (IDEMPOTENCY_RECORD_LEASE_IN_SECONDS - 10, False),
+    (IDEMPOTENCY_RECORD_LEASE_IN_SECONDS + 10, True),
+])
+def test_claim_idempotency_record__in_progress__only_once_its_lease_expired(
+        test_user, claimed_seconds_ago, claimed
+):
+    claimed_at = datetime.now(timezone.utc) - timedelta(seconds=claimed_seconds_ago)
+    save_idempotency_record(IdempotencyRecord(id=get_idempotency_record_id('key', test_user),
+                                              user=test_user, topic_name='topic',
+                                              in_progress=True, claimed_at=claimed_at))
+
+    record = claim_idempotency_record('key', test_user)
+
+    assert claimed == (record is not None)
+    if claimed:
+        assert record.claimed_at > claimed_at
+        assert claim_idempotency_record('key', test_user) is None
+
+
+def test_idempotency_record__expires():
+    ttl_indexes = [index for index in IdempotencyRecord._meta['index_specs']
+                   if 'expireAfterSeconds' in index]
+
+    assert [[('createdAt', 1)]] == [index['fields'] for index in ttl_indexes]
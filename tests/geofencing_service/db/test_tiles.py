@@ -0,0 +1,98 @@
+"""
+Copyright 2019 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+import pytest
+
+from geofencing_service.db.tiles import geohash_encode, covering_tiles, tiles_with_ancestors, \
+    tiles_overlap
+from tests.geofencing_service.utils import BASILIQUE_POLYGON, INTERSECTING_BASILIQUE_POLYGON
+
+__author__ = "EUROCONTROL (SWIM)"
+
+
+@pytest.mark.parametrize('lon, lat, precision, expected_geohash', [
+    (4.329385, 50.863648, 6, 'u1516e'),
+    (-5.6, 42.6, 5, 'ezs42'),
+    (0.0, 0.0, 1, 's'),
+])
+def test_geohash_encode(lon, lat, precision, expected_geohash):
+    assert expected_geohash == geohash_encode(lon, lat, precision)
+
+
+def test_covering_tiles__tiles_cover_the_polygon_vertices():
+    tiles = covering_tiles(BASILIQUE_POLYGON, precision=6, max_tiles=256)
+
+    assert all(len(tile) == 6 for tile in tiles)
+    for lon, lat in BASILIQUE_POLYGON['coordinates'][0]:
+        assert geohash_encode(lon, lat, 6) in tiles
+
+
+def test_covering_tiles__long_edge_at_high_latitude__tiles_cover_the_geodesic_edge():
+    # the geodesic of the northern edge bows ~1km north of the 60th parallel around its middle
+    polygon = {
+        'type': 'Polygon',
+        'coordinates': [[[0.0, 59.9], [2.0, 59.9], [2.0, 60.0], [0.0, 60.0], [0.0, 59.9]]]
+    }
+
+    tiles = covering_tiles(polygon, precision=6, max_tiles=100000)
+
+    assert geohash_encode(1.0, 60.005, 6) in tiles
+
+
+def test_covering_tiles__too_many_tiles__precision_is_decreased():
+    tiles = covering_tiles(BASILIQUE_POLYGON, precision=8, max_tiles=4)
+
+    assert len(tiles) <= 4
+    assert all(len(tile) < 8 for tile in tiles)
+
+
+def test_covering_tiles__min_precision_not_reachable__returns_none():
+    assert covering_tiles(BASILIQUE_POLYGON, precision=8, max_tiles=4, min_precision=8) is None
+
+
+def test_tiles_with_ancestors():
+    assert {'u', 'u1', 'u15', 'u2'} == tiles_with_ancestors(['u15', 'u2'])
+
+
+@pytest.mark.parametrize('tiles1, tiles2, expected_overlap', [
+    (['u150'], ['u150'], True),
+    (['u15'], ['u150', 'u2'], True),
+    (['u150', 'u2'], ['u15'], True),
+    (['u150'], ['u151'], False),
+    ([], ['u151'], False),
+])
+def test_tiles_overlap(tiles1, tiles2, expected_overlap):
+    assert expected_overlap == tiles_overlap(tiles1, tiles2)
+
+
+def test_tiles_overlap__intersecting_polygons():
+    tiles1 = covering_tiles(BASILIQUE_POLYGON, precision=6, max_tiles=256)
+    tiles2 = covering_tiles(INTERSECTING_BASILIQUE_POLYGON, precision=4, max_tiles=256)
+
+    assert tiles_overlap(tiles1, tiles2)
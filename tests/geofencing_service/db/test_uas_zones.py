@@ -31,8 +31,9 @@ from datetime import timedelta
 
 import pytest
 
-from geofencing_service.db.models import UASZone, UomDistance
-from geofencing_service.db.uas_zones import get_uas_zones, create_uas_zone, delete_uas_zone
+from geofencing_service.db.models import UASZone, UomDistance, distance_to_meters
+from geofencing_service.db.uas_zones import get_uas_zones, create_uas_zone, delete_uas_zone, \
+    get_uas_zones_version
 from tests.geofencing_service.utils import make_uas_zone, make_uas_zones_filter_from_db_uas_zone, \
     BASILIQUE_POLYGON, INTERSECTING_BASILIQUE_POLYGON, NON_INTERSECTING_BASILIQUE_POLYGON
 
@@ -118,6 +119,39 @@ def test_get_uas_zones__filter_by_airspace_volume__upper_lower_limit(
     assert len(result) == n_result
 
 
+@pytest.mark.parametrize('zone_uom, zone_upper, zone_lower, filter_upper, filter_lower, n_result', [
+    (UomDistance.METERS.value, 100, 10, 200, 0, 1),
+    (UomDistance.METERS.value, 100, 10, 50, 0, 0),
+    (UomDistance.FEET.value, 300, 30, 100, 0, 1),
+    (UomDistance.FEET.value, 300, 30, 50, 0, 0),
+])
+def test_get_uas_zones__filter_by_airspace_volume__limits_of_zones_saved_before_v0001(
+        db_uas_zone,
+        intersecting_filter,
+        zone_uom,
+        zone_upper,
+        zone_lower,
+        filter_upper,
+        filter_lower,
+        n_result
+):
+    db_uas_zone.geometry[0].uom_dimensions = zone_uom
+    db_uas_zone.geometry[0].upper_limit = zone_upper
+    db_uas_zone.geometry[0].lower_limit = zone_lower
+    db_uas_zone.save()
+    UASZone._get_collection().update_one(
+        {'_id': db_uas_zone.pk},
+        {'$unset': {'geometry.0.upperLimitInM': '', 'geometry.0.lowerLimitInM': ''}}
+    )
+
+    intersecting_filter.airspace_volume.uom_dimensions = UomDistance.METERS.value
+    intersecting_filter.airspace_volume.upper_limit = filter_upper
+    intersecting_filter.airspace_volume.lower_limit = filter_lower
+
+    result = get_uas_zones(intersecting_filter)
+    assert len(result) == n_result
+
+
 def test_get_uas_zones__filter_by_regions(intersecting_filter):
 
     result = get_uas_zones(intersecting_filter)
@@ -154,7 +188,41 @@ def test_create_uas_zone():
     assert uas_zone in UASZone.objects.all()
 
 
+@pytest.mark.parametrize('uom, upper_limit, lower_limit, upper_limit_in_m, lower_limit_in_m', [
+    (UomDistance.METERS.value, 100, 10, 100, 10),
+    (UomDistance.FEET.value, 1000, 100, 304.8, 30.48),
+])
+def test_create_uas_zone__limits_are_saved_in_meters(uom, upper_limit, lower_limit,
+                                                      upper_limit_in_m, lower_limit_in_m):
+    uas_zone = make_uas_zone(horizontal_projection=BASILIQUE_POLYGON)
+    uas_zone.geometry[0].uom_dimensions = uom
+    uas_zone.geometry[0].upper_limit = upper_limit
+    uas_zone.geometry[0].lower_limit = lower_limit
+
+    create_uas_zone(uas_zone)
+
+    db_airspace_volume = UASZone.objects.get(identifier=uas_zone.identifier).geometry[0]
+    assert upper_limit_in_m == pytest.approx(db_airspace_volume.upper_limit_in_m)
+    assert lower_limit_in_m == pytest.approx(db_airspace_volume.lower_limit_in_m)
+
+
+def test_distance_to_meters():
+    assert 100 == distance_to_meters(100, UomDistance.METERS.value)
+    assert 30.48 == pytest.approx(distance_to_meters(100, UomDistance.FEET.value))
+
+
 def test_delete_uas_zone(db_uas_zone):
     delete_uas_zone(db_uas_zone)
 
     assert db_uas_zone not in UASZone.objects.all()
+
+
+def test_create_delete_uas_zone__uas_zones_version_is_increased():
+    assert 0 == get_uas_zones_version()
+
+    uas_zone = make_uas_zone(horizontal_projection=BASILIQUE_POLYGON)
+    assert 1 == create_uas_zone(uas_zone)
+    assert 1 == get_uas_zones_version()
+
+    assert 2 == delete_uas_zone(uas_zone)
+    assert 2 == get_uas_zones_version()
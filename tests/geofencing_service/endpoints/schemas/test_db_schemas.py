@@ -0,0 +1,122 @@
+"""
+Copyright 2019 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+from datetime import time, timezone
+
+import pytest
+
+from marshmallow import ValidationError
+
+from geofencing_service.db.fields import END_OF_DAY
+from geofencing_service.endpoints.schemas.db_schemas import TimePeriodSchema, \
+    AirspaceVolumeSchema, DailyPeriodSchema
+
+__author__ = "EUROCONTROL (SWIM)"
+
+
+def _load_schedule(*daily_periods):
+    return TimePeriodSchema().load({
+        'permanent': 'NO',
+        'startDateTime': '2020-01-01T00:00:00Z',
+        'endDateTime': '2020-12-31T00:00:00Z',
+        'schedule': [{'day': day, 'startTime': start_time, 'endTime': end_time}
+                     for day, start_time, end_time in daily_periods]
+    })['schedule']
+
+
+def _utc(hour, minute=0):
+    return time(hour, minute, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize('daily_period, expected_schedule', [
+    (
+        ('MON', '09:00:30+02:00', '17:00:00+02:00'),
+        [{'day': 'MON', 'start_time': _utc(7), 'end_time': _utc(17 - 2)}]
+    ),
+    (
+        ('MON', '00:30:00+02:00', '01:30:00+02:00'),
+        [{'day': 'SUN', 'start_time': _utc(22, 30), 'end_time': _utc(23, 30)}]
+    ),
+    (
+        ('SUN', '23:00:00-02:00', '23:30:00-02:00'),
+        [{'day': 'MON', 'start_time': _utc(1), 'end_time': _utc(1, 30)}]
+    ),
+    (
+        ('MON', '01:00:00+02:00', '03:00:00+02:00'),
+        [{'day': 'SUN', 'start_time': _utc(23), 'end_time': END_OF_DAY},
+         {'day': 'MON', 'start_time': _utc(0), 'end_time': _utc(1)}]
+    ),
+    (
+        ('ANY', '01:00:00+02:00', '03:00:00+02:00'),
+        [{'day': 'ANY', 'start_time': _utc(23), 'end_time': END_OF_DAY},
+         {'day': 'ANY', 'start_time': _utc(0), 'end_time': _utc(1)}]
+    ),
+    (
+        ('MON', '00:30:00+01:00', '01:00:00+01:00'),
+        [{'day': 'SUN', 'start_time': _utc(23, 30), 'end_time': END_OF_DAY}]
+    ),
+    (
+        ('MON', '22:00:00+00:00', '24:00:00+00:00'),
+        [{'day': 'MON', 'start_time': _utc(22), 'end_time': END_OF_DAY}]
+    ),
+    (
+        ('MON', '00:30:00+01:00', '24:00:00Z'),
+        [{'day': 'SUN', 'start_time': _utc(23, 30), 'end_time': END_OF_DAY},
+         {'day': 'MON', 'start_time': _utc(0), 'end_time': END_OF_DAY}]
+    ),
+])
+def test_time_period_schema__schedule_is_converted_to_utc_along_with_its_days(
+        daily_period, expected_schedule
+):
+    assert expected_schedule == _load_schedule(daily_period)
+
+
+def test_daily_period_schema__end_of_day__is_dumped_as_24_00():
+    daily_period = {'day': 'MON', 'start_time': _utc(22), 'end_time': END_OF_DAY}
+
+    dumped = DailyPeriodSchema().dump(daily_period)
+
+    assert '24:00:00+00:00' == dumped['endTime']
+    assert END_OF_DAY == DailyPeriodSchema().load(dumped)['end_time']
+
+
+@pytest.mark.parametrize('end_time', ['24:00:00+02:00', '24:30:00Z'])
+def test_daily_period_schema__invalid_end_of_day__raises_validation_error(end_time):
+    with pytest.raises(ValidationError):
+        DailyPeriodSchema().load({'day': 'MON', 'startTime': '22:00:00Z', 'endTime': end_time})
+
+
+def test_airspace_volume_schema__circle_without_uom_dimensions__radius_is_in_meters():
+    airspace_volume = AirspaceVolumeSchema().load({
+        'horizontalProjection': {'type': 'Circle', 'center': [4.3, 50.8], 'radius': 100}
+    })
+
+    assert airspace_volume.uom_dimensions is None
+    assert 100 == airspace_volume.circle['radius']
+    assert 'Polygon' == airspace_volume.horizontal_projection['type']
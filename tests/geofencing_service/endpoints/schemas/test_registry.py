@@ -0,0 +1,90 @@
+"""
+Copyright 2019 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from marshmallow import Schema
+from marshmallow.fields import Nested, String, List
+
+from geofencing_service.endpoints.schemas.db_schemas import UASZoneSchema
+from geofencing_service.endpoints.schemas.registry import get_schema
+from tests.geofencing_service.utils import make_uas_zone, BASILIQUE_POLYGON
+
+__author__ = "EUROCONTROL (SWIM)"
+
+
+def _make_schema_class():
+    class InnerSchema(Schema):
+        name = String()
+
+    class OuterSchema(Schema):
+        inner = Nested(InnerSchema)
+        inners = List(Nested(InnerSchema))
+
+    return OuterSchema
+
+
+def test_get_schema__the_same_instance_is_returned():
+    schema_class = _make_schema_class()
+
+    schema = get_schema(schema_class)
+
+    assert isinstance(schema, schema_class)
+    assert schema is get_schema(schema_class)
+    assert schema is not get_schema(schema_class, many=True)
+    assert get_schema(schema_class, many=True).many is True
+
+
+def test_get_schema__nested_schemas_are_created_in_advance():
+    schema = get_schema(_make_schema_class())
+
+    assert schema.fields['inner']._schema is not None
+    assert schema.fields['inners'].inner._schema is not None
+
+
+def test_get_schema__concurrent_calls__a_single_instance_is_created():
+    schema_class = _make_schema_class()
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        schemas = list(executor.map(lambda _: get_schema(schema_class), range(64)))
+
+    assert all(schema is schemas[0] for schema in schemas)
+
+
+def test_get_schema__shared_instance_is_used_concurrently():
+    uas_zone_data = UASZoneSchema().dump(make_uas_zone(BASILIQUE_POLYGON))
+
+    def load_and_dump(_):
+        schema = get_schema(UASZoneSchema)
+        return schema.dump(schema.load(uas_zone_data))
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(load_and_dump, range(64)))
+
+    assert all(result == uas_zone_data for result in results)
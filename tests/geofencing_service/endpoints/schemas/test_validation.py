@@ -0,0 +1,70 @@
+"""
+Copyright 2019 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+import pytest
+from marshmallow import ValidationError
+
+from geofencing_service.endpoints.schemas.db_schemas import validate_horizontal_projection
+from geofencing_service.endpoints.schemas.validation import request_body_validated, \
+    is_request_body_validated
+
+__author__ = "EUROCONTROL (SWIM)"
+
+
+def test_request_body_validated__is_reset_on_exit():
+    assert is_request_body_validated() is False
+
+    with pytest.raises(ValueError):
+        with request_body_validated():
+            assert is_request_body_validated() is True
+            raise ValueError()
+
+    assert is_request_body_validated() is False
+
+
+def test_validate_horizontal_projection__request_body_validated__the_projection_is_not_loaded():
+    # positions of 3 coordinates are not accepted by the PolygonSchema
+    polygon = {'type': 'Polygon', 'coordinates': [[[1, 2, 0], [3, 4, 0], [5, 6, 0], [1, 2, 0]]]}
+
+    with pytest.raises(ValidationError):
+        validate_horizontal_projection(polygon)
+
+    with request_body_validated():
+        assert validate_horizontal_projection(polygon) is True
+
+
+def test_validate_horizontal_projection__request_body_validated__open_rings_are_rejected():
+    polygon = {'type': 'Polygon', 'coordinates': [[[1, 2], [3, 4], [5, 6], [1, 2]],
+                                                  [[1, 2], [3, 4], [5, 6], [7, 8]]]}
+
+    with request_body_validated():
+        with pytest.raises(ValidationError) as e:
+            validate_horizontal_projection(polygon)
+
+    assert {'coordinates': {1: ['Linestring is not closed.']}} == e.value.messages
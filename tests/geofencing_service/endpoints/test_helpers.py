@@ -0,0 +1,65 @@
+"""
+Copyright 2019 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+from geofencing_service.endpoints.helpers import reduce_uas_zones_geometry, \
+    get_uas_zones_subscription_reply_object
+from tests.geofencing_service.utils import make_uas_zone, make_uas_zones_subscription, \
+    BASILIQUE_POLYGON
+
+__author__ = "EUROCONTROL (SWIM)"
+
+
+def test_reduce_uas_zones_geometry__coordinate_precision__coordinates_are_rounded():
+    uas_zone = make_uas_zone(BASILIQUE_POLYGON)
+
+    [reduced_uas_zone] = reduce_uas_zones_geometry([uas_zone], coordinate_precision=2)
+
+    for ring in reduced_uas_zone.geometry[0].horizontal_projection['coordinates']:
+        for lon, lat in ring:
+            assert round(lon, 2) == lon
+            assert round(lat, 2) == lat
+
+
+def test_reduce_uas_zones_geometry__no_reduction__geometry_is_unchanged():
+    uas_zone = make_uas_zone(BASILIQUE_POLYGON)
+
+    [reduced_uas_zone] = reduce_uas_zones_geometry([uas_zone])
+
+    assert BASILIQUE_POLYGON == reduced_uas_zone.geometry[0].horizontal_projection
+
+
+def test_get_uas_zones_subscription_reply_object():
+    uas_zones_subscription = make_uas_zones_subscription()
+
+    reply_object = get_uas_zones_subscription_reply_object(uas_zones_subscription)
+
+    assert uas_zones_subscription.id == reply_object.subscription_id
+    assert uas_zones_subscription.sm_subscription.queue == reply_object.publication_location
+    assert uas_zones_subscription.sm_subscription.active == reply_object.active
+    assert uas_zones_subscription.uas_zones_filter == reply_object.uas_zones_filter
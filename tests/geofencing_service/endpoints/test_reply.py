@@ -0,0 +1,110 @@
+"""
+Copyright 2019 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+import json
+
+import pytest
+from flask import Response
+from prometheus_client import REGISTRY
+
+from geofencing_service.encoding import deserialize, decompress, MSGPACK_MIMETYPE, \
+    CBOR_MIMETYPE, JSON_MIMETYPE
+from geofencing_service.endpoints.reply import handle_response, compress_response, Reply
+from geofencing_service.endpoints.schemas.reply_schemas import ReplySchema
+
+__author__ = "EUROCONTROL (SWIM)"
+
+
+@handle_response(ReplySchema)
+def _endpoint():
+    return Reply(), 200
+
+
+def test_handle_response__no_accept_header__returns_dumped_reply(app):
+    with app.test_request_context():
+        data, status_code = _endpoint()
+
+    assert 200 == status_code
+    assert 'OK' == data['genericReply']['RequestStatus']
+
+
+@pytest.mark.parametrize('mimetype', [MSGPACK_MIMETYPE, CBOR_MIMETYPE])
+def test_handle_response__binary_mimetype_is_accepted__returns_serialized_reply(app, mimetype):
+    with app.test_request_context(headers={'Accept': mimetype}):
+        response = _endpoint()
+
+    assert 200 == response.status_code
+    assert mimetype == response.mimetype
+    assert 'OK' == deserialize(response.get_data(), mimetype)['genericReply']['RequestStatus']
+
+
+@pytest.mark.parametrize('accept_encoding, expected_encoding', [
+    ('gzip', 'gzip'),
+    ('br', 'br'),
+    ('gzip, br', 'br'),
+    ('gzip;q=1.0, br;q=0.5', 'gzip'),
+])
+def test_compress_response__large_response__is_compressed(app, accept_encoding,
+                                                          expected_encoding):
+    data = json.dumps({'data': ['value'] * 1000})
+
+    with app.test_request_context(headers={'Accept-Encoding': accept_encoding}):
+        response = compress_response(Response(data, mimetype=JSON_MIMETYPE))
+
+    assert expected_encoding == response.headers['Content-Encoding']
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert data.encode('utf-8') == decompress(response.get_data(), expected_encoding)
+
+
+@pytest.mark.parametrize('data, accept_encoding', [
+    (json.dumps({'data': ['value'] * 1000}), None),
+    (json.dumps({'data': ['value'] * 1000}), 'identity'),
+    (json.dumps({'data': 'value'}), 'gzip'),
+])
+def test_compress_response__response_is_not_compressed(app, data, accept_encoding):
+    headers = {'Accept-Encoding': accept_encoding} if accept_encoding else {}
+
+    with app.test_request_context(headers=headers):
+        response = compress_response(Response(data, mimetype=JSON_MIMETYPE))
+
+    assert 'Content-Encoding' not in response.headers
+    assert data.encode('utf-8') == response.get_data()
+
+
+def test_handle_response__request_is_counted_by_operation_and_status(app):
+    def requests_count():
+        return REGISTRY.get_sample_value('geofencing_requests_total',
+                                         {'operation': '_endpoint', 'status': '200'}) or 0
+
+    before = requests_count()
+
+    with app.test_request_context():
+        _endpoint()
+
+    assert before + 1 == requests_count()
@@ -33,12 +33,14 @@ from unittest.mock import Mock
 
 import pytest
 from mongoengine import DoesNotExist
+from subscription_manager_client.subscription_manager import SubscriptionManagerClient
 
 from geofencing_service import BASE_PATH
-from geofencing_service.db.models import UASZonesSubscription
+from geofencing_service.db.models import UASZonesSubscription, IdempotencyRecord
+from geofencing_service.db.subscriptions import get_idempotency_record_id
 from geofencing_service.endpoints.schemas.db_schemas import UASZonesFilterSchema
 from geofencing_service.events.uas_zones_subscription_handlers import \
-    UASZonesSubscriptionCreateContext
+    UASZonesSubscriptionCreateContext, get_topic_name
 from tests.conftest import DEFAULT_LOGIN_PASS
 from tests.geofencing_service.utils import make_basic_auth_header, make_uas_zones_subscription
 
@@ -102,6 +104,96 @@ def test_create_subscription_to_uas_zones_updates__valid_input__returns_ok_and_c
                response_data['publicationLocation']
 
 
+def _make_subscription_request_data():
+    return {
+        "airspaceVolume": {
+            "lowerLimit": 0,
+            "lowerVerticalReference": "AMSL",
+            "horizontalProjection": {
+                "type": "Polygon",
+                "coordinates": [[[1.0, 2.0], [3.0, 4.0], [5.0, 6.0], [1.0, 2.0]]]
+            },
+            "upperLimit": 0,
+            "upperVerticalReference": "AMSL"
+        },
+        "endDateTime": "2019-11-05T13:10:39.315Z",
+        "regions": [0],
+        "startDateTime": "2019-11-05T13:10:39.315Z"
+    }
+
+
+def _save_idempotency_record(user, data, key):
+    context = UASZonesSubscriptionCreateContext(
+        uas_zones_filter=UASZonesFilterSchema().load(data), user=user)
+    get_topic_name(context)
+
+    subscription = make_uas_zones_subscription(user=user)
+    subscription.save()
+
+    IdempotencyRecord(id=get_idempotency_record_id(key, user), user=user,
+                      topic_name=context.topic_name,
+                      uas_zones_subscription_id=subscription.id).save()
+
+    return subscription
+
+
+def test_create_subscription_to_uas_zones_updates__retry_with_idempotency_key__returns_the_created_subscription_201(
+        test_client, test_user
+):
+    data = _make_subscription_request_data()
+    subscription = _save_idempotency_record(test_user, data, key='key')
+
+    with mock.patch('geofencing_service.events.events.create_uas_zones_subscription_event.handle') \
+            as mock_handle:
+        response = test_client.post(URL, data=json.dumps(data), content_type='application/json',
+                                    headers={'Idempotency-Key': 'key',
+                                             **make_basic_auth_header(test_user.username,
+                                                                      DEFAULT_LOGIN_PASS)})
+
+    mock_handle.assert_not_called()
+    assert 201 == response.status_code
+    response_data = json.loads(response.data)
+    assert subscription.id == response_data['subscriptionID']
+    assert subscription.sm_subscription.queue == response_data['publicationLocation']
+
+
+def test_create_subscription_to_uas_zones_updates__creation_with_idempotency_key_in_progress__returns_nok_409(
+        test_client, test_user
+):
+    data = _make_subscription_request_data()
+    context = UASZonesSubscriptionCreateContext(
+        uas_zones_filter=UASZonesFilterSchema().load(data), user=test_user)
+    get_topic_name(context)
+    IdempotencyRecord(id=get_idempotency_record_id('key', test_user), user=test_user,
+                      topic_name=context.topic_name, in_progress=True).save()
+
+    response = test_client.post(URL, data=json.dumps(data), content_type='application/json',
+                                headers={'Idempotency-Key': 'key',
+                                         **make_basic_auth_header(test_user.username,
+                                                                  DEFAULT_LOGIN_PASS)})
+
+    assert 409 == response.status_code
+    response_data = json.loads(response.data)
+    assert "NOK" == response_data['genericReply']['RequestStatus']
+
+
+def test_create_subscription_to_uas_zones_updates__idempotency_key_used_with_other_filter__returns_nok_400(
+        test_client, test_user
+):
+    data = _make_subscription_request_data()
+    _save_idempotency_record(test_user, data, key='key')
+    data['regions'] = [1]
+
+    response = test_client.post(URL, data=json.dumps(data), content_type='application/json',
+                                headers={'Idempotency-Key': 'key',
+                                         **make_basic_auth_header(test_user.username,
+                                                                  DEFAULT_LOGIN_PASS)})
+
+    assert 400 == response.status_code
+    response_data = json.loads(response.data)
+    assert "NOK" == response_data['genericReply']['RequestStatus']
+
+
 def test_update_subscription_to_uas_zones_updates__invalid_user__returns_nok_401(test_client):
     uas_zones_subscription = make_uas_zones_subscription()
     uas_zones_subscription.save()
@@ -274,7 +366,8 @@ def test_update_subscription_to_uas_zones_updates__invalid_data__returns_nok_400
     assert "NOK" == response_data['genericReply']['RequestStatus']
 
 
-@mock.patch('geofencing_service.events.uas_zones_subscription_handlers.sm_client')
+@mock.patch('geofencing_service.events.uas_zones_subscription_handlers.sm_client',
+            spec_set=SubscriptionManagerClient)
 def test_update_subscription_to_uas_zones_updates__is_updated__returns_ok_200(mock_sm_client,
                                                                               test_client,
                                                                               test_user):
@@ -334,7 +427,8 @@ def test_delete_subscription_to_uas_zones_updates__invalid_subscription_id__retu
            response_data['genericReply']["RequestExceptionDescription"]
 
 
-@mock.patch('geofencing_service.events.uas_zones_subscription_handlers.sm_client')
+@mock.patch('geofencing_service.events.uas_zones_subscription_handlers.sm_client',
+            spec_set=SubscriptionManagerClient)
 def test_delete_subscription_to_uas_zones_updates__is_deleted__returns_ok_204(mock_sm_client,
                                                                               test_client,
                                                                               test_user):
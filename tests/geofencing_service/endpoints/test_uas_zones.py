@@ -32,6 +32,7 @@ from datetime import timedelta
 from typing import Dict, Any, Tuple
 from unittest import mock
 
+import mapbox_vector_tile
 import pytest
 
 from geofencing_service import BASE_PATH
@@ -48,6 +49,7 @@ __author__ = "EUROCONTROL (SWIM)"
 
 URL_UAS_ZONES_FILTER = f'{BASE_PATH}/uas_zones/filter/'
 URL_UAS_ZONES = f'{BASE_PATH}/uas_zones/'
+URL_UAS_ZONES_TILES = f'{BASE_PATH}/uas_zones/tiles/'
 
 
 @pytest.fixture
@@ -599,6 +601,89 @@ def test_get_uas_zones__filter_by_airspace_volume__polygon__response_is_serializ
     assert expected_uas_zones == response_data['UASZoneList']
 
 
+def _assert_reduced_ring(ring, original_ring, simplified, coordinate_precision=None):
+    """
+    Checks the properties of a reduced ring instead of its exact vertices, which depend on the GEOS
+    version
+    """
+    def round_vertex(vertex):
+        if coordinate_precision is None:
+            return vertex
+        return [round(coordinate, coordinate_precision) for coordinate in vertex]
+
+    assert ring[0] == ring[-1]
+    assert all(vertex in [round_vertex(original) for original in original_ring]
+               for vertex in ring)
+
+    if simplified:
+        assert 4 <= len(ring) < len(original_ring)
+    else:
+        assert len(original_ring) == len(ring)
+
+    if coordinate_precision is not None:
+        assert all(round(coordinate, coordinate_precision) == coordinate
+                   for vertex in ring for coordinate in vertex)
+
+
+@pytest.mark.parametrize('filter_options, simplified', [
+    ({'simplifyToleranceMeters': 10}, False),
+    ({'simplifyToleranceMeters': 1000}, True),
+    ({'coordinatePrecision': 3}, False),
+    ({'simplifyToleranceMeters': 1000, 'coordinatePrecision': 2}, True),
+])
+def test_get_uas_zones__with_filter_options__returns_reduced_horizontal_projections(
+        test_client, test_user, db_uas_zone_basilique, filter_with_intersecting_airspace_volume,
+        filter_options, simplified):
+    filter_data = UASZonesFilterSchema().dump(filter_with_intersecting_airspace_volume)
+    filter_data.update(filter_options)
+
+    response_data, status_code = _post_uas_zones_filter(test_client, test_user, filter_data)
+
+    assert 200 == status_code
+    assert 1 == len(response_data['UASZoneList'])
+    horizontal_projection = response_data['UASZoneList'][0]['geometry'][0]['horizontalProjection']
+    assert 1 == len(horizontal_projection['coordinates'])
+    _assert_reduced_ring(horizontal_projection['coordinates'][0],
+                         original_ring=BASILIQUE_POLYGON['coordinates'][0],
+                         simplified=simplified,
+                         coordinate_precision=filter_options.get('coordinatePrecision'))
+
+
+def test_get_uas_zones__with_coordinate_precision__returns_rounded_horizontal_projections(
+        test_client, test_user, db_uas_zone_basilique, filter_with_intersecting_airspace_volume):
+    filter_data = UASZonesFilterSchema().dump(filter_with_intersecting_airspace_volume)
+    filter_data['coordinatePrecision'] = 3
+
+    response_data, status_code = _post_uas_zones_filter(test_client, test_user, filter_data)
+
+    assert 200 == status_code
+    horizontal_projection = response_data['UASZoneList'][0]['geometry'][0]['horizontalProjection']
+    assert [[
+        [4.329, 50.864],
+        [4.328, 50.865],
+        [4.317, 50.868],
+        [4.315, 50.868],
+        [4.316, 50.866],
+        [4.327, 50.863],
+        [4.329, 50.864]
+    ]] == horizontal_projection['coordinates']
+
+
+@pytest.mark.parametrize('filter_options', [
+    {'simplifyToleranceMeters': -1},
+    {'coordinatePrecision': -1},
+    {'coordinatePrecision': 16},
+])
+def test_get_uas_zones__invalid_filter_options__returns_nok__400(
+        test_client, test_user, filter_with_intersecting_airspace_volume, filter_options):
+    filter_data = UASZonesFilterSchema().dump(filter_with_intersecting_airspace_volume)
+    filter_data.update(filter_options)
+
+    _, status_code = _post_uas_zones_filter(test_client, test_user, filter_data)
+
+    assert 400 == status_code
+
+
 def test_create_uas_zone___invalid_user__returns_nok__401(test_client):
 
     response = test_client.post(URL_UAS_ZONES, headers=make_basic_auth_header('fake_username',
@@ -873,3 +958,44 @@ def test_delete_uas_zone___valid_identifier__uas_zone_is_deleted__returns_ok__20
     assert 204 == response.status_code
 
     assert get_uas_zones_by_identifier(db_uas_zone_basilique.identifier) is None
+
+
+def test_get_uas_zones_vector_tile__invalid_user__returns_nok__401(test_client):
+
+    response = test_client.get(URL_UAS_ZONES_TILES + '14/8388/5494',
+                               headers=make_basic_auth_header('fake_username', 'fake_password'))
+
+    assert 401 == response.status_code
+
+
+def test_get_uas_zones_vector_tile__invalid_tile__returns_nok__400(test_client, test_user):
+
+    response = test_client.get(URL_UAS_ZONES_TILES + '2/4/0',
+                               headers=make_basic_auth_header(test_user.username,
+                                                              DEFAULT_LOGIN_PASS))
+
+    assert 400 == response.status_code
+    response_data = json.loads(response.data)
+    assert "NOK" == response_data['genericReply']['RequestStatus']
+    assert "Invalid tile 2/4/0" == response_data['genericReply']["RequestExceptionDescription"]
+
+
+@pytest.mark.parametrize('tile, n_features', [
+    ('14/8388/5494', 1),
+    ('14/8392/5494', 0),
+])
+def test_get_uas_zones_vector_tile__returns_the_uas_zones_of_the_tile__200(
+        test_client, test_user, db_uas_zone_basilique, tile, n_features):
+
+    response = test_client.get(URL_UAS_ZONES_TILES + tile,
+                               headers=make_basic_auth_header(test_user.username,
+                                                              DEFAULT_LOGIN_PASS))
+
+    assert 200 == response.status_code
+    assert 'application/vnd.mapbox-vector-tile' == response.mimetype
+
+    features = mapbox_vector_tile.decode(response.data)['uas_zones']['features']
+    assert n_features == len(features)
+    if n_features:
+        assert db_uas_zone_basilique.identifier == features[0]['properties']['identifier']
+        assert db_uas_zone_basilique.restriction == features[0]['properties']['restriction']
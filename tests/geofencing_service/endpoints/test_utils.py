@@ -32,9 +32,13 @@ Details on EUROCONTROL: http://www.eurocontrol.int
 
 __author__ = "EUROCONTROL (SWIM)"
 
+from datetime import datetime, time, timezone, timedelta
+
 import pytest
 
-from geofencing_service.endpoints.utils import is_valid_duration_format
+from geofencing_service.endpoints.schemas.db_schemas import UTCAwareDateTime, AwareTime
+from geofencing_service.endpoints.utils import is_valid_duration_format, \
+    parse_strict_iso_datetime, parse_strict_iso_time
 
 
 @pytest.mark.parametrize('iso_duration, is_valid', [
@@ -60,3 +64,64 @@ from geofencing_service.endpoints.utils import is_valid_duration_format
 ])
 def test_is_valid_duration_format(iso_duration, is_valid):
     assert is_valid_duration_format(iso_duration) == is_valid
+
+
+@pytest.mark.parametrize('value, expected_datetime', [
+    ('2020-01-01T09:00:00', datetime(2020, 1, 1, 9, tzinfo=timezone.utc)),
+    ('2020-01-01T09:00:00Z', datetime(2020, 1, 1, 9, tzinfo=timezone.utc)),
+    ('2020-01-01T09:00:00.123Z', datetime(2020, 1, 1, 9, 0, 0, 123000, tzinfo=timezone.utc)),
+    ('2020-01-01T09:00:00.123456+02:00',
+     datetime(2020, 1, 1, 9, 0, 0, 123456, tzinfo=timezone(timedelta(hours=2)))),
+    # left to the lenient parsers
+    ('2020-01-01T09:00:00.1Z', None),
+    ('2020-01-01T09:00:00+0200', None),
+    ('2020-01-01 09:00:00', None),
+    ('2020-01-01', None),
+    ('2020-13-01T09:00:00', None),
+    ('invalid', None),
+])
+def test_parse_strict_iso_datetime(value, expected_datetime):
+    result = parse_strict_iso_datetime(value)
+
+    assert expected_datetime == result
+    if result is not None:
+        assert expected_datetime.utcoffset() == result.utcoffset()
+
+
+@pytest.mark.parametrize('value, expected_time', [
+    ('09:00:00', time(9, tzinfo=timezone.utc)),
+    ('09:00:00Z', time(9, tzinfo=timezone.utc)),
+    ('09:00:00.123+02:00', time(9, 0, 0, 123000, tzinfo=timezone(timedelta(hours=2)))),
+    # left to the lenient parsers
+    ('09:00', None),
+    ('25:00:00', None),
+    ('invalid', None),
+])
+def test_parse_strict_iso_time(value, expected_time):
+    assert expected_time == parse_strict_iso_time(value)
+
+
+@pytest.mark.parametrize('value', [
+    '2020-01-01T09:00:00.123Z',
+    '2020-01-01T09:00:00.1+02:00',
+    '2020-01-01T09:00:00+0200',
+    '2020-01-01 09:00',
+    '2020-01-01T09:00:00',
+])
+def test_utc_aware_datetime__strict_and_lenient_forms_are_loaded_alike(value):
+    field = UTCAwareDateTime()
+
+    assert field.deserialize(value) == super(UTCAwareDateTime, field)._deserialize(value, None,
+                                                                                  None)
+
+
+@pytest.mark.parametrize('value, expected_time', [
+    ('09:00:00+02:00', time(9, tzinfo=timezone(timedelta(hours=2)))),
+    ('09:00+02:00', time(9, tzinfo=timezone(timedelta(hours=2)))),
+    ('09:00:00', time(9, tzinfo=timezone.utc)),
+])
+def test_aware_time__strict_and_lenient_forms(value, expected_time):
+    result = AwareTime().deserialize(value)
+
+    assert expected_time == result
+    assert expected_time.utcoffset() == result.utcoffset()
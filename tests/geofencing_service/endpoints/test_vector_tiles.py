@@ -0,0 +1,78 @@
+"""
+Copyright 2019 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+import mapbox_vector_tile
+import pytest
+
+from geofencing_service.endpoints.vector_tiles import is_valid_tile, tile_bounds, \
+    render_vector_tile
+from tests.geofencing_service.utils import make_uas_zone, BASILIQUE_POLYGON
+
+__author__ = "EUROCONTROL (SWIM)"
+
+
+@pytest.mark.parametrize('z, x, y, is_valid', [
+    (0, 0, 0, True),
+    (2, 3, 3, True),
+    (2, 4, 0, False),
+    (2, 0, 4, False),
+    (-1, 0, 0, False),
+    (23, 0, 0, False),
+])
+def test_is_valid_tile(z, x, y, is_valid):
+    assert is_valid == is_valid_tile(z, x, y)
+
+
+def test_tile_bounds():
+    min_lon, min_lat, max_lon, max_lat = tile_bounds(1, 1, 0)
+
+    assert (0.0, 0.0, 180.0) == (min_lon, min_lat, max_lon)
+    assert max_lat == pytest.approx(85.0511287798066)
+
+
+def test_render_vector_tile__uas_zone_is_clipped_within_the_tile():
+    uas_zone = make_uas_zone(BASILIQUE_POLYGON)
+
+    tile = mapbox_vector_tile.decode(render_vector_tile([uas_zone], 14, 8388, 5494))
+
+    features = tile['uas_zones']['features']
+    assert 1 == len(features)
+    assert uas_zone.identifier == features[0]['properties']['identifier']
+    assert uas_zone.type == features[0]['properties']['type']
+    for x, y in features[0]['geometry']['coordinates'][0]:
+        assert -64 <= x <= 4096 + 64
+        assert -64 <= y <= 4096 + 64
+
+
+def test_render_vector_tile__uas_zone_out_of_tile__is_not_rendered():
+    uas_zone = make_uas_zone(BASILIQUE_POLYGON)
+
+    tile = mapbox_vector_tile.decode(render_vector_tile([uas_zone], 14, 0, 0))
+
+    assert [] == tile['uas_zones']['features']
@@ -0,0 +1,142 @@
+"""
+Copyright 2019 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+import pytest
+
+from geofencing_service.encoding import JSON_MIMETYPE, MSGPACK_MIMETYPE, CBOR_MIMETYPE, \
+    GZIP_ENCODING, BROTLI_ENCODING, deserialize, decompress
+from geofencing_service.endpoints.schemas.db_schemas import UASZoneSchema
+from geofencing_service.events.broker_message_producers import \
+    uas_zones_updates_message_producer, UASZonesUpdatesMessageProducerContext, \
+    UASZonesUpdatesMessageType
+from tests.geofencing_service.utils import make_uas_zone, BASILIQUE_POLYGON
+
+__author__ = "EUROCONTROL (SWIM)"
+
+
+@pytest.fixture
+def uas_zone():
+    return make_uas_zone(BASILIQUE_POLYGON)
+
+
+def test_uas_zones_updates_message_producer__default__json_message(uas_zone):
+    context = UASZonesUpdatesMessageProducerContext(
+        message_type=UASZonesUpdatesMessageType.UAS_ZONE_CREATION,
+        uas_zone=uas_zone
+    )
+
+    message = uas_zones_updates_message_producer(context)
+
+    assert JSON_MIMETYPE == message.content_type
+    assert {
+        'uas_zone': UASZoneSchema().dump(uas_zone),
+        'message_type': UASZonesUpdatesMessageType.UAS_ZONE_CREATION.value
+    } == message.body
+
+
+@pytest.mark.parametrize('content_type, content_encoding', [
+    (JSON_MIMETYPE, GZIP_ENCODING),
+    (MSGPACK_MIMETYPE, None),
+    (MSGPACK_MIMETYPE, BROTLI_ENCODING),
+    (CBOR_MIMETYPE, None),
+    (CBOR_MIMETYPE, GZIP_ENCODING),
+])
+def test_uas_zones_updates_message_producer__binary_message(uas_zone, content_type,
+                                                            content_encoding):
+    context = UASZonesUpdatesMessageProducerContext(
+        message_type=UASZonesUpdatesMessageType.UAS_ZONE_DELETION,
+        uas_zone=uas_zone,
+        content_type=content_type,
+        content_encoding=content_encoding
+    )
+
+    message = uas_zones_updates_message_producer(context)
+
+    assert content_type == message.content_type
+
+    data = message.body
+    if content_encoding is not None:
+        assert content_encoding == message.content_encoding
+        data = decompress(data, content_encoding)
+
+    assert {
+        'uas_zone_identifier': uas_zone.identifier,
+        'message_type': UASZonesUpdatesMessageType.UAS_ZONE_DELETION.value
+    } == deserialize(data, content_type)
+
+
+def test_uas_zones_updates_message_producer__delta__creation(uas_zone):
+    context = UASZonesUpdatesMessageProducerContext(
+        message_type=UASZonesUpdatesMessageType.UAS_ZONE_CREATION,
+        uas_zone=uas_zone,
+        uas_zones_version=3,
+        delta=True
+    )
+
+    message = uas_zones_updates_message_producer(context)
+
+    assert uas_zone.identifier == message.body['uas_zone_identifier']
+    assert 3 == message.body['uas_zones_version']
+    assert UASZonesUpdatesMessageType.UAS_ZONE_CREATION.value == message.body['message_type']
+    assert {key: value for key, value in UASZoneSchema().dump(uas_zone).items()
+            if value not in (None, '', [], {})} == message.body['diff']
+
+
+def test_uas_zones_updates_message_producer__delta__creation__empty_fields_are_left_out(uas_zone):
+    uas_zone.restriction_conditions = []
+    uas_zone.extended_properties = {}
+    uas_zone.other_reason_info = ''
+    context = UASZonesUpdatesMessageProducerContext(
+        message_type=UASZonesUpdatesMessageType.UAS_ZONE_CREATION,
+        uas_zone=uas_zone,
+        delta=True
+    )
+
+    diff = uas_zones_updates_message_producer(context).body['diff']
+
+    assert {'restrictionConditions', 'extendedProperties', 'otherReasonInfo'}.isdisjoint(diff)
+    assert uas_zone.identifier == diff['identifier']
+
+
+def test_uas_zones_updates_message_producer__delta__deletion(uas_zone):
+    context = UASZonesUpdatesMessageProducerContext(
+        message_type=UASZonesUpdatesMessageType.UAS_ZONE_DELETION,
+        uas_zone=uas_zone,
+        uas_zones_version=4,
+        delta=True
+    )
+
+    message = uas_zones_updates_message_producer(context)
+
+    assert {
+        'uas_zone_identifier': uas_zone.identifier,
+        'uas_zones_version': 4,
+        'diff': {},
+        'message_type': UASZonesUpdatesMessageType.UAS_ZONE_DELETION.value
+    } == message.body
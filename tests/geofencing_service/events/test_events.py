@@ -0,0 +1,250 @@
+"""
+Copyright 2019 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+import threading
+import time
+from unittest import mock
+
+import pytest
+from flask import current_app
+from prometheus_client import REGISTRY
+
+from geofencing_service.events.events import Event
+from tests.geofencing_service.utils import event_handlers_time_budget
+
+__author__ = "EUROCONTROL (SWIM)"
+
+
+def _handler_observations(event_name: str, handler_name: str) -> float:
+    return REGISTRY.get_sample_value('geofencing_event_handler_duration_seconds_count',
+                                     {'event': event_name, 'handler': handler_name}) or 0
+
+
+def test_event_handle__handlers_are_called_in_order_and_timed():
+    def first_handler(context):
+        context.append('first')
+
+    def second_handler(context):
+        context.append('second')
+
+    event = Event([first_handler, second_handler], name='test_event')
+
+    context = event.handle([])
+
+    assert ['first', 'second'] == context
+    assert 1 == _handler_observations('test_event', 'first_handler')
+    assert 1 == _handler_observations('test_event', 'second_handler')
+
+
+def test_event_handle__handlers_within_budget():
+    def fast_handler(context):
+        pass
+
+    with event_handlers_time_budget({'fast_handler': 100}) as event_traces:
+        Event([fast_handler], name='test_event').handle(None)
+
+    assert ['fast_handler'] == [span.name for span in event_traces[0].handler_spans]
+
+
+def test_event_handle__handler_exceeds_budget__assertion_error():
+    def slow_handler(context):
+        time.sleep(0.01)
+
+    with pytest.raises(AssertionError, match='test_event.slow_handler'):
+        with event_handlers_time_budget({}, default_budget_in_ms=1):
+            Event([slow_handler], name='test_event').handle(None)
+
+
+class _Context:
+    def __init__(self):
+        self.a = None
+        self.b = None
+
+
+def _make_concurrent_handlers(barrier):
+    def set_a(context):
+        barrier.wait()
+        context.a = 'a'
+
+    def set_b(context):
+        barrier.wait()
+        context.b = 'b'
+
+    return set_a, set_b
+
+
+def test_event_handle__independent_handlers_run_concurrently_and_their_contexts_are_merged():
+    # both handlers have to be running at the same time in order to pass the barrier
+    set_a, set_b = _make_concurrent_handlers(threading.Barrier(2, timeout=5))
+
+    def join_a_b(context):
+        context.a_b = context.a + context.b
+
+    event = Event([set_a, set_b, join_a_b], name='test_event', dependencies={
+        join_a_b: [set_a, set_b]
+    })
+
+    context = event.handle(_Context())
+
+    assert 'ab' == context.a_b
+    assert 1 == _handler_observations('test_event', 'join_a_b')
+
+
+def test_event_handle__handlers_run_in_the_app_context(app):
+    app_names = []
+
+    def get_app_name(context):
+        app_names.append(current_app.name)
+
+    Event([get_app_name, get_app_name], name='test_event', dependencies={}).handle(_Context())
+
+    assert [app.name, app.name] == app_names
+
+
+def test_event_handle__no_workers__handlers_run_in_sequence(app):
+    thread_names = []
+
+    def get_thread_name(context):
+        thread_names.append(threading.current_thread().name)
+
+    event = Event([get_thread_name, get_thread_name], name='test_event', dependencies={})
+
+    with mock.patch.dict(app.config, {'EVENTS': {'HANDLERS_MAX_WORKERS': 0}}):
+        event.handle(_Context())
+
+    assert [threading.current_thread().name] * 2 == thread_names
+
+
+def test_event_handle__handler_fails__dependent_handlers_are_not_called_and_error_is_raised():
+    set_a, _ = _make_concurrent_handlers(threading.Barrier(1))
+    dependent_handler = mock.Mock()
+
+    def fail(context):
+        raise ValueError('failed')
+
+    event = Event([set_a, fail, dependent_handler], name='test_event', dependencies={
+        dependent_handler: [fail]
+    })
+    context = _Context()
+
+    with pytest.raises(ValueError, match='failed'):
+        event.handle(context)
+
+    dependent_handler.assert_not_called()
+    assert 'a' == context.a
+
+
+def test_event_handle__concurrent_handlers_set_the_same_attribute__runtime_error():
+    barrier = threading.Barrier(2, timeout=5)
+
+    def set_a(context):
+        barrier.wait()
+        context.a = threading.current_thread().name
+
+    with pytest.raises(RuntimeError, match="'a'"):
+        Event([set_a, set_a], name='test_event', dependencies={}).handle(_Context())
+
+
+def test_event__dependency_is_not_a_previous_handler__value_error():
+    def first(context):
+        pass
+
+    def second(context):
+        pass
+
+    with pytest.raises(ValueError):
+        Event([first, second], dependencies={first: [second]})
+
+
+def test_event__compensated_handler_is_not_a_handler__value_error():
+    def first(context):
+        pass
+
+    with pytest.raises(ValueError):
+        Event([first], compensations={mock.Mock(): first})
+
+
+def _make_compensated_handlers(calls):
+    def first(context):
+        calls.append('first')
+
+    def second(context):
+        calls.append('second')
+
+    def fail(context):
+        raise ValueError('failed')
+
+    def undo_first(context):
+        calls.append('undo_first')
+
+    def undo_second(context):
+        calls.append('undo_second')
+
+    return first, second, fail, {first: undo_first, second: undo_second, fail: mock.Mock()}
+
+
+@pytest.mark.parametrize('declare_dependencies', [False, True])
+def test_event_handle__handler_fails__done_handlers_are_compensated_in_reverse_order(
+        declare_dependencies
+):
+    calls = []
+    first, second, fail, compensations = _make_compensated_handlers(calls)
+    dependencies = {second: [first], fail: [second]} if declare_dependencies else None
+
+    event = Event([first, second, fail], name='test_event', dependencies=dependencies,
+                  compensations=compensations)
+
+    with pytest.raises(ValueError, match='failed'):
+        event.handle(_Context())
+
+    assert ['first', 'second', 'undo_second', 'undo_first'] == calls
+    compensations[fail].assert_not_called()
+
+
+def test_event_handle__handlers_succeed__no_compensation():
+    calls = []
+    first, second, fail, compensations = _make_compensated_handlers(calls)
+    del compensations[fail]
+
+    Event([first, second], name='test_event', compensations=compensations).handle(_Context())
+
+    assert ['first', 'second'] == calls
+
+
+def test_event_handle__compensation_fails__next_compensations_are_called_and_error_is_raised():
+    calls = []
+    first, second, fail, compensations = _make_compensated_handlers(calls)
+    compensations[second] = mock.Mock(side_effect=RuntimeError('undo failed'))
+
+    event = Event([first, second, fail], name='test_event', compensations=compensations)
+
+    with pytest.raises(ValueError, match='failed'):
+        event.handle(_Context())
+
+    assert ['first', 'second', 'undo_first'] == calls
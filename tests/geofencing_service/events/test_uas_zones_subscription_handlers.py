@@ -27,18 +27,36 @@ http://opensource.org/licenses/BSD-3-Clause
 
 Details on EUROCONTROL: http://www.eurocontrol.int
 """
+from datetime import datetime, timezone, timedelta
 from unittest import mock
 from unittest.mock import Mock
 
-from subscription_manager_client.models import Topic
+import pytest
+from subscription_manager_client.models import Topic, Subscription
+from subscription_manager_client.subscription_manager import SubscriptionManagerClient
 
+from geofencing_service.db import IDEMPOTENCY_RECORD_LEASE_IN_SECONDS
+from geofencing_service.db.models import IdempotencyRecord, UASZonesSubscription, \
+    GeofencingSMSubscription
+from geofencing_service.db.subscriptions import get_idempotency_record_id, \
+    get_idempotency_record, create_uas_zones_subscription
+from geofencing_service.events.events import create_uas_zones_subscription_event, \
+    update_uas_zones_subscription_event, delete_uas_zones_subscription_event
 from geofencing_service.events.uas_zones_subscription_handlers import get_or_create_sm_topic, \
-    UASZonesSubscriptionCreateContext
+    UASZonesSubscriptionCreateContext, reuse_idempotency_record, keep_sm_leftovers, \
+    get_topic_name, UASZonesSubscriptionUpdateContext
+from tests.geofencing_service.utils import make_uas_zones_subscription
 
 __author__ = "EUROCONTROL (SWIM)"
 
 
-@mock.patch('geofencing_service.events.uas_zones_subscription_handlers.sm_client')
+def _patch_sm_client():
+    # the calls to methods that the client does not provide fail
+    return mock.patch('geofencing_service.events.uas_zones_subscription_handlers.sm_client',
+                      spec_set=SubscriptionManagerClient)
+
+
+@_patch_sm_client()
 def test_get_or_create_sm_topic__topic_is_found_and_returned(
         mock_sm_client, test_client, test_user
 ):
@@ -55,7 +73,7 @@ def test_get_or_create_sm_topic__topic_is_found_and_returned(
     assert topic == context.sm_topic
 
 
-@mock.patch('geofencing_service.events.uas_zones_subscription_handlers.sm_client')
+@_patch_sm_client()
 def test_get_or_create_sm_topic__topic_is_not_found_and_is_created(
         mock_sm_client, test_client, test_user
 ):
@@ -70,3 +88,219 @@ def test_get_or_create_sm_topic__topic_is_not_found_and_is_created(
 
     topic_to_create = mock_sm_client.post_topic.call_args[0][0]
     assert not_existent_topic_name == topic_to_create.name
+    assert mock_sm_client.post_topic.return_value == context.sm_topic
+
+
+@_patch_sm_client()
+def test_get_or_create_sm_topic__topic_is_reused__no_call(mock_sm_client, test_client, test_user):
+    topic = Topic(name='topic', id=1)
+
+    context = UASZonesSubscriptionCreateContext(Mock(), user=test_user)
+    context.sm_topic = topic
+
+    get_or_create_sm_topic(context)
+
+    assert topic == context.sm_topic
+    mock_sm_client.get_topics.assert_not_called()
+
+
+def _make_create_context(user, idempotency_key='key'):
+    subscription = make_uas_zones_subscription(user=user)
+
+    context = UASZonesSubscriptionCreateContext(subscription.uas_zones_filter, user=user,
+                                                idempotency_key=idempotency_key)
+    get_topic_name(context)
+
+    return context, subscription
+
+
+def test_reuse_idempotency_record__subscription_was_created__is_set_in_context(test_user):
+    context, subscription = _make_create_context(test_user)
+    create_uas_zones_subscription(subscription)
+    IdempotencyRecord(id=get_idempotency_record_id('key', test_user), user=test_user,
+                      topic_name=context.topic_name,
+                      uas_zones_subscription_id=subscription.id).save()
+
+    reuse_idempotency_record(context)
+
+    assert subscription.id == context.uas_zones_subscription.id
+    assert context.sm_subscription is None
+
+
+def test_reuse_idempotency_record__sm_leftovers__are_set_in_context(test_user):
+    context, subscription = _make_create_context(test_user)
+    IdempotencyRecord(id=get_idempotency_record_id('key', test_user), user=test_user,
+                      topic_name=context.topic_name, sm_topic_id=1,
+                      sm_subscription=subscription.sm_subscription).save()
+
+    reuse_idempotency_record(context)
+
+    assert context.uas_zones_subscription is None
+    assert 1 == context.sm_topic.id
+    assert subscription.sm_subscription.id == context.sm_subscription.id
+    assert subscription.sm_subscription.queue == context.sm_subscription.queue
+
+
+def test_reuse_idempotency_record__key_used_with_other_filter__value_error(test_user):
+    context, _ = _make_create_context(test_user)
+    IdempotencyRecord(id=get_idempotency_record_id('key', test_user), user=test_user,
+                      topic_name='other_topic', uas_zones_subscription_id='id').save()
+
+    with pytest.raises(ValueError):
+        reuse_idempotency_record(context)
+
+
+def test_reuse_idempotency_record__new_key__record_is_inserted_in_progress(test_user):
+    context, _ = _make_create_context(test_user)
+
+    reuse_idempotency_record(context)
+
+    record = get_idempotency_record('key', test_user)
+    assert record.in_progress is True
+    assert context.topic_name == record.topic_name
+    assert record.created_at is not None
+
+
+def test_reuse_idempotency_record__creation_in_progress__runtime_error(test_user):
+    context, _ = _make_create_context(test_user)
+    reuse_idempotency_record(context)
+
+    concurrent_context, _ = _make_create_context(test_user)
+    concurrent_context.uas_zones_filter = context.uas_zones_filter
+
+    with pytest.raises(RuntimeError):
+        reuse_idempotency_record(concurrent_context)
+
+
+def test_reuse_idempotency_record__lease_of_the_creation_in_progress_expired__is_taken_over(
+        test_user
+):
+    context, _ = _make_create_context(test_user)
+    reuse_idempotency_record(context)
+    IdempotencyRecord.objects(id=get_idempotency_record_id('key', test_user)).update(
+        set__claimed_at=datetime.now(timezone.utc) - timedelta(
+            seconds=IDEMPOTENCY_RECORD_LEASE_IN_SECONDS + 1)
+    )
+
+    retry_context, _ = _make_create_context(test_user)
+    retry_context.uas_zones_filter = context.uas_zones_filter
+
+    reuse_idempotency_record(retry_context)
+
+    record = get_idempotency_record('key', test_user)
+    assert record.in_progress is True
+    assert datetime.now(timezone.utc) - record.claimed_at < timedelta(seconds=10)
+    assert retry_context.uas_zones_subscription is None
+
+
+def test_keep_sm_leftovers__leftovers_are_recorded(test_user):
+    context, _ = _make_create_context(test_user)
+    context.sm_topic = Topic(name=context.topic_name, id=1)
+    context.sm_subscription = Subscription(id=2, queue='queue', active=False)
+
+    keep_sm_leftovers(context)
+
+    record = get_idempotency_record('key', test_user)
+    assert 1 == record.sm_topic_id
+    assert 2 == record.sm_subscription.id
+    assert 'queue' == record.sm_subscription.queue
+
+
+def test_keep_sm_leftovers__no_leftovers__record_is_deleted(test_user):
+    context, _ = _make_create_context(test_user)
+    context.sm_topic = Topic(name=context.topic_name, id=1)
+    IdempotencyRecord(id=get_idempotency_record_id('key', test_user), user=test_user,
+                      topic_name=context.topic_name, sm_topic_id=1,
+                      sm_subscription=GeofencingSMSubscription(id=2, queue='queue',
+                                                               topic_name=context.topic_name,
+                                                               active=False)).save()
+
+    keep_sm_leftovers(context)
+
+    assert get_idempotency_record('key', test_user) is None
+
+
+@mock.patch('geofencing_service.events.uas_zones_subscription_handlers.get_swim_publisher',
+            Mock())
+@_patch_sm_client()
+def test_create_uas_zones_subscription_event__db_save_fails__sm_subscription_is_deleted(
+        mock_sm_client, test_client, test_user
+):
+    context, _ = _make_create_context(test_user, idempotency_key=None)
+    mock_sm_client.get_topics = Mock(return_value=[])
+    mock_sm_client.post_topic = Mock(return_value=Topic(name=context.topic_name, id=1))
+    mock_sm_client.post_subscription = Mock(return_value=Subscription(id=2, queue='queue'))
+
+    with mock.patch('geofencing_service.events.uas_zones_subscription_handlers.'
+                    'db_create_uas_zones_subscription', side_effect=ValueError('failed')):
+        with pytest.raises(ValueError, match='failed'):
+            create_uas_zones_subscription_event.handle(context)
+
+    mock_sm_client.delete_subscription_by_id.assert_called_once_with(2)
+    # the topic may be shared with concurrently created subscriptions
+    mock_sm_client.delete_topic_by_id.assert_not_called()
+
+
+@mock.patch('geofencing_service.events.uas_zones_subscription_handlers.get_swim_publisher',
+            Mock())
+@_patch_sm_client()
+def test_create_uas_zones_subscription_event__retry_after_failed_compensation__reuses_leftovers(
+        mock_sm_client, test_client, test_user
+):
+    context, _ = _make_create_context(test_user)
+    mock_sm_client.get_topics = Mock(return_value=[])
+    mock_sm_client.post_topic = Mock(return_value=Topic(name=context.topic_name, id=1))
+    mock_sm_client.post_subscription = Mock(
+        return_value=Subscription(id=2, queue='queue', active=False))
+    mock_sm_client.delete_subscription_by_id = Mock(side_effect=ValueError('undo failed'))
+
+    with mock.patch('geofencing_service.events.uas_zones_subscription_handlers.'
+                    'db_create_uas_zones_subscription', side_effect=ValueError('failed')):
+        with pytest.raises(ValueError, match='failed'):
+            create_uas_zones_subscription_event.handle(context)
+
+    mock_sm_client.delete_topic_by_id.assert_not_called()
+
+    retry_context = UASZonesSubscriptionCreateContext(context.uas_zones_filter, user=test_user,
+                                                      idempotency_key='key')
+    reuse_idempotency_record(retry_context)
+    create_uas_zones_subscription_event.handle(retry_context)
+
+    assert 1 == mock_sm_client.post_topic.call_count
+    assert 1 == mock_sm_client.post_subscription.call_count
+    assert 2 == retry_context.uas_zones_subscription.sm_subscription.id
+    record = get_idempotency_record('key', test_user)
+    assert retry_context.uas_zones_subscription.id == record.uas_zones_subscription_id
+    assert record.sm_subscription is None
+
+
+@_patch_sm_client()
+def test_update_uas_zones_subscription_event__sm_call_fails__db_is_not_updated(
+        mock_sm_client, test_client, test_user
+):
+    subscription = make_uas_zones_subscription(user=test_user)
+    subscription.sm_subscription.active = False
+    subscription.save()
+    mock_sm_client.put_subscription = Mock(side_effect=ValueError('failed'))
+
+    subscription.sm_subscription.active = True
+    with pytest.raises(ValueError, match='failed'):
+        update_uas_zones_subscription_event.handle(
+            UASZonesSubscriptionUpdateContext(subscription, user=test_user))
+
+    assert UASZonesSubscription.objects.get(id=subscription.id).sm_subscription.active is False
+
+
+@_patch_sm_client()
+def test_delete_uas_zones_subscription_event__sm_call_fails__db_is_not_updated(
+        mock_sm_client, test_client, test_user
+):
+    subscription = make_uas_zones_subscription(user=test_user)
+    subscription.save()
+    mock_sm_client.delete_subscription_by_id = Mock(side_effect=ValueError('failed'))
+
+    with pytest.raises(ValueError, match='failed'):
+        delete_uas_zones_subscription_event.handle(
+            UASZonesSubscriptionUpdateContext(subscription, user=test_user))
+
+    assert 1 == UASZonesSubscription.objects(id=subscription.id).count()
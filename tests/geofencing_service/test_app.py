@@ -0,0 +1,86 @@
+"""
+Copyright 2019 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+from unittest import mock
+
+import pytest
+
+from geofencing_service import app as app_module
+from geofencing_service.app import create_preloaded_app, init_worker
+from tests.geofencing_service.utils import make_uas_zones_subscription
+
+__author__ = "EUROCONTROL (SWIM)"
+
+
+@pytest.fixture
+def preloaded_apps():
+    with mock.patch.object(app_module, '_preloaded_apps', []) as _preloaded_apps:
+        yield _preloaded_apps
+
+
+@mock.patch.object(app_module, 'gc')
+@mock.patch.object(app_module, 'disconnect')
+@mock.patch.object(app_module, 'create_flask_app')
+def test_create_preloaded_app__connection_is_closed_before_fork(mock_create_flask_app,
+                                                                 mock_disconnect,
+                                                                 mock_gc,
+                                                                 preloaded_apps):
+    app = create_preloaded_app('config.yml')
+
+    assert mock_create_flask_app.return_value == app
+    mock_disconnect.assert_called_once_with()
+    mock_gc.freeze.assert_called_once_with()
+    assert [app] == preloaded_apps
+
+
+@mock.patch.object(app_module, 'connect')
+def test_init_worker__reconnects_and_starts_the_publisher_with_the_existing_topics(mock_connect,
+                                                                                    preloaded_apps,
+                                                                                    test_user):
+    subscription = make_uas_zones_subscription(user=test_user)
+    subscription.save()
+
+    app = mock.Mock(config={'MONGO': {'db': 'geodb'}}, swim_publisher_pid=None)
+    preloaded_apps.append(app)
+
+    init_worker()
+
+    mock_connect.assert_called_once_with(db='geodb')
+    app.swim_publisher.run.assert_called_once_with(threaded=True)
+    app.swim_publisher.preload_topic_message_producer.assert_called_once_with(
+        topic_name=subscription.sm_subscription.topic_name,
+        message_producer=mock.ANY
+    )
+
+
+def test_init_worker__no_preloaded_app__nothing_is_started(preloaded_apps):
+    with mock.patch.object(app_module, 'connect') as mock_connect:
+        init_worker()
+
+    mock_connect.assert_not_called()
@@ -0,0 +1,93 @@
+"""
+Copyright 2019 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+import pytest
+
+from geofencing_service.encoding import serialize, deserialize, compress, decompress, make_diff, \
+    JSON_MIMETYPE, MSGPACK_MIMETYPE, CBOR_MIMETYPE, GZIP_ENCODING, BROTLI_ENCODING
+
+__author__ = "EUROCONTROL (SWIM)"
+
+
+DATA = {
+    'UASZoneList': [
+        {
+            'identifier': 'id',
+            'geometry': [{'horizontalProjection': {'type': 'Polygon',
+                                                   'coordinates': [[[4.3, 50.8], [4.4, 50.9]]]}}],
+            'region': 0,
+        }
+    ],
+    'genericReply': {'RequestStatus': 'OK', 'RequestExceptionDescription': None}
+}
+
+
+@pytest.mark.parametrize('mimetype', [JSON_MIMETYPE, MSGPACK_MIMETYPE, CBOR_MIMETYPE])
+def test_serialize_deserialize(mimetype):
+    serialized = serialize(DATA, mimetype)
+
+    assert isinstance(serialized, bytes)
+    assert DATA == deserialize(serialized, mimetype)
+
+
+@pytest.mark.parametrize('mimetype', [MSGPACK_MIMETYPE, CBOR_MIMETYPE])
+def test_serialize__binary_mimetypes_are_smaller_than_json(mimetype):
+    assert len(serialize(DATA, mimetype)) < len(serialize(DATA, JSON_MIMETYPE))
+
+
+@pytest.mark.parametrize('encoding', [GZIP_ENCODING, BROTLI_ENCODING])
+def test_compress_decompress(encoding):
+    data = serialize(DATA, JSON_MIMETYPE) * 100
+
+    compressed = compress(data, encoding)
+
+    assert len(compressed) < len(data)
+    assert data == decompress(compressed, encoding)
+
+
+def test_serialize__unsupported_mimetype__raises_valueerror():
+    with pytest.raises(ValueError) as e:
+        serialize(DATA, 'application/xml')
+    assert 'Unsupported value: application/xml' in str(e.value)
+
+
+def test_compress__unsupported_encoding__raises_valueerror():
+    with pytest.raises(ValueError) as e:
+        compress(b'data', 'deflate')
+    assert 'Unsupported value: deflate' in str(e.value)
+
+
+@pytest.mark.parametrize('previous, current, expected_diff', [
+    ({}, {}, {}),
+    ({}, {'a': 1, 'b': None, 'c': []}, {'a': 1, 'c': []}),
+    ({'a': 1, 'b': {'c': 2}}, {'a': 1, 'b': {'c': 3}}, {'b': {'c': 3}}),
+    ({'a': 1, 'b': 2}, {'a': 1}, {'b': None}),
+])
+def test_make_diff(previous, current, expected_diff):
+    assert expected_diff == make_diff(previous, current)
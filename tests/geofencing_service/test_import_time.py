@@ -0,0 +1,71 @@
+"""
+Copyright 2019 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+import pytest
+
+from geofencing_service.app import LAZY_MODULES
+from tests.geofencing_service.utils import measure_import_times
+
+__author__ = "EUROCONTROL (SWIM)"
+
+# the time spent in the modules of the service itself, regardless of their dependencies
+OWN_MODULES_IMPORT_TIME_BUDGET_MS = 250
+
+# they are imported only when the app is created
+BROKER_MODULES = ('pubsub_facades',)
+
+
+def _top_level_packages(modules):
+    return {module.split('.')[0] for module in modules}
+
+
+@pytest.mark.parametrize('module', [
+    'geofencing_service.app',
+    'provision.provision_db',
+    'provision.generate_dataset',
+    'provision.migrations.runner',
+])
+def test_import__lazy_modules_are_not_imported(module):
+    import_times = measure_import_times(module)
+
+    imported_lazy_modules = _top_level_packages(import_times) \
+        & _top_level_packages(LAZY_MODULES + BROKER_MODULES)
+
+    assert set() == imported_lazy_modules
+
+
+def test_import__own_modules_are_imported_within_budget():
+    import_times = measure_import_times('geofencing_service.app')
+
+    own_modules_import_time_ms = sum(
+        self_us for module, (self_us, _) in import_times.items()
+        if module.split('.')[0] == 'geofencing_service'
+    ) / 1000
+
+    assert own_modules_import_time_ms <= OWN_MODULES_IMPORT_TIME_BUDGET_MS
@@ -0,0 +1,133 @@
+"""
+Copyright 2019 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+import io
+import os
+import stat
+import threading
+import time
+from unittest import mock
+
+import proton
+import pytest
+
+from geofencing_service.ipc_publisher import encode_record, read_records, decode_message, \
+    IPCPublisherClient, PublisherServer
+
+__author__ = "EUROCONTROL (SWIM)"
+
+
+def _wait_for(condition, timeout_in_sec=5):
+    deadline = time.time() + timeout_in_sec
+    while not condition():
+        assert time.time() < deadline
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def socket_path(tmp_path):
+    return str(tmp_path / 'publisher.sock')
+
+
+@pytest.fixture
+def publisher_server(socket_path):
+    server = PublisherServer(socket_path=socket_path, swim_publisher=mock.Mock(), batch_size=10)
+    threading.Thread(target=server.serve, daemon=True).start()
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+
+def test_encode_record__is_read_back():
+    message = proton.Message(body={'uas_zone_identifier': 'id'}, content_type='application/json')
+    stream = io.BytesIO(encode_record('topic1', message) + encode_record('topic2', message))
+
+    records = list(read_records(stream))
+
+    assert ['topic1', 'topic2'] == [topic_name for topic_name, _ in records]
+    decoded_message = decode_message(records[0][1])
+    assert message.body == decoded_message.body
+    assert message.content_type == decoded_message.content_type
+
+
+def test_read_records__incomplete_record__is_ignored():
+    record = encode_record('topic', proton.Message(body='body'))
+
+    assert [] == list(read_records(io.BytesIO(record[:-1])))
+
+
+def test_ipc_publisher_client__messages_are_published_by_the_server(publisher_server,
+                                                                    socket_path):
+    publisher_server.preload_topic('preloaded_topic')
+
+    client = IPCPublisherClient(socket_path=socket_path)
+    client.run(threaded=True)
+    client.preload_topic_message_producer('preloaded_topic', proton.Message)
+    client.add_topic('new_topic', proton.Message)
+
+    client.publish_topic('preloaded_topic', context='message1')
+    client.publish_topic('new_topic', context='message2')
+
+    swim_publisher = publisher_server.swim_publisher
+    _wait_for(lambda: swim_publisher.publish_topic.call_count == 2)
+
+    swim_publisher.add_topic.assert_called_once_with(topic_name='new_topic',
+                                                     message_producer=decode_message)
+    published = {call[1]['topic_name']: decode_message(call[1]['context']).body
+                 for call in swim_publisher.publish_topic.call_args_list}
+    assert {'preloaded_topic': 'message1', 'new_topic': 'message2'} == published
+
+
+def test_publisher_server__socket_is_only_accessible_by_the_user_and_group(publisher_server,
+                                                                          socket_path):
+    assert 0o660 == stat.S_IMODE(os.stat(socket_path).st_mode)
+
+
+def test_publisher_server__socket_path_without_directory__is_created_in_the_working_dir(
+        tmp_path, monkeypatch
+):
+    monkeypatch.chdir(tmp_path)
+
+    server = PublisherServer(socket_path='publisher.sock', swim_publisher=mock.Mock())
+    server.server_close()
+
+    assert (tmp_path / 'publisher.sock').exists()
+
+
+def test_ipc_publisher_client__queue_is_full__message_is_dropped(socket_path):
+    client = IPCPublisherClient(socket_path=socket_path, queue_size=1)
+    client.add_topic('topic', proton.Message)
+
+    # the client is not running so nothing is dequeued
+    client.publish_topic('topic', context='message1')
+    client.publish_topic('topic', context='message2')
+
+    assert 1 == client._queue.qsize()
@@ -0,0 +1,113 @@
+"""
+Copyright 2019 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+import pytest
+from prometheus_client import CollectorRegistry, Histogram, REGISTRY
+
+from geofencing_service.metrics import timer, timed, db_timed, get_registry, metrics, \
+    MULTIPROC_DIR_ENV_VARS
+
+__author__ = "EUROCONTROL (SWIM)"
+
+
+@pytest.fixture
+def histogram():
+    return Histogram('test_duration_seconds', 'test', ['label'], registry=CollectorRegistry())
+
+
+def _observations(histogram: Histogram, label: str) -> float:
+    for sample in histogram.collect()[0].samples:
+        if sample.name.endswith('_count') and sample.labels == {'label': label}:
+            return sample.value
+
+    return 0
+
+
+def test_timer__observes_the_duration_of_the_block(histogram):
+    with timer(histogram, 'value'):
+        pass
+
+    assert 1 == _observations(histogram, 'value')
+
+
+def test_timed__observes_the_duration_even_if_the_function_raises(histogram):
+    @timed(histogram, 'value')
+    def func():
+        raise ValueError()
+
+    with pytest.raises(ValueError):
+        func()
+
+    assert 'func' == func.__name__
+    assert 1 == _observations(histogram, 'value')
+
+
+def test_db_timed__observations_are_labelled_with_the_function_name():
+    @db_timed
+    def some_db_function():
+        return 'result'
+
+    def observations():
+        return REGISTRY.get_sample_value('geofencing_db_duration_seconds_count',
+                                         {'function': 'some_db_function'}) or 0
+
+    before = observations()
+
+    assert 'result' == some_db_function()
+    assert before + 1 == observations()
+
+
+def test_get_registry__no_multiprocess_dir__returns_the_default_registry(monkeypatch):
+    for env_var in MULTIPROC_DIR_ENV_VARS:
+        monkeypatch.delenv(env_var, raising=False)
+
+    assert REGISTRY is get_registry()
+
+
+def test_get_registry__multiprocess_dir__returns_an_aggregating_registry(monkeypatch, tmp_path):
+    monkeypatch.setenv(MULTIPROC_DIR_ENV_VARS[0], str(tmp_path))
+
+    assert REGISTRY is not get_registry()
+
+
+def test_metrics__returns_the_metrics_in_prometheus_text_format(monkeypatch):
+    for env_var in MULTIPROC_DIR_ENV_VARS:
+        monkeypatch.delenv(env_var, raising=False)
+
+    response = metrics()
+
+    assert 200 == response.status_code
+    assert response.content_type.startswith('text/plain')
+    assert b'geofencing_request_duration_seconds' in response.get_data()
+
+
+def test_metrics__not_enabled__endpoint_is_not_exposed(test_client):
+    response = test_client.get('/metrics')
+
+    assert 404 == response.status_code
@@ -0,0 +1,108 @@
+"""
+Copyright 2019 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+import json
+import os
+import stat
+
+import pytest
+
+from geofencing_service import openapi
+from geofencing_service.openapi import load_openapi_spec
+
+__author__ = "EUROCONTROL (SWIM)"
+
+
+@pytest.fixture(autouse=True)
+def clear_spec_cache():
+    openapi._load_openapi_spec.cache_clear()
+    yield
+    openapi._load_openapi_spec.cache_clear()
+
+
+def _cache_files(cache_dir):
+    return [name for name in os.listdir(cache_dir) if name.endswith('.json')]
+
+
+def test_load_openapi_spec__cache_dir_is_created_private_and_the_spec_cached(tmp_path):
+    cache_dir = tmp_path / 'cache'
+
+    spec = load_openapi_spec(cache_dir=str(cache_dir))
+
+    assert 0o700 == stat.S_IMODE(os.stat(cache_dir).st_mode)
+    [cache_file] = _cache_files(cache_dir)
+    assert 0o600 == stat.S_IMODE(os.stat(cache_dir / cache_file).st_mode)
+    assert spec == json.loads((cache_dir / cache_file).read_text())
+
+
+def test_load_openapi_spec__cached_spec_is_read_back(tmp_path):
+    load_openapi_spec(cache_dir=str(tmp_path))
+    [cache_file] = _cache_files(tmp_path)
+    (tmp_path / cache_file).write_text(json.dumps({'cached': True}))
+    openapi._load_openapi_spec.cache_clear()
+
+    assert {'cached': True} == load_openapi_spec(cache_dir=str(tmp_path))
+
+
+@pytest.mark.parametrize('mode', [0o620, 0o602])
+def test_load_openapi_spec__cache_file_writable_by_others__is_ignored(tmp_path, mode):
+    load_openapi_spec(cache_dir=str(tmp_path))
+    [cache_file] = _cache_files(tmp_path)
+    (tmp_path / cache_file).write_text(json.dumps({'security': []}))
+    os.chmod(tmp_path / cache_file, mode)
+    openapi._load_openapi_spec.cache_clear()
+
+    assert {'security': []} != load_openapi_spec(cache_dir=str(tmp_path))
+
+
+def test_load_openapi_spec__cache_file_of_another_user__is_ignored(tmp_path, monkeypatch):
+    load_openapi_spec(cache_dir=str(tmp_path))
+    [cache_file] = _cache_files(tmp_path)
+    (tmp_path / cache_file).write_text(json.dumps({'security': []}))
+    openapi._load_openapi_spec.cache_clear()
+
+    monkeypatch.setattr(openapi.os, 'getuid', lambda: os.stat(tmp_path).st_uid + 1)
+
+    assert {'security': []} != load_openapi_spec(cache_dir=str(tmp_path))
+
+
+def test_load_openapi_spec__shared_cache_dir__is_not_used(tmp_path):
+    os.chmod(tmp_path, 0o777)
+
+    spec = load_openapi_spec(cache_dir=str(tmp_path))
+
+    assert 'paths' in spec
+    assert [] == _cache_files(tmp_path)
+
+
+def test_load_openapi_spec__no_cache_dir__nothing_is_cached(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    assert 'paths' in load_openapi_spec(cache_dir=None)
+    assert [] == os.listdir(tmp_path)
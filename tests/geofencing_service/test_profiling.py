@@ -0,0 +1,127 @@
+"""
+Copyright 2019 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+import os
+import threading
+import time
+
+import pytest
+from flask import Flask
+
+from geofencing_service.profiling import ProfilerMiddleware, StackSampler, rotate_output_dir, \
+    COLLAPSED_STACKS_EXTENSION
+
+__author__ = "EUROCONTROL (SWIM)"
+
+
+def _busy_wait(seconds: float):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+@pytest.fixture
+def profiled_app():
+    app = Flask(__name__)
+
+    @app.route('/slow/<item_id>')
+    def slow_endpoint(item_id):
+        _busy_wait(0.05)
+        return 'OK'
+
+    return app
+
+
+def _collapsed_files(output_dir):
+    return sorted(name for name in os.listdir(output_dir)
+                  if name.endswith(COLLAPSED_STACKS_EXTENSION))
+
+
+def test_stack_sampler__collects_the_stacks_of_the_sampled_thread():
+    sampler = StackSampler(threading.get_ident(), interval_ms=1)
+    sampler.start()
+    _busy_wait(0.05)
+    sampler.stop()
+
+    assert sampler.stacks
+    assert any(stack.endswith(f'{__name__}._busy_wait') for stack in sampler.stacks)
+
+
+def test_profiler_middleware__request_is_not_sampled__no_profile(profiled_app, tmp_path):
+    profiled_app.wsgi_app = ProfilerMiddleware(profiled_app, str(tmp_path), sample_rate=0)
+
+    assert b'OK' == profiled_app.test_client().get('/slow/1', buffered=True).data
+    assert [] == _collapsed_files(tmp_path)
+
+
+def test_profiler_middleware__request_is_sampled__profile_is_written_per_endpoint(profiled_app,
+                                                                                   tmp_path):
+    profiled_app.wsgi_app = ProfilerMiddleware(profiled_app, str(tmp_path), sample_rate=1,
+                                               interval_ms=1)
+
+    profiled_app.test_client().get('/slow/1', buffered=True)
+
+    files = _collapsed_files(tmp_path)
+    assert 1 == len(files)
+    assert files[0].startswith('slow_endpoint.')
+
+    with open(os.path.join(tmp_path, files[0])) as f:
+        stack, count = f.readline().rsplit(' ', 1)
+
+    assert int(count) > 0
+
+
+@pytest.mark.parametrize('header_value, token, expected_profiles', [
+    ('1', None, 0),
+    ('', '', 0),
+    ('secret', 'secret', 1),
+    ('wrong', 'secret', 0),
+    ('secrets', 'secret', 0),
+])
+def test_profiler_middleware__profile_header(profiled_app, tmp_path, header_value, token,
+                                             expected_profiles):
+    profiled_app.wsgi_app = ProfilerMiddleware(profiled_app, str(tmp_path), sample_rate=0,
+                                               token=token, interval_ms=1)
+
+    profiled_app.test_client().get('/slow/1', headers={'X-Profile': header_value},
+                                   buffered=True)
+
+    assert expected_profiles == len(_collapsed_files(tmp_path))
+
+
+def test_rotate_output_dir__oldest_files_are_deleted_beyond_max_size(tmp_path):
+    for i in range(5):
+        path = tmp_path / f'{i}{COLLAPSED_STACKS_EXTENSION}'
+        path.write_text('a' * 100)
+        os.utime(path, (i, i))
+
+    rotate_output_dir(str(tmp_path), max_size_in_bytes=250)
+
+    assert [f'3{COLLAPSED_STACKS_EXTENSION}', f'4{COLLAPSED_STACKS_EXTENSION}'] == \
+        _collapsed_files(tmp_path)
@@ -0,0 +1,99 @@
+"""
+Copyright 2019 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+import os
+from unittest import mock
+
+import pytest
+from flask import Flask
+
+from geofencing_service.publisher import start_swim_publisher, get_swim_publisher, \
+    get_swim_publisher_health
+from tests.geofencing_service.utils import make_uas_zones_subscription
+
+__author__ = "EUROCONTROL (SWIM)"
+
+
+@pytest.fixture
+def publisher_app():
+    app = Flask(__name__)
+    app.swim_publisher = None
+    app.swim_publisher_factory = mock.Mock(side_effect=lambda: mock.Mock())
+
+    return app
+
+
+def test_start_swim_publisher__app_without_factory__is_left_untouched():
+    app = Flask(__name__)
+    app.swim_publisher = mock.Mock()
+
+    start_swim_publisher(app)
+
+    app.swim_publisher.run.assert_not_called()
+    assert get_swim_publisher_health(app) == {'ok': True}
+
+
+def test_start_swim_publisher__publisher_is_started_once_per_process(publisher_app, test_user):
+    subscription = make_uas_zones_subscription(user=test_user)
+    subscription.save()
+
+    start_swim_publisher(publisher_app)
+    start_swim_publisher(publisher_app)
+
+    publisher_app.swim_publisher_factory.assert_called_once_with()
+    publisher_app.swim_publisher.run.assert_called_once_with(threaded=True)
+    publisher_app.swim_publisher.preload_topic_message_producer.assert_called_once_with(
+        topic_name=subscription.sm_subscription.topic_name,
+        message_producer=mock.ANY
+    )
+    assert os.getpid() == publisher_app.swim_publisher_pid
+    assert get_swim_publisher_health(publisher_app)['ok'] is True
+
+
+def test_start_swim_publisher__publisher_started_in_another_process__is_recreated(publisher_app):
+    inherited_publisher = mock.Mock()
+    publisher_app.swim_publisher = inherited_publisher
+    publisher_app.swim_publisher_pid = os.getpid() + 1
+
+    assert get_swim_publisher_health(publisher_app)['ok'] is False
+
+    start_swim_publisher(publisher_app)
+
+    assert inherited_publisher != publisher_app.swim_publisher
+    inherited_publisher.run.assert_not_called()
+    publisher_app.swim_publisher.run.assert_called_once_with(threaded=True)
+    assert get_swim_publisher_health(publisher_app)['ok'] is True
+
+
+def test_get_swim_publisher__publisher_is_started_on_first_use(publisher_app):
+    with publisher_app.app_context():
+        swim_publisher = get_swim_publisher()
+
+    swim_publisher.run.assert_called_once_with(threaded=True)
+    assert os.getpid() == publisher_app.swim_publisher_pid
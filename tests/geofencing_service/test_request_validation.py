@@ -0,0 +1,200 @@
+"""
+Copyright 2019 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+import json
+from unittest import mock
+
+import fastjsonschema
+import pytest
+from connexion.json_schema import resolve_refs
+from pkg_resources import resource_filename
+
+from geofencing_service import BASE_PATH
+from geofencing_service import app as app_module
+from geofencing_service.app import create_flask_app
+from geofencing_service.openapi import load_openapi_spec
+from geofencing_service.request_validation import to_json_schema, \
+    compile_request_body_validator, get_validator_map, CompiledRequestBodyValidator
+from tests.conftest import DEFAULT_LOGIN_PASS
+from tests.geofencing_service.utils import make_basic_auth_header
+
+__author__ = "EUROCONTROL (SWIM)"
+
+URL_UAS_ZONES_FILTER = f'{BASE_PATH}/uas_zones/filter/'
+
+
+@pytest.fixture(scope='module')
+def components():
+    return resolve_refs(load_openapi_spec(cache_dir=None))['components']['schemas']
+
+
+@pytest.fixture
+def single_pass_app(tmp_path):
+    with open(resource_filename('tests', 'test_config.yml')) as f:
+        config = f.read()
+
+    config_file = tmp_path / 'config.yml'
+    config_file.write_text(config + "\nREQUEST_VALIDATION:\n  MODE: single_pass\n")
+
+    with mock.patch.object(app_module, 'connect'):
+        _app = create_flask_app(str(config_file))
+
+    _app.swim_publisher = mock.Mock()
+
+    return _app
+
+
+def _make_filter_data(horizontal_projection):
+    return {
+        "airspaceVolume": {
+            "lowerLimit": 0,
+            "lowerVerticalReference": "AMSL",
+            "horizontalProjection": horizontal_projection,
+            "upperLimit": 0,
+            "upperVerticalReference": "AMSL"
+        },
+        "endDateTime": "2019-11-05T13:10:39",
+        "regions": [0],
+        "startDateTime": "2019-11-05T13:10:39.315Z"
+    }
+
+
+def test_to_json_schema__horizontal_projection_is_validated_under_its_request_name():
+    schema = {
+        'type': 'object',
+        'properties': {'horizontal_projection': {'type': 'object'},
+                       'email': {'type': 'string', 'format': 'email'},
+                       'startDateTime': {'type': 'string', 'format': 'date-time'},
+                       'id': {'type': 'string', 'format': 'uuid'}}
+    }
+
+    assert {
+        'type': 'object',
+        'properties': {'horizontalProjection': {'type': 'object'},
+                       'email': {'type': 'string', 'format': 'email'},
+                       'startDateTime': {'type': 'string'},
+                       'id': {'type': 'string'}}
+    } == to_json_schema(schema)
+
+
+def test_compile_request_body_validator__compiled_once_per_schema(components):
+    validator = compile_request_body_validator(components['UASZonesRequest'])
+
+    assert validator is compile_request_body_validator(dict(components['UASZonesRequest']))
+
+
+@pytest.mark.parametrize('horizontal_projection', [
+    {'type': 'Polygon', 'coordinates': [[[1, 2], [3, 4], [5, 6], [1, 2]]]},
+    {'type': 'Circle', 'center': [1, 2], 'radius': 100},
+])
+def test_compiled_validator__valid_data(components, horizontal_projection):
+    validator = compile_request_body_validator(components['UASZonesRequest'])
+
+    validator(_make_filter_data(horizontal_projection))
+
+
+@pytest.mark.parametrize('horizontal_projection', [
+    {'coordinates': [[[1, 2], [3, 4], [5, 6], [1, 2]]]},
+    {'type': 'Polygon', 'coordinates': [[[1, 2], [3, 4], [1, 2]]]},
+    {'type': 'Polygon', 'coordinates': [[[1, 2], [3, 4], [5, 6], ['1', 2]]]},
+    {'type': 'Invalid', 'coordinates': [[[1, 2], [3, 4], [5, 6], [1, 2]]]},
+    {'type': 'Circle', 'center': [1, 2]},
+    {'type': 'Circle', 'center': [1, 2], 'radius': -1},
+])
+def test_compiled_validator__invalid_horizontal_projection__raises(components,
+                                                                   horizontal_projection):
+    validator = compile_request_body_validator(components['UASZonesRequest'])
+
+    with pytest.raises(fastjsonschema.JsonSchemaException) as e:
+        validator(_make_filter_data(horizontal_projection))
+
+    assert 'data.airspaceVolume.horizontalProjection' in e.value.message
+
+
+def test_get_validator_map():
+    assert get_validator_map('connexion') is None
+    assert {'body': CompiledRequestBodyValidator} == get_validator_map('single_pass')
+
+    with pytest.raises(ValueError):
+        get_validator_map('invalid')
+
+
+def test_single_pass_app__invalid_body__returns_nok__400(single_pass_app, test_user):
+    data = _make_filter_data({'type': 'Circle', 'center': [1, 2], 'radius': -1})
+
+    response = single_pass_app.test_client().post(
+        URL_UAS_ZONES_FILTER,
+        data=json.dumps(data),
+        content_type='application/json',
+        headers=make_basic_auth_header(test_user.username, DEFAULT_LOGIN_PASS)
+    )
+
+    assert 400 == response.status_code
+    response_data = json.loads(response.data)
+    assert "NOK" == response_data['genericReply']['RequestStatus']
+    assert "data.airspaceVolume.horizontalProjection must be valid exactly by one of oneOf " \
+           "definition" == response_data['genericReply']["RequestExceptionDescription"]
+
+
+def test_single_pass_app__open_ring__returns_nok__400(single_pass_app, test_user):
+    data = _make_filter_data({'type': 'Polygon', 'coordinates': [[[1, 2], [3, 4], [5, 6], [7, 8]]]})
+
+    response = single_pass_app.test_client().post(
+        URL_UAS_ZONES_FILTER,
+        data=json.dumps(data),
+        content_type='application/json',
+        headers=make_basic_auth_header(test_user.username, DEFAULT_LOGIN_PASS)
+    )
+
+    assert 400 == response.status_code
+    response_data = json.loads(response.data)
+    assert "{'airspaceVolume': {'horizontalProjection': [{'coordinates': {0: ['Linestring is not " \
+           "closed.']}}]}}" == response_data['genericReply']["RequestExceptionDescription"]
+
+
+@mock.patch('geofencing_service.endpoints.uas_zones.db_get_uas_zones', return_value=[])
+def test_single_pass_app__valid_body__is_loaded_without_the_polygon_schema(mock_db_get_uas_zones,
+                                                                          single_pass_app,
+                                                                          test_user):
+    data = _make_filter_data({'type': 'Polygon', 'coordinates': [[[1, 2], [3, 4], [5, 6], [1, 2]]]})
+
+    with mock.patch('geofencing_service.endpoints.schemas.db_schemas.PolygonSchema.load') \
+            as mock_polygon_schema_load:
+        response = single_pass_app.test_client().post(
+            URL_UAS_ZONES_FILTER,
+            data=json.dumps(data),
+            content_type='application/json',
+            headers=make_basic_auth_header(test_user.username, DEFAULT_LOGIN_PASS)
+        )
+
+    assert 200 == response.status_code
+    mock_polygon_schema_load.assert_not_called()
+    uas_zones_filter = mock_db_get_uas_zones.call_args[0][0]
+    assert data['airspaceVolume']['horizontalProjection'] == \
+           uas_zones_filter.airspace_volume.horizontal_projection
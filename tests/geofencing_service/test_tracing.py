@@ -0,0 +1,124 @@
+"""
+Copyright 2019 EUROCONTROL
+==========================================
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+   disclaimer.
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following
+   disclaimer in the documentation and/or other materials provided with the distribution.
+3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products
+   derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+==========================================
+
+Editorial note: this license is an instance of the BSD license template as provided by the Open Source Initiative:
+http://opensource.org/licenses/BSD-3-Clause
+
+Details on EUROCONTROL: http://www.eurocontrol.int
+"""
+import json
+import logging
+
+import pytest
+
+from geofencing_service.tracing import EventTracer, CONSOLE_EXPORTER, FILE_EXPORTER, \
+    OPENTELEMETRY_EXPORTER
+
+__author__ = "EUROCONTROL (SWIM)"
+
+
+def _trace_event(handler=lambda: None) -> EventTracer:
+    tracer = EventTracer('test_event')
+
+    with tracer.event_span():
+        with tracer.handler_span('handler'):
+            handler()
+
+    return tracer
+
+
+def test_event_tracer__spans_are_timed():
+    tracer = _trace_event()
+
+    assert tracer.event_trace.duration_ms >= tracer.event_trace.handler_spans[0].duration_ms
+    assert 'handler' == tracer.event_trace.handler_spans[0].name
+
+
+def test_event_tracer__handler_raises__error_is_recorded_and_reraised():
+    def handler():
+        raise ValueError('error')
+
+    with pytest.raises(ValueError):
+        tracer = EventTracer('test_event')
+
+        with tracer.event_span():
+            with tracer.handler_span('handler'):
+                handler()
+
+    assert 'error' == tracer.event_trace.handler_spans[0].error
+    assert 'error' == tracer.event_trace.error
+
+
+def test_event_tracer__console_exporter__trace_is_logged(app, caplog):
+    app.config['TRACING'] = {'EXPORTER': CONSOLE_EXPORTER}
+
+    with app.app_context(), caplog.at_level(logging.INFO):
+        _trace_event()
+
+    assert 'test_event took' in caplog.text
+    assert 'handler:' in caplog.text
+
+
+def test_event_tracer__file_exporter__trace_is_appended_as_json_line(app, tmp_path):
+    traces_file = tmp_path / 'traces.jsonl'
+    app.config['TRACING'] = {'EXPORTER': FILE_EXPORTER, 'FILE': str(traces_file)}
+
+    with app.app_context():
+        _trace_event()
+        _trace_event()
+
+    lines = traces_file.read_text().splitlines()
+    assert 2 == len(lines)
+    assert 'handler' == json.loads(lines[0])['handlers'][0]['name']
+
+
+def test_event_tracer__slow_event__warning_is_logged(app, caplog):
+    app.config['TRACING'] = {'SLOW_EVENT_THRESHOLD_MS': -1}
+
+    with app.app_context(), caplog.at_level(logging.WARNING):
+        _trace_event()
+
+    assert 'Slow event: test_event' in caplog.text
+
+
+def test_event_tracer__opentelemetry_exporter__spans_are_nested(app):
+    sdk_trace = pytest.importorskip('opentelemetry.sdk.trace')
+    in_memory = pytest.importorskip('opentelemetry.sdk.trace.export.in_memory_span_exporter')
+    from opentelemetry import trace
+    from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+
+    exporter = in_memory.InMemorySpanExporter()
+    provider = sdk_trace.TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+
+    app.config['TRACING'] = {'EXPORTER': OPENTELEMETRY_EXPORTER}
+
+    with app.app_context():
+        _trace_event()
+
+    handler_span, event_span = exporter.get_finished_spans()
+    assert 'test_event.handler' == handler_span.name
+    assert 'test_event' == event_span.name
+    assert event_span.context.span_id == handler_span.parent.span_id
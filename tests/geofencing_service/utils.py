@@ -27,16 +27,22 @@ http://opensource.org/licenses/BSD-3-Clause
 
 Details on EUROCONTROL: http://www.eurocontrol.int
 """
+import os
 import random
+import subprocess
+import sys
 import uuid
 from base64 import b64encode
+from contextlib import contextmanager
 from datetime import datetime, timezone
-from typing import Optional, Dict
+from typing import Optional, Dict, List, Tuple
 
 from geofencing_service.db.models import AirspaceVolume, TimePeriod, CodeYesNoType, UASZone, \
     UASZonesFilter, CodeRestrictionType, CodeUSpaceClassType, CodeZoneType, DailyPeriod, \
     CodeWeekDay, User, CodeVerticalReferenceType, Authority, UASZonesSubscription, \
     GeofencingSMSubscription, CodeAuthorityRole, CodeZoneReasonType, UomDistance
+from geofencing_service.tracing import EventTrace, add_event_trace_listener, \
+    remove_event_trace_listener
 
 __author__ = "EUROCONTROL (SWIM)"
 
@@ -211,3 +217,56 @@ def make_uas_zones_subscription(polygon: dict = BASILIQUE_POLYGON, user: Optiona
     subscription.user = user or make_user()
 
     return subscription
+
+
+@contextmanager
+def event_handlers_time_budget(budgets_in_ms: Dict[str, float],
+                               default_budget_in_ms: Optional[float] = None):
+    """
+    Asserts that the handlers of the events handled within the block do not exceed their time
+    budget. Handlers without a budget are not checked unless a default budget is provided.
+
+    :param budgets_in_ms: the budget of each handler by its name
+    :param default_budget_in_ms:
+    :return: the traces of the handled events
+    """
+    event_traces: List[EventTrace] = []
+    add_event_trace_listener(event_traces.append)
+
+    try:
+        yield event_traces
+    finally:
+        remove_event_trace_listener(event_traces.append)
+
+    for event_trace in event_traces:
+        for span in event_trace.handler_spans:
+            budget = budgets_in_ms.get(span.name, default_budget_in_ms)
+
+            assert budget is None or span.duration_ms <= budget, \
+                f'{event_trace.name}.{span.name} took {span.duration_ms:.1f} ms ' \
+                f'exceeding its budget of {budget} ms'
+
+
+def measure_import_times(module: str) -> Dict[str, Tuple[int, int]]:
+    """
+    Imports the module in a fresh interpreter with `python -X importtime`
+
+    :param module:
+    :return: the self and the cumulative import time (in us) of every imported module by its name
+    """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            stderr=subprocess.PIPE, env=env, check=True, universal_newlines=True)
+
+    import_times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+
+        # skip the header
+        if self_us.strip().isdigit():
+            import_times[name.strip()] = (int(self_us), int(cumulative_us))
+
+    return import_times